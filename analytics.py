@@ -0,0 +1,82 @@
+"""
+Analytics - Trend and anomaly indicators for prepared root cause series
+Rolling mean, EWMA, rolling z-score and week-over-week delta are computed
+for all root cause columns of a BU at once and stored with the workbook
+cache, so chart overlays are a lookup.
+"""
+
+import logging
+from typing import Dict
+import pandas as pd
+
+try:
+    from config import ANALYTICS_WINDOW, ANALYTICS_EWMA_SPAN, ANOMALY_Z_THRESHOLD
+except ImportError:
+    ANALYTICS_WINDOW = 8
+    ANALYTICS_EWMA_SPAN = 6
+    ANOMALY_Z_THRESHOLD = 2.5
+
+logger = logging.getLogger(__name__)
+
+# Chart overlays offered on weekly root cause charts
+OVERLAY_OPTIONS = ["Rolling mean", "EWMA", "Anomalies"]
+
+
+def compute_bu_analytics(prepared: pd.DataFrame, window: int = ANALYTICS_WINDOW,
+                         span: int = ANALYTICS_EWMA_SPAN,
+                         z_threshold: float = ANOMALY_Z_THRESHOLD) -> Dict[str, pd.DataFrame]:
+    """
+    Compute trend and anomaly indicators for every root cause column of one BU
+
+    Args:
+        prepared: Compact prepared frame (Date index, one float column per root cause)
+        window: Rolling window in weeks
+        span: EWMA span in weeks
+        z_threshold: Absolute z-score above which a week is flagged as anomalous
+
+    Returns:
+        Dictionary of Date-indexed frames shaped like prepared: rolling_mean, ewma,
+        zscore, delta (float32) and anomalies (bool)
+    """
+    # Rolling statistics in float64 to avoid cancellation in the variance
+    values = prepared.astype('float64')
+    rolling = values.rolling(window, min_periods=max(3, window // 2))
+    rolling_mean = rolling.mean()
+
+    # Each week is scored against the window before it, so a spike doesn't dampen itself
+    baseline_mean = rolling_mean.shift(1)
+    baseline_std = rolling.std().shift(1)
+    zscore = (values - baseline_mean) / baseline_std.where(baseline_std > 0)
+
+    return {
+        'rolling_mean': rolling_mean.astype('float32'),
+        'ewma': values.ewm(span=span, adjust=False).mean().astype('float32'),
+        'zscore': zscore.astype('float32'),
+        'delta': values.diff().astype('float32'),
+        'anomalies': zscore.abs() > z_threshold
+    }
+
+
+def compute_analytics(bus: Dict[str, Dict]) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Compute analytics for every BU of a workbook
+
+    Args:
+        bus: Mapping of BU name -> dict with 'prepared' (Date-indexed compact frame)
+
+    Returns:
+        Mapping of BU name -> analytics frames from compute_bu_analytics
+    """
+    analytics = {}
+
+    for bu_name, entry in bus.items():
+        prepared = entry['prepared']
+        if prepared is None or prepared.empty:
+            continue
+
+        analytics[bu_name] = compute_bu_analytics(prepared)
+        anomaly_count = int(analytics[bu_name]['anomalies'].to_numpy().sum())
+        logger.info(f"Computed analytics for {bu_name}: {anomaly_count} anomalous weeks "
+                    f"across {prepared.shape[1]} root causes")
+
+    return analytics
@@ -0,0 +1,148 @@
+"""
+Archive - Merge several workbook versions into one continuous history
+Older copies of the workbook (rolled over periodically) are ingested one by
+one, each through the shared workbook store, then the BU series are
+concatenated by date. Where weeks overlap, the newest workbook wins.
+"""
+
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Union
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+
+def list_archive_workbooks(source: Union[str, Path, List]) -> List:
+    """
+    Resolve an archive source to an ordered list of workbooks (oldest first)
+
+    Args:
+        source: Folder of workbooks (ordered by modification time) or an explicit
+                list of sources (kept in the given order)
+
+    Returns:
+        List of workbook sources
+    """
+    if isinstance(source, (list, tuple)):
+        return list(source)
+
+    folder = Path(source)
+    if not folder.is_dir():
+        return [source]
+
+    # Skip Office lock files (~$name.xlsx) left by open workbooks
+    files = [f for f in folder.iterdir()
+             if f.is_file() and f.suffix.lower() in WORKBOOK_EXTENSIONS and not f.name.startswith('~$')]
+    files.sort(key=lambda f: (f.stat().st_mtime_ns, f.name))
+    return [str(f) for f in files]
+
+
+def merge_bu_entries(entries: List[Dict]) -> Dict:
+    """
+    Merge the cached entries of one BU from several workbooks (oldest first)
+
+    Args:
+        entries: BU entries ('prepared', 'root_cause_cols', 'thresholds', 'important_kpis')
+
+    Returns:
+        Merged BU entry; thresholds, KPIs and column order come from the newest workbook
+    """
+    newest = entries[-1]
+
+    # Newest layout first, then root causes that only older workbooks have
+    root_cause_cols = list(newest['root_cause_cols'])
+    for entry in reversed(entries[:-1]):
+        root_cause_cols += [col for col in entry['root_cause_cols'] if col not in root_cause_cols]
+
+    frames = [entry['prepared'] for entry in entries if entry['prepared'] is not None and not entry['prepared'].empty]
+    if frames:
+        prepared = pd.concat(frames).reindex(columns=root_cause_cols)
+        # Overlapping weeks: keep the row from the newest workbook
+        prepared = prepared[~prepared.index.duplicated(keep='last')].sort_index().astype('float32')
+    else:
+        prepared = pd.DataFrame()
+
+    thresholds = {}
+    for entry in entries:
+        thresholds.update(entry['thresholds'])
+
+    return {
+        'root_cause_cols': root_cause_cols,
+        'prepared': prepared,
+        'thresholds': thresholds,
+        'important_kpis': newest['important_kpis']
+    }
+
+
+def _latest_data_date(workbook: Dict) -> pd.Timestamp:
+    dates = [entry['prepared'].index.max() for entry in workbook['bus'].values() if not entry['prepared'].empty]
+    return max(dates) if dates else pd.Timestamp.min
+
+
+def merge_workbook_caches(workbooks: List[Dict], derive_views: Callable[[Dict], Dict]) -> Dict:
+    """
+    Combine several workbook caches into a single one with a continuous history
+
+    Args:
+        workbooks: Workbook caches from build_workbook_cache (ordered by their latest week;
+                   ties keep the given order, oldest first)
+        derive_views: Builds the derived views (series, rollups, breaches, ...) from merged BUs
+
+    Returns:
+        Workbook cache dictionary shaped like a single-file one, plus 'archive_files'
+    """
+    # The workbook with the most recent data is the newest, whatever order the files came in
+    workbooks = sorted(workbooks, key=_latest_data_date)
+    newest = workbooks[-1]
+
+    available_bus = list(newest['available_bus'])
+    for workbook in reversed(workbooks[:-1]):
+        available_bus += [bu for bu in workbook['available_bus'] if bu not in available_bus]
+
+    bus = {}
+    compaction = {}
+    for bu_name in available_bus:
+        entries = [workbook['bus'][bu_name] for workbook in workbooks if bu_name in workbook['bus']]
+        if not entries:
+            continue
+
+        bus[bu_name] = merge_bu_entries(entries)
+        compact_bytes = int(bus[bu_name]['prepared'].memory_usage(deep=True).sum())
+        compaction[bu_name] = {
+            'raw_bytes': sum(wb['compaction'].get(bu_name, {}).get('raw_bytes', 0) for wb in workbooks),
+            'prepared_bytes': sum(wb['compaction'].get(bu_name, {}).get('prepared_bytes', 0) for wb in workbooks),
+            'compact_bytes': compact_bytes
+        }
+        logger.info(f"Merged {bu_name} from {len(entries)} workbooks: {len(bus[bu_name]['prepared'])} weeks")
+
+    sheet_names = []
+    for workbook in workbooks:
+        sheet_names += [sheet for sheet in workbook['sheet_names'] if sheet not in sheet_names]
+
+    archive_files = []
+    for workbook in workbooks:
+        dates = [entry['prepared'].index for entry in workbook['bus'].values() if not entry['prepared'].empty]
+        archive_files.append({
+            'data_source': workbook['data_source'],
+            'last_modified': workbook['last_modified'],
+            'first_date': min(index.min() for index in dates) if dates else None,
+            'last_date': max(index.max() for index in dates) if dates else None
+        })
+
+    modified = [workbook['last_modified'] for workbook in workbooks if workbook['last_modified'] is not None]
+
+    merged = {
+        'data_source': f"Archive: {len(workbooks)} workbooks",
+        'last_modified': max(modified) if modified else None,
+        'sheet_names': sheet_names,
+        'available_bus': available_bus,
+        'thresholds_df': newest['thresholds_df'],
+        'bus': bus,
+        'compaction': compaction,
+        'archive_files': archive_files
+    }
+    merged.update(derive_views(bus))
+    return merged
@@ -0,0 +1,207 @@
+"""
+Async Fetcher - Download several SharePoint/OneDrive workbooks concurrently
+Each source goes through download_from_sharepoint (content sniffing,
+conditional requests, versioned cache with fallback) in a worker thread;
+an asyncio semaphore caps the number of simultaneous connections, so a
+refresh takes about as long as the slowest source instead of the sum.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cache_manager import VersionedCache, content_hash
+from sharepoint_helper import download_from_sharepoint
+
+try:
+    from config import CACHE_FOLDER, CACHE_MAX_AGE_HOURS, FETCH_MAX_CONNECTIONS
+except ImportError:
+    CACHE_FOLDER = ".cache"
+    CACHE_MAX_AGE_HOURS = 24
+    FETCH_MAX_CONNECTIONS = 4
+
+logger = logging.getLogger(__name__)
+
+_shared_fetch = {'time': None, 'sources': None, 'results': []}
+_shared_fetch_lock = threading.Lock()
+
+
+def source_cache_folder(cache_folder: str, name: str) -> str:
+    """
+    Cache folder of one source (separate folders keep each source's version history)
+
+    Args:
+        cache_folder: Root cache folder
+        name: Source name
+
+    Returns:
+        Folder path for this source's VersionedCache
+    """
+    slug = re.sub(r'[^A-Za-z0-9_-]+', '_', name).strip('_') or 'source'
+    return str(Path(cache_folder) / "sources" / slug)
+
+
+def _origin(description: str) -> str:
+    """Map a download_from_sharepoint source description to a short origin"""
+    if description.startswith("SharePoint (not modified)"):
+        return "not modified"
+    if description.startswith("SharePoint"):
+        return "live"
+    if "fallback" in description:
+        return "fallback"
+    return "cache"
+
+
+async def _fetch_one(name: str, url: str, semaphore: asyncio.Semaphore, cache_folder: Optional[str],
+                     force_refresh: bool, max_age_hours: float) -> Dict:
+    """
+    Fetch one source under the connection limit
+
+    Returns:
+        Result dictionary (see fetch_sources_async)
+    """
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            content, description = await asyncio.to_thread(
+                download_from_sharepoint,
+                url,
+                source_cache_folder(cache_folder, name) if cache_folder else None,
+                force_refresh,
+                f"{name}.xlsx",
+                max_age_hours
+            )
+            data = content.getvalue()
+            result = {
+                'name': name,
+                'url': url,
+                'ok': True,
+                'origin': _origin(description),
+                'description': description,
+                'content': data,
+                'hash': content_hash(data),
+                'bytes': len(data),
+                'error': None
+            }
+        except Exception as e:
+            result = {
+                'name': name,
+                'url': url,
+                'ok': False,
+                'origin': None,
+                'description': None,
+                'content': None,
+                'hash': None,
+                'bytes': 0,
+                'error': str(e)
+            }
+
+        result['seconds'] = time.perf_counter() - start
+
+    if result['ok']:
+        logger.info(f"✓ {name}: {result['description']} ({result['bytes'] / 1024:.0f} KB, {result['seconds']:.2f}s)")
+    else:
+        logger.error(f"✗ {name}: {result['error']} ({result['seconds']:.2f}s)")
+    return result
+
+
+async def fetch_sources_async(sources: Dict[str, str], cache_folder: Optional[str] = CACHE_FOLDER,
+                              max_connections: int = FETCH_MAX_CONNECTIONS, force_refresh: bool = False,
+                              max_age_hours: float = CACHE_MAX_AGE_HOURS) -> List[Dict]:
+    """
+    Fetch every source concurrently
+
+    Args:
+        sources: Mapping of source name -> SharePoint/OneDrive URL
+        cache_folder: Root cache folder (each source gets its own subfolder; None = no cache)
+        max_connections: Maximum simultaneous downloads
+        force_refresh: Always ask the server instead of using a recent cached version
+        max_age_hours: Cached versions younger than this are used without a request
+
+    Returns:
+        One result per source, in the given order, with name, url, ok, origin
+        ("live", "not modified", "cache", "fallback"), description, content (bytes),
+        hash, bytes, seconds and error
+    """
+    semaphore = asyncio.Semaphore(max(1, max_connections))
+    start = time.perf_counter()
+
+    results = await asyncio.gather(*(
+        _fetch_one(name, url, semaphore, cache_folder, force_refresh, max_age_hours)
+        for name, url in sources.items()
+    ))
+
+    elapsed = time.perf_counter() - start
+    slowest = max((r['seconds'] for r in results), default=0.0)
+    logger.info(f"Fetched {sum(r['ok'] for r in results)}/{len(results)} sources in {elapsed:.2f}s "
+                f"(slowest {slowest:.2f}s, sum {sum(r['seconds'] for r in results):.2f}s)")
+    return list(results)
+
+
+def fetch_sources(sources: Dict[str, str], cache_folder: Optional[str] = CACHE_FOLDER,
+                  max_connections: int = FETCH_MAX_CONNECTIONS, force_refresh: bool = False,
+                  max_age_hours: float = CACHE_MAX_AGE_HOURS) -> List[Dict]:
+    """
+    Synchronous wrapper around fetch_sources_async (for Streamlit and scripts)
+
+    Args:
+        sources: Mapping of source name -> SharePoint/OneDrive URL
+        cache_folder: Root cache folder (each source gets its own subfolder; None = no cache)
+        max_connections: Maximum simultaneous downloads
+        force_refresh: Always ask the server instead of using a recent cached version
+        max_age_hours: Cached versions younger than this are used without a request
+
+    Returns:
+        One result per source (see fetch_sources_async)
+    """
+    return asyncio.run(fetch_sources_async(sources, cache_folder, max_connections, force_refresh, max_age_hours))
+
+
+def fetch_sources_shared(sources: Dict[str, str], ttl: float, cache_folder: Optional[str] = CACHE_FOLDER,
+                         max_connections: int = FETCH_MAX_CONNECTIONS,
+                         force_refresh: bool = False) -> List[Dict]:
+    """
+    fetch_sources with a process-wide memo, so sessions share one fetch per ttl seconds
+
+    Args:
+        sources: Mapping of source name -> SharePoint/OneDrive URL
+        ttl: Seconds the last results are reused for
+        cache_folder: Root cache folder (each source gets its own subfolder; None = no cache)
+        max_connections: Maximum simultaneous downloads
+        force_refresh: Fetch again now and ask every server instead of using cached files
+
+    Returns:
+        One result per source (see fetch_sources_async)
+    """
+    with _shared_fetch_lock:
+        fetched_at = _shared_fetch['time']
+        if (force_refresh or fetched_at is None or _shared_fetch['sources'] != sources
+                or time.monotonic() - fetched_at > ttl):
+            _shared_fetch['results'] = fetch_sources(sources, cache_folder, max_connections, force_refresh)
+            _shared_fetch['sources'] = dict(sources)
+            _shared_fetch['time'] = time.monotonic()
+        return _shared_fetch['results']
+
+
+def rollback_source(name: str, url: str, cache_folder: str = CACHE_FOLDER) -> Optional[Dict]:
+    """
+    Roll a source back to its previous cached version and drop the shared fetch memo,
+    so the next fetch serves that version
+
+    Args:
+        name: Source name
+        url: Source URL
+        cache_folder: Root cache folder
+
+    Returns:
+        The cache entry that is now current, or None if there is no previous version
+    """
+    current = VersionedCache(source_cache_folder(cache_folder, name)).rollback(url)
+    if current is not None:
+        with _shared_fetch_lock:
+            _shared_fetch['time'] = None
+    return current
@@ -0,0 +1,315 @@
+"""
+Batch Report - Render every BU to static HTML without Streamlit
+Writes one report per BU plus an index page, sharing a single plotly.js bundle
+
+Usage:
+    python batch_report.py --source KPIsStabilityTAS.xlsx --output reports
+"""
+
+import argparse
+import html
+import logging
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+from archive import list_archive_workbooks
+from stability_dashboard import StabilityDashboard, clean_column_name, load_archive_cache
+
+try:
+    from config import EXCEL_FILE_PATH, DEFAULT_THRESHOLD, REPORT_OUTPUT_DIR, REPORT_WORKERS
+except ImportError:
+    EXCEL_FILE_PATH = r"C:\Users\mbrancato\OneDrive - A.S. Watson Europe\Documents\Stability.xlsx"
+    DEFAULT_THRESHOLD = 0.05
+    REPORT_OUTPUT_DIR = "reports"
+    REPORT_WORKERS = None
+
+logger = logging.getLogger(__name__)
+
+PLOTLY_BUNDLE_NAME = "plotly.min.js"
+
+PAGE_STYLE = """
+    body { font-family: sans-serif; color: #1a1a1a; margin: 0 auto; max-width: 1400px; padding: 20px; }
+    h1 { margin-bottom: 4px; }
+    .caption { color: #666; font-size: 0.9em; }
+    .important { color: #d32f2f; }
+    table { border-collapse: collapse; margin: 12px 0 24px 0; }
+    th, td { border: 1px solid #E8E8E8; padding: 6px 10px; text-align: left; }
+    th { background: #F5F5F5; }
+    .chart { margin-bottom: 24px; }
+    footer { text-align: center; color: #666; padding: 20px; }
+"""
+
+
+def report_filename(bu_name: str) -> str:
+    """
+    Build a filesystem-safe report filename for a BU
+
+    Args:
+        bu_name: Business unit name
+
+    Returns:
+        Filename like "kruidvat.html"
+    """
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', bu_name).strip('_').lower()
+    return f"{slug or 'bu'}.html"
+
+
+def render_page(title: str, body: str) -> str:
+    """
+    Wrap report content in a full HTML page that loads the shared plotly.js bundle
+
+    Args:
+        title: Page title
+        body: Inner HTML
+
+    Returns:
+        Full HTML document
+    """
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<script src="{PLOTLY_BUNDLE_NAME}"></script>
+<style>{PAGE_STYLE}</style>
+</head>
+<body>
+{body}
+<footer>Stability Dashboard | Generated {datetime.now().strftime('%Y-%m-%d %H:%M')}</footer>
+</body>
+</html>
+"""
+
+
+def render_breach_table(breach_summary: pd.DataFrame) -> str:
+    """
+    Render breach summary rows as an HTML table
+
+    Args:
+        breach_summary: Rows from breaches.build_breach_index summary
+
+    Returns:
+        HTML table (empty string if there are no rows)
+    """
+    if breach_summary.empty:
+        return ""
+
+    rows = []
+    for _, row in breach_summary.iterrows():
+        since = row['current_since'].strftime('%d %b %Y') if pd.notna(row['current_since']) else ""
+        latest = f"{row['latest_value'] * 100:.2f}%" if pd.notna(row['latest_value']) else ""
+        rows.append(
+            "<tr>"
+            f"<td>{html.escape(clean_column_name(row['root_cause']))}</td>"
+            f"<td>{'🔴' if row['currently_breaching'] else '🟢'}</td>"
+            f"<td>{row['current_streak']}</td>"
+            f"<td>{since}</td>"
+            f"<td>{row['longest_streak']}</td>"
+            f"<td>{latest}</td>"
+            f"<td>{row['threshold'] * 100:.2f}%</td>"
+            "</tr>"
+        )
+
+    return ("<table><tr><th>Root Cause</th><th>Breaching</th><th>Current Streak (weeks)</th>"
+            "<th>Since</th><th>Longest Streak (weeks)</th><th>Latest</th><th>Threshold</th></tr>"
+            + "".join(rows) + "</table>")
+
+
+def render_bu_report(bu_name: str, bu_entry: Dict, breach_summary: pd.DataFrame) -> str:
+    """
+    Render the full report page for one BU
+
+    Args:
+        bu_name: Business unit name
+        bu_entry: BU entry from the workbook cache
+        breach_summary: Breach summary rows for this BU
+
+    Returns:
+        Full HTML document
+    """
+    dashboard = StabilityDashboard()
+    prepared = bu_entry['prepared']
+    root_cause_cols = bu_entry['root_cause_cols']
+    thresholds = bu_entry['thresholds']
+    important_kpis = bu_entry['important_kpis']
+
+    parts = [f"<h1>{html.escape(bu_name)}</h1>",
+             '<p class="caption"><a href="index.html">← All Business Units</a></p>']
+
+    if important_kpis:
+        parts.append(f'<p class="caption important">⭐ Important KPIs: '
+                     f'{html.escape(", ".join(important_kpis))}</p>')
+
+    if prepared is None or prepared.empty or not root_cause_cols:
+        parts.append("<p>No data available.</p>")
+        return render_page(bu_name, "\n".join(parts))
+
+    parts.append("<h2>🚨 Breach Summary</h2>")
+    parts.append(render_breach_table(breach_summary))
+
+    figures = [dashboard.create_summary_chart(prepared, thresholds, root_cause_cols)]
+    for root_cause in root_cause_cols:
+        threshold = thresholds.get(root_cause, DEFAULT_THRESHOLD)
+        figures.append(dashboard.create_root_cause_chart(prepared, root_cause, threshold, important_kpis))
+
+    for fig in figures:
+        # Let charts follow the page width instead of the fixed dashboard width
+        fig.update_layout(width=None, autosize=True)
+        chart_html = fig.to_html(full_html=False, include_plotlyjs=False, default_width='100%')
+        parts.append(f'<div class="chart">{chart_html}</div>')
+
+    return render_page(bu_name, "\n".join(parts))
+
+
+def _write_bu_report(args: Tuple[str, Dict, pd.DataFrame, str]) -> Tuple[str, str, Optional[str]]:
+    """
+    Worker entry point: render one BU and write it to disk
+
+    Returns:
+        Tuple of (BU name, filename, error message or None)
+    """
+    bu_name, bu_entry, breach_summary, output_dir = args
+    filename = report_filename(bu_name)
+    try:
+        page = render_bu_report(bu_name, bu_entry, breach_summary)
+        (Path(output_dir) / filename).write_text(page, encoding='utf-8')
+        return bu_name, filename, None
+    except Exception as e:
+        logger.error(f"Error rendering report for {bu_name}: {e}", exc_info=True)
+        return bu_name, filename, str(e)
+
+
+def render_index(workbook: Dict, results: List[Tuple[str, str, Optional[str]]]) -> str:
+    """
+    Render the index page linking every BU report
+
+    Args:
+        workbook: Workbook cache dictionary
+        results: Worker results (BU name, filename, error)
+
+    Returns:
+        Full HTML document
+    """
+    breach_summary = workbook['breach_summary']
+    rows = []
+
+    for bu_name, filename, error in results:
+        bu_entry = workbook['bus'].get(bu_name)
+        tracked = len(bu_entry['root_cause_cols']) if bu_entry else 0
+        bu_breaches = breach_summary[breach_summary['bu'] == bu_name]
+        breaching = int(bu_breaches['currently_breaching'].sum()) if not bu_breaches.empty else 0
+        link = html.escape(bu_name) if error else f'<a href="{filename}">{html.escape(bu_name)}</a>'
+        status = f"❌ {html.escape(error)}" if error else ("🔴" if breaching else "🟢")
+        rows.append(f"<tr><td>{link}</td><td>{tracked}</td><td>{breaching}</td><td>{status}</td></tr>")
+
+    last_modified = workbook['last_modified']
+    body = (
+        "<h1>📊 Stability Report</h1>"
+        f'<p class="caption">Source: {html.escape(workbook["data_source"])}'
+        + (f" | Data from: {last_modified.strftime('%Y-%m-%d %H:%M')}" if last_modified else "")
+        + "</p>"
+        "<table><tr><th>Business Unit</th><th>Root Causes</th><th>Breaching Now</th><th>Status</th></tr>"
+        + "".join(rows) + "</table>"
+    )
+    return render_page("Stability Report", body)
+
+
+def write_reports(workbook: Dict, output_dir: str, workers: Optional[int] = None) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Write the BU reports, the index page and the shared plotly.js bundle for a loaded workbook
+
+    Args:
+        workbook: Workbook cache dictionary
+        output_dir: Directory to write reports into (created if missing)
+        workers: Worker process count (None = one per CPU, 1 = render in this process)
+
+    Returns:
+        Worker results (BU name, filename, error message or None)
+    """
+    from plotly.offline import get_plotlyjs
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    # Shared plotly.js bundle (embedded once, referenced by every page)
+    (output_path / PLOTLY_BUNDLE_NAME).write_text(get_plotlyjs(), encoding='utf-8')
+
+    breach_summary = workbook['breach_summary']
+    tasks = [
+        (bu_name, workbook['bus'].get(bu_name, {'prepared': None, 'root_cause_cols': [],
+                                                 'thresholds': {}, 'important_kpis': []}),
+         breach_summary[breach_summary['bu'] == bu_name], str(output_path))
+        for bu_name in workbook['available_bus']
+    ]
+
+    if workers == 1:
+        results = [_write_bu_report(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_write_bu_report, tasks))
+
+    (output_path / "index.html").write_text(render_index(workbook, results), encoding='utf-8')
+    return results
+
+
+def run_batch_report(source, output_dir: str, workers: Optional[int] = None) -> bool:
+    """
+    Render reports for every BU of a workbook
+
+    Args:
+        source: Excel source accepted by StabilityDashboard, or a folder of archived
+                workbooks merged into one history
+        output_dir: Directory to write reports into
+        workers: Worker process count (None = one per CPU)
+
+    Returns:
+        bool: True if every BU rendered successfully, False otherwise
+    """
+    start = time.perf_counter()
+
+    if Path(source).is_dir():
+        workbook = load_archive_cache(list_archive_workbooks(source))
+    else:
+        workbook = StabilityDashboard(excel_source=source).build_workbook_cache()
+    if workbook is None:
+        logger.error(f"Could not load workbook: {source}")
+        return False
+
+    parse_time = time.perf_counter() - start
+    logger.info(f"Workbook parsed in {parse_time:.2f}s")
+
+    results = write_reports(workbook, output_dir, workers)
+
+    failed = [bu_name for bu_name, _, error in results if error]
+    logger.info(f"✓ Wrote {len(results) - len(failed)} BU reports to {output_dir} "
+                f"in {time.perf_counter() - start:.2f}s")
+    if failed:
+        logger.error(f"✗ Failed BUs: {', '.join(failed)}")
+
+    return not failed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Render static HTML stability reports for every BU")
+    parser.add_argument("--source", default=EXCEL_FILE_PATH, help="Path to the Excel workbook (or a folder of archived workbooks to merge)")
+    parser.add_argument("--output", default=REPORT_OUTPUT_DIR, help="Output directory for HTML reports")
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS,
+                        help="Number of worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    if not Path(args.source).exists():
+        logger.error(f"Excel file not found at: {args.source}")
+        return 1
+
+    return 0 if run_batch_report(args.source, args.output, args.workers) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
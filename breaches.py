@@ -0,0 +1,83 @@
+"""
+Breaches - Index of contiguous threshold-breach runs per BU and root cause
+Built once per workbook version with run-length encoding over the long series
+"""
+
+import logging
+from typing import Tuple
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+WEEK = pd.Timedelta(weeks=1)
+
+RUN_COLUMNS = ['bu', 'root_cause', 'start', 'end', 'length', 'peak', 'threshold']
+SUMMARY_COLUMNS = ['bu', 'root_cause', 'latest_date', 'latest_value', 'threshold',
+                   'currently_breaching', 'current_streak', 'current_since',
+                   'longest_streak', 'breach_runs', 'breach_weeks']
+
+
+def build_breach_index(series: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Find every run of consecutive weeks where value > threshold (missing weeks end a run)
+
+    Args:
+        series: Long frame from rollups.build_long_series (sorted by bu, root_cause, Date)
+
+    Returns:
+        Tuple of (runs, summary):
+        - runs: one row per breach run with start, end, length, peak and threshold
+        - summary: one row per (bu, root_cause), sorted so that currently breaching
+          series with the longest current streak come first
+    """
+    if series.empty:
+        return pd.DataFrame(columns=RUN_COLUMNS), pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    breach = series['value'] > series['threshold']
+
+    # A new run starts whenever the series changes, the breach state flips or weeks are
+    # missing in between (lengths are counted in rows, so a gap must not join two runs)
+    new_series = ((series['bu'] != series['bu'].shift()) |
+                  (series['root_cause'] != series['root_cause'].shift()))
+    state_flip = breach != breach.shift()
+    gap = series['Date'].diff() > WEEK
+    run_id = (new_series | state_flip | gap).cumsum()
+
+    runs = (
+        series[breach]
+        .assign(run_id=run_id[breach])
+        .groupby('run_id', sort=False, observed=True)
+        .agg(bu=('bu', 'first'), root_cause=('root_cause', 'first'),
+             start=('Date', 'first'), end=('Date', 'last'), length=('Date', 'size'),
+             peak=('value', 'max'), threshold=('threshold', 'first'))
+    )
+
+    # Latest point of each series decides whether it is breaching right now
+    last_rows = series.assign(breach=breach, run_id=run_id).groupby(
+        ['bu', 'root_cause'], sort=False, observed=True).tail(1).set_index(['bu', 'root_cause'])
+    run_stats = runs.groupby(['bu', 'root_cause'], sort=False, observed=True).agg(
+        longest_streak=('length', 'max'), breach_runs=('length', 'size'),
+        breach_weeks=('length', 'sum'))
+
+    summary = pd.DataFrame({
+        'latest_date': last_rows['Date'],
+        'latest_value': last_rows['value'],
+        'threshold': last_rows['threshold'],
+        'currently_breaching': last_rows['breach']
+    }).join(run_stats)
+
+    current_runs = last_rows.loc[last_rows['breach'], 'run_id']
+    summary['current_streak'] = current_runs.map(runs['length'])
+    summary['current_since'] = current_runs.map(runs['start'])
+
+    for col in ['current_streak', 'longest_streak', 'breach_runs', 'breach_weeks']:
+        summary[col] = summary[col].fillna(0).astype(int)
+
+    summary = summary.reset_index()[SUMMARY_COLUMNS].sort_values(
+        ['currently_breaching', 'current_streak', 'longest_streak'],
+        ascending=False, kind='stable').reset_index(drop=True)
+
+    runs = runs.reset_index(drop=True)[RUN_COLUMNS]
+    logger.info(f"Breach index: {len(runs)} runs, "
+                f"{int(summary['currently_breaching'].sum())} series currently breaching")
+    return runs, summary
@@ -0,0 +1,408 @@
+"""
+Cache Manager - Versioned, size-bounded local cache of downloaded workbooks
+Entries are stored by content hash and described in a JSON manifest
+(source, hash, HTTP validators, fetch time). The cache keeps the last N
+versions within a byte budget, verifies integrity on read and supports
+rolling back to the previous version of a source.
+
+Usage:
+    python cache_manager.py --list
+    python cache_manager.py --rollback [--source PATH_OR_URL] [--cache-folder FOLDER]
+
+Layout:
+    <cache_folder>/manifest.json
+    <cache_folder>/objects/<sha256>.xlsx
+    <cache_folder>/artifacts/<sha256>/...   (derived files, removed with the entry)
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from config import CACHE_FOLDER, CACHE_MAX_VERSIONS, CACHE_MAX_BYTES
+except ImportError:
+    CACHE_FOLDER = ".cache"
+    CACHE_MAX_VERSIONS = 5
+    CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Hash of each tracked local file per (cache folder, path, mtime, size), so an
+# unchanged file is not read and hashed again on every call of track_file
+_tracked_files = {}
+_tracked_files_lock = threading.Lock()
+
+
+class CacheIntegrityError(Exception):
+    """Raised when a cached object does not match its recorded hash"""
+
+
+def content_hash(content: bytes) -> str:
+    """
+    Hash file content for cache addressing
+
+    Args:
+        content: Raw file bytes
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def _dir_size(path: Path) -> int:
+    if not path.exists():
+        return 0
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+class VersionedCache:
+    """Content-addressed workbook cache with manifest, retention and LRU eviction"""
+
+    _locks = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, cache_folder: str = ".cache", max_versions: int = CACHE_MAX_VERSIONS,
+                 max_bytes: int = CACHE_MAX_BYTES):
+        """
+        Initialize the cache
+
+        Args:
+            cache_folder: Root folder of the cache
+            max_versions: Number of versions to keep (newest first)
+            max_bytes: Byte budget for objects plus derived artifacts
+        """
+        self.root = Path(cache_folder)
+        self.objects_dir = self.root / "objects"
+        self.artifacts_dir = self.root / "artifacts"
+        self.manifest_path = self.root / MANIFEST_NAME
+        self.max_versions = max_versions
+        self.max_bytes = max_bytes
+
+        # One lock per cache folder, shared by every instance in the process
+        with VersionedCache._locks_guard:
+            self._lock = VersionedCache._locks.setdefault(str(self.root.resolve()), threading.RLock())
+
+    # Manifest
+
+    def _load_manifest(self) -> List[Dict]:
+        if not self.manifest_path.exists():
+            return []
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f).get('entries', [])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable cache manifest, starting fresh: {e}")
+            return []
+
+    def _save_manifest(self, entries: List[Dict]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': entries}, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _object_path(self, entry: Dict) -> Path:
+        return self.objects_dir / f"{entry['hash']}{Path(entry.get('filename') or '.xlsx').suffix or '.xlsx'}"
+
+    # Public API
+
+    def versions(self, source: Optional[str] = None, include_rejected: bool = False) -> List[Dict]:
+        """
+        List cached versions, newest first
+
+        Args:
+            source: Only versions fetched from this URL/path (None = all)
+            include_rejected: Also list versions that were rolled back
+
+        Returns:
+            List of manifest entries
+        """
+        with self._lock:
+            entries = self._load_manifest()
+        entries = [e for e in entries
+                   if (source is None or e['source'] == source)
+                   and (include_rejected or not e.get('rejected'))]
+        return sorted(entries, key=lambda e: e['fetched_at'], reverse=True)
+
+    def latest(self, source: Optional[str] = None) -> Optional[Dict]:
+        """
+        Get the newest usable version
+
+        Args:
+            source: Only consider versions of this source
+
+        Returns:
+            Manifest entry or None
+        """
+        versions = self.versions(source)
+        return versions[0] if versions else None
+
+    def put(self, content: bytes, source: str, validators: Optional[Dict[str, str]] = None,
+            filename: Optional[str] = None) -> Dict:
+        """
+        Store a new version (identical content is stored once)
+
+        Args:
+            content: Raw file bytes
+            source: URL or path the content came from
+            validators: HTTP validators (etag, last_modified) for conditional requests
+            filename: Original filename (used for the object's extension)
+
+        Returns:
+            Manifest entry of the stored version
+        """
+        digest = content_hash(content)
+        now = datetime.now().isoformat()
+
+        with self._lock:
+            entries = self._load_manifest()
+            entry = next((e for e in entries if e['hash'] == digest and e['source'] == source), None)
+
+            if entry is None:
+                entry = {'hash': digest, 'source': source, 'filename': filename,
+                         'size': len(content), 'rejected': False}
+                entries.append(entry)
+
+            entry.update({'validators': validators or {}, 'fetched_at': now, 'last_access': now})
+
+            object_path = self._object_path(entry)
+            if not object_path.exists():
+                self.objects_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = object_path.with_suffix('.tmp')
+                tmp_path.write_bytes(content)
+                os.replace(tmp_path, object_path)
+
+            entries = self._enforce_limits(entries, keep=digest)
+            self._save_manifest(entries)
+
+        logger.info(f"✓ Cached version {digest[:12]} of {source}")
+        return entry
+
+    def read(self, digest: str) -> bytes:
+        """
+        Read a cached version and verify its integrity
+
+        Args:
+            digest: Content hash of the version
+
+        Returns:
+            File bytes
+
+        Raises:
+            KeyError: Unknown version
+            CacheIntegrityError: Object missing or corrupted (the entry is dropped)
+        """
+        with self._lock:
+            entries = self._load_manifest()
+            entry = next((e for e in entries if e['hash'] == digest), None)
+            if entry is None:
+                raise KeyError(f"Version {digest} not in cache")
+
+            object_path = self._object_path(entry)
+            try:
+                content = object_path.read_bytes()
+            except OSError as e:
+                content = None
+                logger.error(f"Cached object unreadable: {e}")
+
+            if content is None or content_hash(content) != digest:
+                logger.error(f"✗ Integrity check failed for cached version {digest[:12]}, removing it")
+                self._remove_files(entry)
+                self._save_manifest([e for e in entries if e['hash'] != digest])
+                raise CacheIntegrityError(f"Cached version {digest} is corrupted")
+
+            now = datetime.now().isoformat()
+            for e in entries:
+                if e['hash'] == digest:
+                    e['last_access'] = now
+            self._save_manifest(entries)
+            return content
+
+    def read_latest(self, source: Optional[str] = None) -> Optional[tuple]:
+        """
+        Read the newest version that passes the integrity check
+
+        Args:
+            source: Only consider versions of this source
+
+        Returns:
+            Tuple of (content, entry) or None if no valid version exists
+        """
+        for entry in self.versions(source):
+            try:
+                return self.read(entry['hash']), entry
+            except (KeyError, CacheIntegrityError):
+                continue
+        return None
+
+    def rollback(self, source: Optional[str] = None) -> Optional[Dict]:
+        """
+        Reject the newest version so the previous one becomes current
+
+        The rejected version stays on disk (and is not re-promoted if the same
+        content is fetched again) until it is evicted.
+
+        Args:
+            source: Source to roll back
+
+        Returns:
+            The entry that is now current, or None if there is no previous version
+        """
+        with self._lock:
+            entries = self._load_manifest()
+            usable = sorted([e for e in entries if (source is None or e['source'] == source)
+                             and not e.get('rejected')],
+                            key=lambda e: e['fetched_at'], reverse=True)
+            if len(usable) < 2:
+                logger.warning("No previous cached version to roll back to")
+                return None
+
+            usable[0]['rejected'] = True
+            self._save_manifest(entries)
+
+        logger.info(f"Rolled back {usable[0]['hash'][:12]} → {usable[1]['hash'][:12]}")
+        return usable[1]
+
+    def track_file(self, path) -> Optional[Dict]:
+        """
+        Store the current content of a local file as a version of that file
+
+        The file is hashed once per modification (mtime and size); later calls
+        only read the manifest.
+
+        Args:
+            path: Local file path (also used as the source)
+
+        Returns:
+            None if the file's content is the current version, else the entry to
+            serve instead (the file's content was rolled back)
+        """
+        file_path = Path(path)
+        source = str(file_path)
+        stat = file_path.stat()
+        key = (str(self.root.resolve()), str(file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+        with _tracked_files_lock:
+            digest = _tracked_files.get(key)
+
+        versions = self.versions(source, include_rejected=True)
+        own = next((e for e in versions if e['hash'] == digest), None) if digest else None
+        if own is None:
+            # New modification, or the version was evicted since it was stored
+            own = self.put(file_path.read_bytes(), source, filename=file_path.name)
+            with _tracked_files_lock:
+                _tracked_files[key] = own['hash']
+
+        if not own.get('rejected'):
+            return None
+        return self.latest(source)
+
+    def artifact_dir(self, digest: str) -> Path:
+        """
+        Folder for files derived from a version (removed when the version is evicted)
+
+        Args:
+            digest: Content hash of the version
+
+        Returns:
+            Existing directory path
+        """
+        path = self.artifacts_dir / digest
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def total_bytes(self) -> int:
+        """Total size of cached objects and derived artifacts"""
+        return _dir_size(self.objects_dir) + _dir_size(self.artifacts_dir)
+
+    # Retention
+
+    def _entry_bytes(self, entry: Dict) -> int:
+        object_path = self._object_path(entry)
+        size = object_path.stat().st_size if object_path.exists() else 0
+        return size + _dir_size(self.artifacts_dir / entry['hash'])
+
+    def _remove_files(self, entry: Dict):
+        self._object_path(entry).unlink(missing_ok=True)
+        shutil.rmtree(self.artifacts_dir / entry['hash'], ignore_errors=True)
+
+    def _enforce_limits(self, entries: List[Dict], keep: Optional[str] = None) -> List[Dict]:
+        """
+        Keep the newest max_versions entries, then evict least recently used ones over budget
+
+        Args:
+            entries: Manifest entries
+            keep: Hash that must never be evicted (the version just stored)
+
+        Returns:
+            Remaining entries
+        """
+        by_age = sorted(entries, key=lambda e: e['fetched_at'], reverse=True)
+        kept, removed = by_age[:self.max_versions], by_age[self.max_versions:]
+        if keep and all(e['hash'] != keep for e in kept):
+            kept += [e for e in removed if e['hash'] == keep]
+            removed = [e for e in removed if e['hash'] != keep]
+
+        total = sum(self._entry_bytes(e) for e in kept)
+        for entry in sorted(kept, key=lambda e: e.get('last_access', e['fetched_at'])):
+            if total <= self.max_bytes:
+                break
+            if entry['hash'] == keep:
+                continue
+            total -= self._entry_bytes(entry)
+            removed.append(entry)
+
+        removed_ids = {(e['hash'], e['source']) for e in removed}
+        remaining = [e for e in kept if (e['hash'], e['source']) not in removed_ids]
+        # Several sources may share one object; only delete files nobody references
+        still_referenced = {e['hash'] for e in remaining}
+        for entry in removed:
+            logger.info(f"Evicting cached version {entry['hash'][:12]} of {entry['source']}")
+            if entry['hash'] not in still_referenced:
+                self._remove_files(entry)
+
+        return remaining
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="List or roll back cached workbook versions")
+    parser.add_argument("--cache-folder", default=CACHE_FOLDER,
+                        help="Cache folder (SharePoint sources use <cache folder>/sources/<name>)")
+    parser.add_argument("--source", default=None, help="Path or URL of the source (default: every source)")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--list", action="store_true", help="List cached versions, newest first")
+    action.add_argument("--rollback", action="store_true",
+                        help="Reject the newest version so the previous one is served")
+    args = parser.parse_args(argv)
+
+    cache = VersionedCache(args.cache_folder)
+
+    if args.rollback:
+        current = cache.rollback(args.source)
+        if current is None:
+            return 1
+        print(f"Now serving {current['hash'][:12]} of {current['source']} (fetched {current['fetched_at']})")
+        return 0
+
+    for entry in cache.versions(args.source, include_rejected=True):
+        status = "rolled back" if entry.get('rejected') else "usable"
+        print(f"{entry['hash'][:12]}  {entry['fetched_at']}  {entry['size'] / 1024:8.0f} KB  "
+              f"{status:<11}  {entry['source']}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
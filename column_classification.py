@@ -0,0 +1,179 @@
+"""
+Column Classification - Persist root cause column decisions per sheet schema
+The percentage-vs-count decision for each BU sheet is stored in the local
+cache, keyed by a hash of the sheet's header and dtypes, and reused until
+the layout changes. An admin-maintained overrides file can pin the column
+used for a root cause (or drop it) regardless of the automatic decision.
+
+Overrides file format (JSON, "*" applies to every BU):
+    {
+        "Kruidvat": {"System Issue": "System Issue %.1", "Test Data": null},
+        "*": {"Maintenance": "Maintenance %"}
+    }
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    from config import CACHE_FOLDER, COLUMN_CLASSIFICATION_FILE, COLUMN_OVERRIDES_FILE
+except ImportError:
+    CACHE_FOLDER = ".cache"
+    COLUMN_CLASSIFICATION_FILE = "column_classification.json"
+    COLUMN_OVERRIDES_FILE = "column_overrides.json"
+
+logger = logging.getLogger(__name__)
+
+MAX_SCHEMAS_PER_BU = 5  # Older layouts of a sheet are forgotten beyond this
+
+
+def schema_hash(df: pd.DataFrame) -> str:
+    """
+    Hash a sheet's header row and column dtypes
+
+    Args:
+        df: Raw BU sheet as read from the workbook
+
+    Returns:
+        Hex SHA-256 digest (changes when columns are added, renamed, reordered or retyped)
+    """
+    schema = [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+    return hashlib.sha256(json.dumps(schema).encode('utf-8')).hexdigest()
+
+
+class ColumnClassificationStore:
+    """JSON-backed store of column decisions plus the admin overrides file"""
+
+    def __init__(self, path: str, overrides_path: Optional[str] = None):
+        """
+        Initialize the store
+
+        Args:
+            path: JSON file holding decisions per BU and schema hash
+            overrides_path: Optional admin overrides file (read-only, reloaded when it changes)
+        """
+        self.path = Path(path)
+        self.overrides_path = Path(overrides_path) if overrides_path else None
+        self._lock = threading.Lock()
+        self._decisions = None
+        self._overrides = {}
+        self._overrides_mtime = None
+
+    def _load(self) -> Dict:
+        if self._decisions is None:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self._decisions = json.load(f)
+            except FileNotFoundError:
+                self._decisions = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Unreadable column classification file, starting fresh: {e}")
+                self._decisions = {}
+        return self._decisions
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._decisions, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, bu_name: str, schema: str) -> Optional[List[str]]:
+        """
+        Look up the stored decision for a sheet layout
+
+        Args:
+            bu_name: Business unit name
+            schema: Hash from schema_hash
+
+        Returns:
+            Root cause columns chosen for this layout, or None if not classified yet
+        """
+        with self._lock:
+            entry = self._load().get(bu_name, {}).get(schema)
+        return list(entry['columns']) if entry else None
+
+    def put(self, bu_name: str, schema: str, columns: List[str]):
+        """
+        Store the decision for a sheet layout
+
+        Args:
+            bu_name: Business unit name
+            schema: Hash from schema_hash
+            columns: Root cause columns chosen by the automatic classification
+        """
+        with self._lock:
+            bu_entries = self._load().setdefault(bu_name, {})
+            bu_entries[schema] = {'columns': list(columns), 'classified_at': datetime.now().isoformat()}
+
+            # Keep only the most recent layouts of this sheet
+            for old_schema in sorted(bu_entries, key=lambda s: bu_entries[s]['classified_at'])[:-MAX_SCHEMAS_PER_BU]:
+                del bu_entries[old_schema]
+
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning(f"Could not persist column classification: {e}")
+
+    def get_overrides(self, bu_name: str) -> Dict[str, Optional[str]]:
+        """
+        Get the admin pins that apply to a BU
+
+        Args:
+            bu_name: Business unit name
+
+        Returns:
+            Mapping of root cause name -> pinned column (None = exclude the root cause)
+        """
+        if self.overrides_path is None:
+            return {}
+
+        with self._lock:
+            try:
+                mtime = self.overrides_path.stat().st_mtime_ns
+            except OSError:
+                self._overrides, self._overrides_mtime = {}, None
+                return {}
+
+            if mtime != self._overrides_mtime:
+                try:
+                    with open(self.overrides_path, encoding='utf-8') as f:
+                        self._overrides = json.load(f)
+                    logger.info(f"Loaded column overrides from {self.overrides_path}")
+                except (OSError, ValueError) as e:
+                    logger.error(f"✗ Invalid column overrides file {self.overrides_path}: {e}")
+                    self._overrides = {}
+                self._overrides_mtime = mtime
+
+            pins = dict(self._overrides.get('*', {}))
+            pins.update(self._overrides.get(bu_name, {}))
+        return pins
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_classification_store() -> ColumnClassificationStore:
+    """
+    Get the process-wide column classification store
+
+    Returns:
+        ColumnClassificationStore singleton
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ColumnClassificationStore(
+                os.path.join(CACHE_FOLDER, COLUMN_CLASSIFICATION_FILE),
+                COLUMN_OVERRIDES_FILE
+            )
+        return _store
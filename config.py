@@ -10,8 +10,44 @@ EXCEL_FILE_PATH = r"C:\Users\mbrancato\OneDrive - A.S. Watson Europe\Documents\K
 # SharePoint link (for manual download - opens in browser)
 SHAREPOINT_LINK = "https://asweu-my.sharepoint.com/:x:/g/personal/c_maestroni_eu_aswatson_com/IQDiiFh9cWnfSaV7i4kftPhZAfD0zUT5faDzqQduMg2GcrY?e=jdXTpF"
 
+# Tracker workbooks of several teams, fetched concurrently and merged into one view
+# Format: {"Team name": "https://...sharepoint.com/:x:/..."} (empty = disabled)
+SHAREPOINT_SOURCES = {}
+FETCH_MAX_CONNECTIONS = 4  # Simultaneous downloads when fetching SHAREPOINT_SOURCES
+
+# Folder with older copies of the workbook, merged into one history (None = disabled)
+ARCHIVE_FOLDER = None
+
+# Local cache of downloaded workbooks (versioned, see cache_manager.py)
+CACHE_FOLDER = ".cache"
+CACHE_FILE_NAME = "Stability.xlsx"
+CACHE_MAX_VERSIONS = 5                # Number of workbook versions to keep
+CACHE_MAX_BYTES = 200 * 1024 * 1024   # Byte budget for cached versions and derived artifacts
+CACHE_MAX_AGE_HOURS = 24              # Use the cached version without asking SharePoint if younger
+
+# Normalized series of the shared sources in a local SQLite file (see sqlite_store.py)
+ENABLE_SQLITE_STORE = True  # Materialize local/archive/SharePoint data; other processes and restarts reuse it
+SQLITE_STORE_FILE = "stability.sqlite"  # Stored in CACHE_FOLDER
+
+# Pre-rendered static pages of the default source for read-only viewers (see snapshot_server.py)
+ENABLE_SNAPSHOTS = False  # Render every BU to HTML on each new version and serve it with ETags
+SNAPSHOT_PORT = 8502      # Port of the snapshot HTTP server
+SNAPSHOT_KEEP = 2         # Snapshot versions kept on disk
+
+# Uploaded workbooks are parsed in a worker process with these limits (see sandboxed_parser.py)
+SANDBOX_UPLOADS = True                          # False = parse uploads in the dashboard process
+UPLOAD_MAX_BYTES = 50 * 1024 * 1024             # Larger uploads are rejected before parsing
+UPLOAD_MAX_UNPACKED_BYTES = 500 * 1024 * 1024   # Uncompressed size of the .xlsx parts (zip bombs)
+PARSE_TIMEOUT_SECONDS = 120                     # The worker is stopped after this many seconds
+PARSE_MEMORY_LIMIT_MB = 1024                    # Memory the worker may allocate for parsing (not on Windows)
+
+# Root cause column classification (see column_classification.py)
+COLUMN_CLASSIFICATION_FILE = "column_classification.json"  # Decisions per sheet schema, stored in CACHE_FOLDER
+COLUMN_OVERRIDES_FILE = "column_overrides.json"            # Admin-maintained pins: {"BU": {"Root Cause": "Column %"}}
+
 # Feature toggles
 ENABLE_FILE_UPLOAD = True  # Allow users to upload Excel file directly in the dashboard
+ENABLE_WARMUP = True  # Load the default source and build its charts in the background once per process (see warmup.py)
 SHOW_SHAREPOINT_LINK = True  # Show link to SharePoint file for manual download
 
 # Sheet names
@@ -38,6 +74,7 @@ DEFAULT_THRESHOLD = 0.05  # 5% - used when threshold not found in Static Values
 
 # Data processing
 PERCENTAGE_THRESHOLD = 1  # Values above this are treated as percentages (e.g., 50 vs 0.50)
+DTYPE_BACKEND = "pyarrow"  # Column storage from the reader to the data table: "pyarrow" or "numpy"
 
 # Root cause patterns (used to identify root cause columns)
 ROOT_CAUSE_PATTERNS = [
@@ -53,6 +90,9 @@ ROOT_CAUSE_PATTERNS = [
     'R Program'
 ]
 
+# Reading stops after this many consecutive blank rows (sheets formatted down to row 1,048,576)
+MAX_BLANK_ROWS = 50
+
 # Date column patterns (used to identify date/time columns)
 DATE_COLUMN_PATTERNS = ['date', 'week', 'period', 'time']
 
@@ -77,14 +117,51 @@ SHOW_DATA_TABLE = True             # Show raw data table tab
 # Grid layout
 CHARTS_PER_ROW = 2  # Number of charts to display per row
 
+# Rollups
+ROLLUP_GRANULARITIES = ["Weekly", "Monthly", "Quarterly"]  # Options offered by the chart grid selector
+
+# Overview chart: the finest rollup level with at most this many points per series is shown
+OVERVIEW_MAX_POINTS = 60
+
+# Date window offered above the charts and data table (label -> weeks, None = whole history)
+DATE_WINDOWS = {"Last 12 weeks": 12, "Last quarter": 13, "Last year": 52, "All": None}
+
+# Trend and anomaly analytics (weekly charts)
+ANALYTICS_WINDOW = 8         # Rolling window for the mean and z-score baseline (weeks)
+ANALYTICS_EWMA_SPAN = 6      # EWMA span (weeks)
+ANOMALY_Z_THRESHOLD = 2.5    # Flag weeks whose rolling z-score exceeds this (absolute value)
+
+# Breach forecast (linear trend over the most recent weeks)
+FORECAST_LOOKBACK_WEEKS = 12  # Weeks used to fit the trend
+FORECAST_MIN_POINTS = 4       # Minimum weeks with data for a forecast
+FORECAST_HORIZON_WEEKS = 8    # Weeks shown by the forecast band and the "breach soon" count
+FORECAST_BAND_Z = 1.28        # Band half-width in residual std deviations (1.28 ≈ 80%)
+
 # Export settings
 CSV_FILENAME_TEMPLATE = "{bu}_stability_data.csv"  # Template for exported CSV filename
 
+# Batch reports (python batch_report.py)
+REPORT_OUTPUT_DIR = "reports"  # Output directory for static HTML reports
+REPORT_WORKERS = None          # Worker processes for rendering (None = one per CPU)
+
 # Logging
 LOG_LEVEL = "INFO"  # Options: "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"
 
 # Performance
 CACHE_TTL = 300  # Cache time-to-live in seconds (5 minutes)
+WORKBOOK_STORE_MAX_BYTES = 512 * 1024 * 1024  # Memory budget for parsed workbook versions shared by all sessions
+PREPARED_CACHE_MAX_ENTRIES = 64  # BU sheets whose last preparation is kept for tail-append updates
+PROFILE_STARTUP = False  # Log and show per-module import times (or set STABILITY_PROFILE_STARTUP=1)
+MEMORY_PROFILE = False  # Trace allocations per pipeline stage and show a memory panel (or set STABILITY_MEMORY_PROFILE=1)
+MEMORY_TRACE_FRAMES = 1  # Stack frames kept per traced allocation (the report groups by the innermost one)
+MEMORY_REPORT_FILE = ".cache/memory_report.json"  # Where the memory panel dumps its report
+
+# File watcher (local file only: re-ingest once when OneDrive sync updates the workbook)
+ENABLE_FILE_WATCHER = True
+WATCHER_DEBOUNCE_SECONDS = 2.0   # Quiet period after the last write before re-ingesting
+WATCHER_STABLE_SECONDS = 1.0     # File size/mtime must stay unchanged for this long
+WATCHER_POLL_INTERVAL = 5.0      # Polling period when watchdog is not installed
+WATCHER_NOTIFY_INTERVAL = 5      # How often open sessions check for a new version (seconds)
 
 # UI Text
 UI_TEXT = {
@@ -0,0 +1,228 @@
+"""
+File Watcher - Detect updates to the local workbook (e.g. OneDrive sync)
+Uses file system events through watchdog when available (inotify on Linux),
+otherwise polls the file.
+Bursts of writes are debounced and the callback only fires once the file
+is stable and readable.
+"""
+
+import logging
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Return (mtime_ns, size) for a file, or None if it does not exist
+    """
+    try:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def _is_readable_workbook(path: Path) -> bool:
+    """
+    Check that the file can be opened and is a complete xlsx (zip) archive
+    """
+    try:
+        with open(path, 'rb'):
+            pass
+        return zipfile.is_zipfile(path)
+    except OSError:
+        return False
+
+
+if WATCHDOG_AVAILABLE:
+    class _WorkbookEventHandler(FileSystemEventHandler):
+        """Forward events that touch the watched file to the watcher"""
+
+        def __init__(self, watcher: "WorkbookWatcher"):
+            super().__init__()
+            self.watcher = watcher
+
+        def on_any_event(self, event):
+            paths = [getattr(event, 'src_path', ''), getattr(event, 'dest_path', '')]
+            if any(p and Path(p).name == self.watcher.path.name for p in paths):
+                self.watcher.notify()
+
+
+class WorkbookWatcher:
+    """Watch a workbook file and trigger a single re-ingest per settled update"""
+
+    def __init__(self, path, on_change: Callable[[Path], None],
+                 debounce_seconds: float = 2.0, stable_seconds: float = 1.0,
+                 poll_interval: float = 5.0, max_wait_seconds: float = 120.0):
+        """
+        Initialize the watcher
+
+        Args:
+            path: Workbook file to watch
+            on_change: Called with the path once a new version is stable and readable
+            debounce_seconds: Quiet period required after the last event
+            stable_seconds: Size and mtime must stay unchanged for this long
+            poll_interval: Polling period when inotify is not available
+            max_wait_seconds: Give up waiting for a stable file after this long
+        """
+        self.path = Path(path)
+        self.on_change = on_change
+        self.debounce_seconds = debounce_seconds
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self.max_wait_seconds = max_wait_seconds
+
+        self.version = 0  # Incremented after each successful re-ingest
+        self.last_ingested = None
+        self.mode = None  # "watchdog (<observer>)" or "polling every <n>s", set by start()
+
+        self._signature = _file_signature(self.path)
+        self._last_event = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._threads = []
+
+    def start(self):
+        """Start watching (file system events if possible, polling otherwise)"""
+        if WATCHDOG_AVAILABLE:
+            try:
+                self._observer = Observer()
+                self._observer.schedule(_WorkbookEventHandler(self), str(self.path.parent), recursive=False)
+                self._observer.start()
+                # Observer is the platform's backend: InotifyObserver, FSEventsObserver, WindowsApiObserver...
+                self.mode = f"watchdog ({type(self._observer).__name__})"
+            except Exception as e:
+                logger.warning(f"✗ File events unavailable, falling back to polling: {e}")
+                self._observer = None
+        else:
+            logger.warning("✗ watchdog is not installed, falling back to polling (pip install watchdog)")
+
+        if self._observer is None:
+            self.mode = f"polling every {self.poll_interval:g}s"
+            self._spawn(self._poll_loop, "workbook-poller")
+
+        self._spawn(self._settle_loop, "workbook-watcher")
+        logger.info(f"Watching {self.path} ({self.mode})")
+
+    def stop(self):
+        """Stop watching"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def notify(self):
+        """Record a change event (called from the event handler or poller)"""
+        with self._lock:
+            self._last_event = time.monotonic()
+        self._wakeup.set()
+
+    def _spawn(self, target, name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _poll_loop(self):
+        """Fallback: compare file signatures periodically"""
+        seen = self._signature
+        while not self._stopped.wait(self.poll_interval):
+            current = _file_signature(self.path)
+            if current != seen:
+                seen = current
+                self.notify()
+
+    def _settle_loop(self):
+        """Wait for bursts of events to settle, then re-ingest once"""
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                return
+
+            # Debounce: wait until no event arrived for debounce_seconds
+            while not self._stopped.is_set():
+                with self._lock:
+                    quiet_for = time.monotonic() - self._last_event
+                if quiet_for >= self.debounce_seconds:
+                    break
+                self._stopped.wait(self.debounce_seconds - quiet_for)
+
+            signature = self._wait_until_stable()
+            if signature is None or signature == self._signature:
+                continue
+
+            try:
+                logger.info(f"Workbook changed, re-ingesting: {self.path}")
+                self.on_change(self.path)
+                self._signature = signature
+                self.version += 1
+                self.last_ingested = time.time()
+                logger.info(f"✓ Workbook version {self.version} ready")
+            except Exception as e:
+                logger.error(f"Error re-ingesting workbook: {e}", exc_info=True)
+
+    def _wait_until_stable(self) -> Optional[Tuple[int, int]]:
+        """
+        Wait until size and mtime stop changing and the file is readable
+
+        Returns:
+            Final file signature, or None if the file never settled
+        """
+        deadline = time.monotonic() + self.max_wait_seconds
+        previous = _file_signature(self.path)
+
+        while not self._stopped.is_set() and time.monotonic() < deadline:
+            self._stopped.wait(self.stable_seconds)
+            current = _file_signature(self.path)
+            if current is not None and current == previous and _is_readable_workbook(self.path):
+                return current
+            previous = current
+
+        logger.warning(f"Workbook did not settle within {self.max_wait_seconds}s: {self.path}")
+        return None
+
+
+_shared_watchers = {}
+_shared_watchers_lock = threading.Lock()
+
+
+def get_shared_watcher(path, on_change: Callable[[Path], None], **kwargs) -> WorkbookWatcher:
+    """
+    Start (once per process) a watcher for a workbook and share it between sessions
+
+    The registry lives here rather than in the Streamlit script, whose module
+    globals are re-created on every rerun.
+
+    Args:
+        path: Workbook file to watch
+        on_change: Callback for a new watcher (ignored if one is already running)
+        **kwargs: Timing options passed to WorkbookWatcher
+
+    Returns:
+        Running WorkbookWatcher
+    """
+    key = str(path)
+    with _shared_watchers_lock:
+        watcher = _shared_watchers.get(key)
+        if watcher is None:
+            watcher = WorkbookWatcher(path, on_change, **kwargs)
+            watcher.start()
+            _shared_watchers[key] = watcher
+        return watcher
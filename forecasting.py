@@ -0,0 +1,143 @@
+"""
+Forecasting - Batched linear trend fit and projected weeks to threshold breach
+A least-squares line over the last K weeks is fitted to every (BU, root cause)
+series at once as array operations on a (series x weeks) matrix, so the whole
+workbook is forecast in a few milliseconds when the workbook cache is built.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+
+try:
+    from config import FORECAST_LOOKBACK_WEEKS, FORECAST_MIN_POINTS, FORECAST_HORIZON_WEEKS, FORECAST_BAND_Z
+except ImportError:
+    FORECAST_LOOKBACK_WEEKS = 12
+    FORECAST_MIN_POINTS = 4
+    FORECAST_HORIZON_WEEKS = 8
+    FORECAST_BAND_Z = 1.28
+
+logger = logging.getLogger(__name__)
+
+FORECAST_COLUMNS = ['bu', 'root_cause', 'latest_date', 'latest_value', 'threshold', 'level', 'slope',
+                    'points', 'x_mean', 'sxx', 'resid_std', 'weeks_to_breach', 'breach_date']
+
+WEEK = pd.Timedelta(weeks=1)
+
+
+def fit_breach_forecast(series: pd.DataFrame, lookback: int = FORECAST_LOOKBACK_WEEKS,
+                        min_points: int = FORECAST_MIN_POINTS) -> pd.DataFrame:
+    """
+    Fit a linear trend to the last weeks of every series and project when it crosses its threshold
+
+    Args:
+        series: Long frame from rollups.build_long_series (sorted by bu, root_cause, Date)
+        lookback: Number of most recent weeks used for the fit
+        min_points: Minimum non-missing weeks required for a fit
+
+    Returns:
+        One row per series with the fit (level at the latest week, slope per week, fit
+        statistics for forecast_band) plus weeks_to_breach (0 = breaching now, at least 1
+        otherwise, inf = not trending up, NaN = not enough data) and breach_date, soonest breach first
+    """
+    if series.empty:
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
+
+    grouped = series.groupby(['bu', 'root_cause'], observed=True, sort=False)
+    series_id = grouped.ngroup().to_numpy()
+    from_end = grouped.cumcount(ascending=False).to_numpy()
+    last_date = grouped['Date'].transform('max')
+
+    # Scatter the last `lookback` points of each series into (series x lookback) matrices;
+    # x is the offset in weeks from the series' latest date (gaps in the weeks are kept)
+    recent = from_end < lookback
+    n_series = int(series_id.max()) + 1
+    rows, cols = series_id[recent], lookback - 1 - from_end[recent]
+
+    y = np.full((n_series, lookback), np.nan)
+    x = np.full((n_series, lookback), np.nan)
+    y[rows, cols] = series['value'].to_numpy(dtype='float64')[recent]
+    x[rows, cols] = ((series['Date'] - last_date) / WEEK).to_numpy(dtype='float64')[recent]
+
+    # Masked least squares for all rows at once
+    mask = ~np.isnan(y) & ~np.isnan(x)
+    y0 = np.where(mask, y, 0.0)
+    x0 = np.where(mask, x, 0.0)
+    n = mask.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = x0.sum(axis=1) / n
+        y_mean = y0.sum(axis=1) / n
+        dx = np.where(mask, x0 - x_mean[:, None], 0.0)
+        dy = np.where(mask, y0 - y_mean[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        slope = (dx * dy).sum(axis=1) / sxx
+        level = y_mean - slope * x_mean  # Fitted value at the latest week (x = 0)
+
+        residuals = np.where(mask, y0 - (level[:, None] + slope[:, None] * x0), 0.0)
+        resid_std = np.sqrt((residuals ** 2).sum(axis=1) / np.maximum(n - 2, 1))
+
+        valid = (n >= min_points) & (sxx > 0)
+        first_rows = np.unique(series_id, return_index=True)[1]
+        meta = series.iloc[first_rows]
+        threshold = meta['threshold'].to_numpy(dtype='float64')
+        latest_value = y[:, -1]
+
+        # A fitted level already above the threshold while the latest week is below it
+        # projects the breach for the next week (0 is reserved for breaching now)
+        weeks_to_breach = np.where(slope > 0, np.maximum((threshold - level) / slope, 1.0), np.inf)
+        weeks_to_breach = np.where(latest_value > threshold, 0.0, weeks_to_breach)
+        weeks_to_breach = np.where(valid, weeks_to_breach, np.nan)
+
+    latest_date = pd.Series(last_date.to_numpy()[first_rows])
+    finite = np.isfinite(weeks_to_breach)
+    # Non-finite weeks become NaT dates
+    breach_date = (latest_date + pd.to_timedelta(np.where(finite, weeks_to_breach * 7, np.nan), unit='D')).dt.normalize()
+
+    forecast = pd.DataFrame({
+        'bu': meta['bu'].to_numpy(),
+        'root_cause': meta['root_cause'].to_numpy(),
+        'latest_date': latest_date.to_numpy(),
+        'latest_value': latest_value,
+        'threshold': threshold,
+        'level': np.where(valid, level, np.nan),
+        'slope': np.where(valid, slope, np.nan),
+        'points': n,
+        'x_mean': x_mean,
+        'sxx': sxx,
+        'resid_std': resid_std,
+        'weeks_to_breach': weeks_to_breach,
+        'breach_date': breach_date.to_numpy()
+    })
+
+    forecast = forecast.sort_values('weeks_to_breach', kind='stable', na_position='last').reset_index(drop=True)
+    logger.info(f"Fitted breach forecast for {n_series} series "
+                f"({int((finite & (weeks_to_breach > 0)).sum())} projected to breach)")
+    return forecast
+
+
+def forecast_band(fit: pd.Series, horizon: int = FORECAST_HORIZON_WEEKS,
+                  z: float = FORECAST_BAND_Z) -> pd.DataFrame:
+    """
+    Project one fitted series forward with a prediction band
+
+    Args:
+        fit: Row of the frame returned by fit_breach_forecast
+        horizon: Number of weeks to project
+        z: Band half-width in residual standard deviations (1.28 ≈ 80% band)
+
+    Returns:
+        Date-indexed frame with forecast, lower and upper (empty if the fit is not valid)
+    """
+    if pd.isna(fit['slope']):
+        return pd.DataFrame(columns=['forecast', 'lower', 'upper'])
+
+    steps = np.arange(horizon + 1, dtype='float64')
+    mean = fit['level'] + fit['slope'] * steps
+    spread = z * fit['resid_std'] * np.sqrt(1 + 1 / fit['points'] + (steps - fit['x_mean']) ** 2 / fit['sxx'])
+
+    return pd.DataFrame({
+        'forecast': mean,
+        'lower': np.maximum(mean - spread, 0.0),
+        'upper': mean + spread
+    }, index=pd.DatetimeIndex(pd.Timestamp(fit['latest_date']) + steps * WEEK, name='Date'))
@@ -37,6 +37,7 @@ echo.
 echo ================================================
 echo.
 
-py -m streamlit run stability_dashboard.py
+REM Starts the server and warms up the default data source before the browser connects
+py warmup.py
 
 pause
@@ -0,0 +1,254 @@
+"""
+Memory Accounting - Opt-in memory instrumentation for the workbook pipeline
+Enabled with the STABILITY_MEMORY_PROFILE=1 environment variable (or
+MEMORY_PROFILE = True in config.py). When enabled, tracemalloc runs from
+import time, each pipeline stage records its net allocation, peak and top
+allocation sites, and the report breaks the shared workbook store down by
+cached object category. When disabled every hook is a no-op.
+"""
+
+import gc
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from workbook_store import estimate_size, get_workbook_store
+
+try:
+    from config import MEMORY_PROFILE, MEMORY_TRACE_FRAMES, MEMORY_REPORT_FILE
+except ImportError:
+    MEMORY_PROFILE = False
+    MEMORY_TRACE_FRAMES = 1
+    MEMORY_REPORT_FILE = ".cache/memory_report.json"
+
+ENV_VAR = "STABILITY_MEMORY_PROFILE"
+MAX_STAGES = 100
+
+# Workbook cache keys grouped into the categories the report shows
+CATEGORIES = {
+    'bu_frames': ['bus'],
+    'thresholds_df': ['thresholds_df'],
+    'series': ['series'],
+    'rollups': ['rollups'],
+    'analytics': ['analytics'],
+    'forecast': ['forecast'],
+    'breach_index': ['breach_runs', 'breach_summary'],
+}
+
+# Objects that should not outlive a parse; counted by type name so nothing is imported for it
+LIVE_TYPES = {
+    'pandas ExcelFile': ('pandas.io.excel._base', 'ExcelFile'),
+    'openpyxl Workbook': ('openpyxl.workbook.workbook', 'Workbook'),
+    'plotly Figure': ('plotly.graph_objs._figure', 'Figure'),
+}
+
+logger = logging.getLogger(__name__)
+
+_stages = deque(maxlen=MAX_STAGES)
+_stages_lock = threading.Lock()
+
+# Allocation sites from the profiler itself and the import system are not interesting.
+# They are dropped from the grouped statistics: Snapshot.filter_traces walks every
+# trace in Python and takes seconds on a heap with pandas and openpyxl loaded.
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>",
+                  "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+def _site(stat) -> Optional[str]:
+    """File:line of a statistic, or None for ignored files"""
+    frame = stat.traceback[0]
+    if frame.filename in _IGNORED_FILES:
+        return None
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def is_enabled() -> bool:
+    """
+    Check whether memory profiling was requested
+
+    Returns:
+        bool: True if the environment variable or config flag is set
+    """
+    if os.environ.get(ENV_VAR, '').lower() in ('1', 'true', 'yes'):
+        return True
+    return bool(MEMORY_PROFILE)
+
+
+def start_if_enabled() -> bool:
+    """
+    Start tracemalloc if profiling is enabled
+
+    Returns:
+        bool: True if allocations are being traced
+    """
+    if tracemalloc.is_tracing():
+        return True
+    if not is_enabled():
+        return False
+
+    tracemalloc.start(MEMORY_TRACE_FRAMES)
+    logger.info(f"Memory profiling enabled (tracemalloc, {MEMORY_TRACE_FRAMES} frames)")
+    return True
+
+
+def is_active() -> bool:
+    """Whether allocations are being traced"""
+    return tracemalloc.is_tracing()
+
+
+@contextmanager
+def stage(name: str, top_n: int = 10):
+    """
+    Record the memory effect of one pipeline stage (no-op unless tracing)
+
+    Each traced stage takes two heap snapshots (about a second each with
+    pandas and openpyxl loaded), so this is for debugging, not production.
+    Stages run by concurrent sessions overlap in the process-wide trace, so
+    their numbers are only exact when one workbook is parsed at a time.
+
+    Args:
+        name: Stage name shown in the report
+        top_n: Number of allocation sites kept for the stage
+    """
+    if not tracemalloc.is_tracing():
+        yield
+        return
+
+    before = tracemalloc.take_snapshot()
+    current_before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        current_after, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+
+        top = []
+        for diff in after.compare_to(before, 'lineno'):
+            site = _site(diff)
+            if site is not None:
+                top.append({'site': site, 'size_diff': diff.size_diff, 'count_diff': diff.count_diff})
+                if len(top) == top_n:
+                    break
+        record = {
+            'stage': name,
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'seconds': seconds,
+            'net_bytes': current_after - current_before,
+            'peak_bytes': peak - current_before,
+            'top': top
+        }
+        with _stages_lock:
+            _stages.append(record)
+        logger.info(f"Memory stage {name}: {record['net_bytes'] / 1024:+.1f} KB net, "
+                    f"{record['peak_bytes'] / 1024:.1f} KB peak, {seconds:.2f}s")
+
+
+def get_stages() -> List[Dict]:
+    """Recorded stages, oldest first"""
+    with _stages_lock:
+        return list(_stages)
+
+
+def category_sizes(workbook: Dict) -> Dict[str, int]:
+    """
+    Deep size of one cached workbook per object category
+
+    Args:
+        workbook: Workbook cache dictionary
+
+    Returns:
+        Mapping of category -> bytes (keys not in CATEGORIES are summed as 'other')
+    """
+    sizes = {category: sum(estimate_size(workbook[key]) for key in keys if key in workbook)
+             for category, keys in CATEGORIES.items()}
+
+    grouped = {key for keys in CATEGORIES.values() for key in keys}
+    sizes['other'] = sum(estimate_size(value) for key, value in workbook.items() if key not in grouped)
+    return sizes
+
+
+def live_objects() -> Dict[str, int]:
+    """
+    Count live objects that should have been released after parsing (slow, walks the GC heap)
+
+    Returns:
+        Mapping of LIVE_TYPES label -> number of live instances
+    """
+    wanted = {(module, name): label for label, (module, name) in LIVE_TYPES.items()}
+    counts = {label: 0 for label in LIVE_TYPES}
+
+    for obj in gc.get_objects():
+        cls = type(obj)
+        label = wanted.get((cls.__module__, cls.__qualname__))
+        if label is not None:
+            counts[label] += 1
+
+    return counts
+
+
+def build_report(top_n: int = 15) -> Dict:
+    """
+    Collect the memory report
+
+    Args:
+        top_n: Number of allocation sites in the current-heap summary
+
+    Returns:
+        Dictionary with store (per-version category sizes), stages, top_allocations
+        (largest live allocation sites), traced and live_objects
+    """
+    store = []
+    for version, workbook, size in get_workbook_store().entries():
+        row = {'version': version, 'total_bytes': size}
+        row.update(category_sizes(workbook))
+        store.append(row)
+
+    report = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'store': store,
+        'stages': get_stages(),
+        'top_allocations': [],
+        'traced': None,
+        'live_objects': live_objects()
+    }
+
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        report['traced'] = {'current_bytes': current, 'peak_bytes': peak}
+        for stat in tracemalloc.take_snapshot().statistics('lineno'):
+            site = _site(stat)
+            if site is not None:
+                report['top_allocations'].append({'site': site, 'size': stat.size, 'count': stat.count})
+                if len(report['top_allocations']) == top_n:
+                    break
+
+    return report
+
+
+def dump_report(path: Optional[str] = None, top_n: int = 15) -> str:
+    """
+    Write the memory report as JSON
+
+    Args:
+        path: Output file (default MEMORY_REPORT_FILE)
+        top_n: Number of allocation sites in the current-heap summary
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path or MEMORY_REPORT_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(build_report(top_n), indent=2), encoding='utf-8')
+    logger.info(f"✓ Memory report written to {path}")
+    return str(path)
@@ -0,0 +1,131 @@
+"""
+Prepared Cache - Last prepared series of each BU sheet, for tail-append updates
+The usual weekly change to a BU sheet is one appended row. For every sheet the
+cache remembers how many raw rows were prepared, a hash of those rows, the
+per-column scale decisions and the prepared frame. When a new version of the
+sheet starts with exactly the rows seen before, only the new tail has to be
+prepared (with the same scale decisions) and appended.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from config import PREPARED_CACHE_MAX_ENTRIES
+except ImportError:
+    PREPARED_CACHE_MAX_ENTRIES = 64
+
+logger = logging.getLogger(__name__)
+
+
+def prefix_hash(df: pd.DataFrame, rows: int) -> str:
+    """
+    Hash the first rows of a raw sheet (values, dtypes and row labels)
+
+    Args:
+        df: Raw sheet restricted to the columns the preparation reads
+        rows: Number of leading rows to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    prefix = df.iloc[:rows]
+    digest = hashlib.sha256()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in prefix.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(prefix, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class PreparedSeriesCache:
+    """LRU map of (source, BU, root cause columns) -> last prepared state of that sheet"""
+
+    def __init__(self, max_entries: int = PREPARED_CACHE_MAX_ENTRIES):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Number of sheets remembered; least-recently-used ones are dropped
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.appended = 0
+        self.rebuilt = 0
+
+    def get(self, key: Tuple) -> Optional[Dict]:
+        """
+        Look up the last prepared state of a sheet
+
+        Args:
+            key: (source, BU name, root cause columns)
+
+        Returns:
+            Dictionary with rows, prefix_hash, scales and prepared, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, rows: int, digest: str, scales: Dict[str, Dict], prepared: pd.DataFrame):
+        """
+        Remember the prepared state of a sheet
+
+        Args:
+            key: (source, BU name, root cause columns)
+            rows: Number of raw rows prepared
+            digest: prefix_hash of those rows
+            scales: Per-column scale decisions used
+            prepared: Prepared frame (treat as read-only)
+        """
+        with self._lock:
+            self._entries[key] = {'rows': rows, 'prefix_hash': digest, 'scales': scales, 'prepared': prepared}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record(self, outcome: str):
+        """
+        Count how a sheet was prepared
+
+        Args:
+            outcome: "reused" (unchanged), "appended" (tail only) or "rebuilt" (full preparation)
+        """
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> Dict:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with entries, reused, appended and rebuilt
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'reused': self.reused,
+                    'appended': self.appended, 'rebuilt': self.rebuilt}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prepared_cache() -> PreparedSeriesCache:
+    """
+    Get the process-wide prepared series cache
+
+    Returns:
+        PreparedSeriesCache instance (created on first use)
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PreparedSeriesCache()
+        return _cache
@@ -0,0 +1,184 @@
+"""
+Rollups - Monthly and quarterly aggregation of prepared root cause series
+Computed once per workbook version and stored with the workbook cache
+"""
+
+import logging
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+try:
+    from config import OVERVIEW_MAX_POINTS
+except ImportError:
+    OVERVIEW_MAX_POINTS = 60
+
+logger = logging.getLogger(__name__)
+
+# Granularity label -> pandas period frequency (None = native weekly series)
+ROLLUP_FREQUENCIES = {
+    "Weekly": None,
+    "Monthly": "M",
+    "Quarterly": "Q",
+}
+
+# Approximate length of one period in weeks, used to size the overview chart
+PERIOD_WEEKS = {
+    "Weekly": 1.0,
+    "Monthly": 52 / 12,
+    "Quarterly": 13.0,
+}
+
+SERIES_COLUMNS = ['bu', 'root_cause', 'Date', 'value', 'threshold']
+
+
+def build_long_series(bus: Dict[str, Dict], default_threshold: float = 0.05) -> pd.DataFrame:
+    """
+    Stack the prepared series of every BU into a single long frame
+
+    Args:
+        bus: Mapping of BU name -> dict with 'prepared' (Date-indexed), 'root_cause_cols'
+             and 'thresholds'
+        default_threshold: Threshold used when a root cause has none defined
+
+    Returns:
+        DataFrame with columns bu, root_cause (categoricals), Date, value, threshold (float32)
+    """
+    frames = []
+
+    for bu_name, entry in bus.items():
+        prepared = entry['prepared']
+        root_cause_cols = entry['root_cause_cols']
+        if prepared is None or prepared.empty or not root_cause_cols:
+            continue
+
+        # Column-major ravel: all dates of the first root cause, then the next one
+        n_dates = len(prepared)
+        thresholds = np.array([entry['thresholds'].get(col, default_threshold) for col in root_cause_cols],
+                              dtype='float32')
+        frames.append(pd.DataFrame({
+            'bu': bu_name,
+            'root_cause': np.repeat(np.array(root_cause_cols, dtype=object), n_dates),
+            'Date': np.tile(prepared.index.to_numpy(), len(root_cause_cols)),
+            'value': prepared[root_cause_cols].to_numpy(dtype='float32').ravel(order='F'),
+            'threshold': np.repeat(thresholds, n_dates)
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=SERIES_COLUMNS)
+
+    series = pd.concat(frames, ignore_index=True)
+    series['bu'] = series['bu'].astype('category')
+    series['root_cause'] = series['root_cause'].astype('category')
+    series = series.sort_values(['bu', 'root_cause', 'Date'], kind='stable').reset_index(drop=True)
+    logger.info(f"Built long series: {len(series)} points across {series['bu'].nunique()} BUs "
+                f"({series.memory_usage(deep=True).sum() / 1024:.1f} KB)")
+    return series
+
+
+def compute_rollups(series: pd.DataFrame) -> Dict[str, Dict[str, Dict[str, pd.DataFrame]]]:
+    """
+    Resample every BU/root cause series to month and quarter in one grouped pass per level
+
+    Args:
+        series: Long frame from build_long_series
+
+    Returns:
+        Nested dict granularity -> BU -> {'values': Date-indexed wide frame of period means
+        (same shape as prepared data), 'stats': frame indexed by (root_cause, Date)
+        with mean, max, breaches and weeks}
+    """
+    rollups = {}
+
+    if series.empty:
+        return rollups
+
+    breach = series['value'] > series['threshold']
+
+    for granularity, freq in ROLLUP_FREQUENCIES.items():
+        if freq is None:
+            continue
+
+        period_start = series['Date'].dt.to_period(freq).dt.start_time
+        stats = (
+            series.assign(Period=period_start, breach=breach)
+            .groupby(['bu', 'root_cause', 'Period'], sort=True, observed=True)
+            .agg(mean=('value', 'mean'), max=('value', 'max'),
+                 breaches=('breach', 'sum'), weeks=('value', 'count'))
+            .rename_axis(index={'Period': 'Date'})
+        )
+        stats['breaches'] = stats['breaches'].astype(int)
+
+        views = {}
+        for bu_name, bu_stats in stats.groupby(level='bu', sort=False, observed=True):
+            bu_stats = bu_stats.droplevel('bu')
+            values = bu_stats['mean'].unstack(level='root_cause')
+            values.columns = values.columns.astype(str)
+            values.columns.name = None
+            views[bu_name] = {'values': values, 'stats': bu_stats}
+
+        rollups[granularity] = views
+        logger.info(f"Computed {granularity.lower()} rollups: {len(stats)} periods")
+
+    return rollups
+
+
+def get_window_start(end: pd.Timestamp, weeks: Optional[int]) -> Optional[pd.Timestamp]:
+    """
+    First date of a trailing window of weeks
+
+    Args:
+        end: Latest date of the data
+        weeks: Window length in weeks (None = whole history)
+
+    Returns:
+        Window start, or None for the whole history
+    """
+    if weeks is None:
+        return None
+    return end - pd.Timedelta(weeks=weeks - 1)
+
+
+def apply_date_window(df: pd.DataFrame, start: Optional[pd.Timestamp],
+                      granularity: str = "Weekly") -> pd.DataFrame:
+    """
+    Keep only the rows of a Date-indexed frame inside the window
+
+    Args:
+        df: Prepared data, rollup values or analytics frame (Date index)
+        start: Window start from get_window_start (None = no filtering)
+        granularity: Granularity of df; rollup periods that overlap the window are kept whole
+
+    Returns:
+        Filtered frame (the cached frame is not modified)
+    """
+    if start is None or df.empty:
+        return df
+
+    freq = ROLLUP_FREQUENCIES.get(granularity)
+    if freq is not None:
+        start = start.to_period(freq).start_time
+
+    return df.loc[df.index >= start]
+
+
+def pick_overview_granularity(start: pd.Timestamp, end: pd.Timestamp,
+                              max_points: int = OVERVIEW_MAX_POINTS) -> str:
+    """
+    Finest granularity that keeps a span within the overview point budget
+
+    Args:
+        start: First date of the visible span
+        end: Last date of the visible span
+        max_points: Maximum points per series in the overview chart
+
+    Returns:
+        Granularity label from ROLLUP_FREQUENCIES (coarsest level if none fits)
+    """
+    span_weeks = (end - start) / pd.Timedelta(weeks=1) + 1
+
+    for granularity in ROLLUP_FREQUENCIES:
+        if span_weeks / PERIOD_WEEKS[granularity] <= max_points:
+            return granularity
+
+    return list(ROLLUP_FREQUENCIES)[-1]
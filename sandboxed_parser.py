@@ -0,0 +1,364 @@
+"""
+Sandboxed Parser - Parse untrusted uploads in a separate worker process
+A malformed or huge upload parsed in the Streamlit process blocks the script
+thread and can grow the server's memory for every session. Uploads are first
+checked for size (and unpacked size, .xlsx files are zip archives), then parsed
+by `python sandboxed_parser.py --worker` with a wall-clock timeout and a memory
+cap. The worker sends the prepared series back as one Arrow IPC stream in long
+form (bu, row, root_cause, date, value) with the remaining workbook fields as
+JSON in the schema metadata; the derived views are built by the caller. The row
+position rebuilds each frame exactly, including weeks entered twice.
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from cache_manager import content_hash
+from sheet_reader import frame_from_json, frame_to_json
+
+try:
+    from config import UPLOAD_MAX_BYTES, UPLOAD_MAX_UNPACKED_BYTES, PARSE_TIMEOUT_SECONDS, PARSE_MEMORY_LIMIT_MB
+except ImportError:
+    UPLOAD_MAX_BYTES = 50 * 1024 * 1024
+    UPLOAD_MAX_UNPACKED_BYTES = 500 * 1024 * 1024
+    PARSE_TIMEOUT_SECONDS = 120
+    PARSE_MEMORY_LIMIT_MB = 1024
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows: only the timeout applies
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = str(Path(__file__).resolve())
+
+# Worker exit codes besides 0 (payload on stdout)
+EXIT_FAILED = 2        # The workbook could not be parsed; messages on stdout
+EXIT_OUT_OF_MEMORY = 3  # The memory cap was reached
+
+SERIES_SCHEMA = pa.schema([
+    ('bu', pa.dictionary(pa.int32(), pa.string())),
+    ('row', pa.int32()),
+    ('root_cause', pa.dictionary(pa.int32(), pa.string())),
+    ('date', pa.timestamp('us')),
+    ('value', pa.float32()),
+])
+
+_MB = 1024 * 1024
+
+# Content hash -> (messages, memory limit in MB or None) of uploads the worker rejected for
+# reasons that do not depend on server load, so reruns with the same file fail at once.
+# Timeouts and crashes are not remembered: they can be caused by a busy server.
+_rejected = OrderedDict()
+_rejected_lock = threading.Lock()
+REJECTED_MAX_ENTRIES = 32
+
+
+def _remember_rejection(digest: str, messages: List[str], memory_limit_mb: Optional[int] = None):
+    """
+    Remember a deterministic rejection of this content
+
+    Args:
+        digest: Content hash of the upload
+        messages: Messages reported for it
+        memory_limit_mb: Memory cap the worker ran out of (None = rejected regardless of limits)
+    """
+    with _rejected_lock:
+        _rejected[digest] = (messages, memory_limit_mb)
+        _rejected.move_to_end(digest)
+        while len(_rejected) > REJECTED_MAX_ENTRIES:
+            _rejected.popitem(last=False)
+
+
+def _previous_rejection(digest: str, memory_limit_mb: int) -> Optional[List[str]]:
+    """Messages of a remembered rejection that still applies with this memory cap, or None"""
+    with _rejected_lock:
+        entry = _rejected.get(digest)
+    if entry is None:
+        return None
+    messages, rejected_limit_mb = entry
+    if rejected_limit_mb is not None and memory_limit_mb > rejected_limit_mb:
+        return None  # A larger cap may be enough
+    return messages
+
+
+def check_upload(data: bytes, name: str) -> Optional[str]:
+    """
+    Reject uploads that are too large or not .xlsx workbooks, without parsing them
+
+    Args:
+        data: Uploaded bytes
+        name: File name, for the message
+
+    Returns:
+        Error message, or None if the file may be parsed
+    """
+    if len(data) > UPLOAD_MAX_BYTES:
+        return f"{name} is {len(data) / _MB:.1f} MB; uploads are limited to {UPLOAD_MAX_BYTES / _MB:.0f} MB"
+
+    try:
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            unpacked = sum(info.file_size for info in archive.infolist())
+    except zipfile.BadZipFile:
+        return f"{name} is not an .xlsx workbook (or the file is damaged)"
+
+    if unpacked > UPLOAD_MAX_UNPACKED_BYTES:
+        return (f"{name} unpacks to {unpacked / _MB:.0f} MB of sheet data; "
+                f"the limit is {UPLOAD_MAX_UNPACKED_BYTES / _MB:.0f} MB")
+    return None
+
+
+def encode_workbook(workbook: Dict) -> bytes:
+    """
+    Serialize a parsed workbook (without derived views) to an Arrow IPC stream
+
+    Args:
+        workbook: Dictionary from StabilityDashboard.build_workbook_cache
+
+    Returns:
+        IPC stream bytes
+    """
+    frames = []
+    for bu_name, entry in workbook['bus'].items():
+        prepared = entry['prepared']
+        if prepared.empty:
+            continue
+        wide = prepared.rename_axis('date').reset_index()
+        wide.insert(0, 'row', range(len(wide)))
+        long = wide.melt(id_vars=['row', 'date'], var_name='root_cause', value_name='value')
+        long.insert(0, 'bu', bu_name)
+        frames.append(long)
+
+    series = pd.concat(frames, ignore_index=True) if frames else \
+        pd.DataFrame({'bu': [], 'row': [], 'root_cause': [], 'date': pd.Series([], dtype='datetime64[us]'),
+                      'value': []})
+    table = pa.Table.from_pandas(series, schema=SERIES_SCHEMA, preserve_index=False)
+
+    last_modified = workbook['last_modified']
+    thresholds_df = workbook['thresholds_df']
+    meta = {
+        'data_source': workbook['data_source'],
+        'last_modified': last_modified.isoformat() if last_modified is not None else None,
+        'sheet_names': workbook['sheet_names'],
+        'available_bus': workbook['available_bus'],
+        'thresholds_df': frame_to_json(thresholds_df) if thresholds_df is not None else None,
+        'compaction': workbook['compaction'],
+        'bus': {bu_name: {'root_cause_cols': entry['root_cause_cols'], 'thresholds': entry['thresholds'],
+                          'important_kpis': entry['important_kpis']}
+                for bu_name, entry in workbook['bus'].items()},
+    }
+    table = table.replace_schema_metadata({b'workbook': json.dumps(meta).encode('utf-8')})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_workbook(payload: bytes) -> Dict:
+    """
+    Rebuild a parsed workbook from encode_workbook output
+
+    Args:
+        payload: IPC stream bytes
+
+    Returns:
+        Workbook cache dictionary without the derived views (see derive_workbook_views)
+    """
+    table = pa.ipc.open_stream(payload).read_all()
+    meta = json.loads(table.schema.metadata[b'workbook'])
+
+    series = table.to_pandas()
+    series['bu'] = series['bu'].astype(object)
+    series['root_cause'] = series['root_cause'].astype(object)
+    series_by_bu = dict(tuple(series.groupby('bu', sort=False)))
+
+    bus = {}
+    for bu_name, entry in meta['bus'].items():
+        bu_series = series_by_bu.get(bu_name)
+        if bu_series is not None and entry['root_cause_cols']:
+            # Pivot on the row position: the same date can appear on several rows
+            prepared = bu_series.pivot(index='row', columns='root_cause', values='value').sort_index()
+            prepared = prepared.reindex(columns=entry['root_cause_cols']).astype('float32')
+            prepared.index = pd.DatetimeIndex(bu_series.groupby('row')['date'].first().loc[prepared.index],
+                                              name='Date')
+            prepared.columns.name = None
+        else:
+            prepared = pd.DataFrame()
+        bus[bu_name] = dict(entry, prepared=prepared)
+
+    return {
+        'data_source': meta['data_source'],
+        'last_modified': pd.Timestamp(meta['last_modified']) if meta['last_modified'] else None,
+        'sheet_names': meta['sheet_names'],
+        'available_bus': meta['available_bus'],
+        'thresholds_df': frame_from_json(meta['thresholds_df']) if meta['thresholds_df'] else None,
+        'bus': bus,
+        'compaction': meta['compaction'],
+    }
+
+
+def parse_workbook(excel_source, on_error: Optional[Callable[[str], None]] = None,
+                   timeout: float = PARSE_TIMEOUT_SECONDS,
+                   memory_limit_mb: int = PARSE_MEMORY_LIMIT_MB) -> Optional[Dict]:
+    """
+    Parse a workbook in a worker process
+
+    Args:
+        excel_source: Uploaded file / BytesIO (or a path)
+        on_error: Optional callback for user-facing errors (e.g. st.error); defaults to logging
+        timeout: Seconds before the worker is stopped
+        memory_limit_mb: Memory the worker may allocate beyond its startup footprint
+
+    Returns:
+        Workbook cache dictionary without the derived views, or None if the upload was
+        rejected or could not be parsed (the reason is reported through on_error)
+    """
+    report = on_error or logger.error
+    if hasattr(excel_source, 'getvalue'):
+        data = excel_source.getvalue()
+        name = getattr(excel_source, 'name', None) or "Uploaded file"
+    else:
+        data = Path(excel_source).read_bytes()
+        name = Path(excel_source).name
+
+    problem = check_upload(data, name)
+    if problem is not None:
+        logger.warning(f"✗ Upload rejected: {problem}")
+        report(f"❌ {problem}")
+        return None
+
+    digest = content_hash(data)
+    previous = _previous_rejection(digest, memory_limit_mb)
+    if previous is not None:
+        for message in previous:
+            report(message)
+        return None
+
+    start = time.perf_counter()
+    command = [sys.executable, WORKER_SCRIPT, "--worker", "--name", name, "--memory-limit", str(memory_limit_mb)]
+    try:
+        result = subprocess.run(command, input=data, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"✗ Parsing {name} exceeded {timeout:g}s, worker stopped")
+        report(f"❌ {name} took longer than {timeout:g}s to read and was stopped. "
+               f"Check that the file is the stability tracker and not much larger than usual.")
+        return None
+
+    elapsed = time.perf_counter() - start
+    if result.returncode == 0:
+        try:
+            workbook = decode_workbook(result.stdout)
+        except Exception as e:
+            logger.error(f"✗ Could not decode the worker result for {name}: {e}", exc_info=True)
+            report(f"❌ Reading {name} failed: the parsed data could not be loaded ({e})")
+            return None
+        logger.info(f"✓ Parsed {name} in a worker in {elapsed:.2f}s ({len(result.stdout) / 1024:.1f} KB returned)")
+        return workbook
+
+    stderr_tail = result.stderr.decode('utf-8', 'replace')[-2000:]
+    if result.returncode == EXIT_FAILED:
+        messages = result.stdout.decode('utf-8', 'replace').splitlines() or [f"❌ Could not read {name}"]
+        _remember_rejection(digest, messages)
+    elif result.returncode == EXIT_OUT_OF_MEMORY:
+        messages = [f"❌ {name} needs more than {memory_limit_mb} MB of memory to read and was stopped"]
+        _remember_rejection(digest, messages, memory_limit_mb)
+    else:
+        messages = [f"❌ Reading {name} failed (worker exit code {result.returncode}); the file may be damaged"]
+    for message in messages:
+        report(message)
+    logger.warning(f"✗ Worker for {name} exited with {result.returncode} after {elapsed:.2f}s:\n{stderr_tail}")
+    return None
+
+
+def _limit_memory(limit_mb: int) -> bool:
+    """
+    Cap this process's address space at its current size plus limit_mb
+
+    RLIMIT_AS is used because Linux does not enforce RLIMIT_RSS; allocations beyond
+    the cap fail with MemoryError instead of growing the machine's memory use.
+
+    Returns:
+        bool: True if the cap is in place
+    """
+    if resource is None:
+        return False
+    try:
+        with open('/proc/self/statm') as statm:
+            current = int(statm.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return False
+    allowed = current + limit_mb * _MB
+    resource.setrlimit(resource.RLIMIT_AS, (allowed, allowed))
+    return True
+
+
+def _worker_main(name: str, memory_limit_mb: int) -> int:
+    """Worker entry point: read the upload from stdin, write the Arrow payload to stdout"""
+    data = sys.stdin.buffer.read()
+
+    # Heavy imports happen before the cap, so it only bounds the parse itself
+    from stability_dashboard import StabilityDashboard
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if not _limit_memory(memory_limit_mb):
+        logger.warning("Memory cap not available on this platform, only the timeout applies")
+
+    errors = []
+
+    def on_error(message: str):
+        # The dashboard reports failures from inside its except blocks; hitting the cap must not
+        # turn into a partial workbook with a BU missing
+        if isinstance(sys.exc_info()[1], MemoryError):
+            raise MemoryError(message)
+        errors.append(message)
+
+    try:
+        source = BytesIO(data)
+        source.name = name
+        workbook = StabilityDashboard(excel_source=source, on_error=on_error).build_workbook_cache(
+            derive_views=False)
+        payload = encode_workbook(workbook) if workbook is not None else None
+    except MemoryError:
+        return EXIT_OUT_OF_MEMORY
+
+    if payload is None:
+        sys.stdout.write("\n".join(errors))
+        return EXIT_FAILED
+    sys.stdout.buffer.write(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse an uploaded workbook in isolation (used by the dashboard)")
+    parser.add_argument("--worker", action="store_true", help="Read the workbook from stdin, write Arrow IPC to stdout")
+    parser.add_argument("--name", default="Uploaded file", help="File name shown as the data source")
+    parser.add_argument("--memory-limit", type=int, default=PARSE_MEMORY_LIMIT_MB, help="Memory cap in MB")
+    parser.add_argument("source", nargs="?", help="Parse this file through a worker and print a summary")
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.exit(_worker_main(args.name, args.memory_limit))
+
+    logging.basicConfig(level=logging.INFO)
+    if args.source is None:
+        parser.error("give a workbook to parse, or --worker")
+    parsed = parse_workbook(args.source, memory_limit_mb=args.memory_limit)
+    if parsed is None:
+        sys.exit(1)
+    for bu_name, entry in parsed['bus'].items():
+        print(f"{bu_name}: {len(entry['prepared'])} weeks × {len(entry['root_cause_cols'])} root causes")
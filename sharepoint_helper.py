@@ -3,82 +3,162 @@ SharePoint Helper - Download files from SharePoint/OneDrive
 Handles downloading, caching, and fallback logic
 """
 
-import requests
 from io import BytesIO
 import pandas as pd
 from pathlib import Path
 import logging
 from datetime import datetime
 
+from cache_manager import VersionedCache, CacheIntegrityError
+
+try:
+    from config import CACHE_MAX_AGE_HOURS
+except ImportError:
+    CACHE_MAX_AGE_HOURS = 24
+
 logger = logging.getLogger(__name__)
 
 
-def download_from_sharepoint(sharepoint_url: str, cache_path: str = None, force_refresh: bool = False) -> tuple[BytesIO, str]:
+def get_direct_download_url(sharepoint_url: str) -> str:
+    """
+    Convert a SharePoint/OneDrive sharing link to a direct download link
+
+    Args:
+        sharepoint_url: SharePoint file URL
+
+    Returns:
+        Direct download URL (or the original URL with download=1)
+    """
+    # Format: https://asweu-my.sharepoint.com/:x:/g/personal/.../FILE_ID?e=CODE
+    # To: https://asweu-my.sharepoint.com/personal/.../_layouts/15/download.aspx?UniqueId=FILE_ID
+
+    download_url = sharepoint_url
+
+    # Try to extract the unique ID from the sharing URL
+    if "/:x:/" in sharepoint_url or "/:w:/" in sharepoint_url or "/:p:/" in sharepoint_url:
+        try:
+            # Extract parts from URL like: https://asweu-my.sharepoint.com/:x:/g/personal/c_maestroni_eu_aswatson_com/FILE_ID?e=CODE
+            parts = sharepoint_url.split("/")
+
+            # Find the unique ID (usually starts with IQD or similar)
+            file_id = None
+            for part in parts:
+                if part.startswith("IQD") or part.startswith("EQD") or part.startswith("AQD"):
+                    # Extract just the ID before any query parameters
+                    file_id = part.split("?")[0]
+                    break
+
+            if file_id:
+                # Extract the base URL and personal path
+                base_url = "/".join(parts[:3])  # https://asweu-my.sharepoint.com
+                personal_path = "/".join(parts[4:6])  # personal/c_maestroni_eu_aswatson_com
+
+                # Construct direct download URL
+                download_url = f"{base_url}/{personal_path}/_layouts/15/download.aspx?UniqueId={file_id}"
+                logger.info(f"Converted to direct download URL: {download_url[:80]}...")
+            else:
+                # Fallback: just add download=1 parameter
+                if "download=1" not in sharepoint_url:
+                    download_url = sharepoint_url + ("&download=1" if "?" in sharepoint_url else "?download=1")
+        except Exception as e:
+            logger.warning(f"Could not convert URL to direct download: {e}")
+            # Fallback: just add download=1 parameter
+            if "download=1" not in sharepoint_url:
+                download_url = sharepoint_url + ("&download=1" if "?" in sharepoint_url else "?download=1")
+
+    return download_url
+
+
+def sniff_content(content: bytes, content_type: str) -> tuple[bool, bool]:
+    """
+    Check whether a response body is an Excel file or an HTML (login/redirect) page
+
+    Args:
+        content: Response body
+        content_type: Content-Type response header
+
+    Returns:
+        Tuple of (is_excel, is_html)
+    """
+    first_bytes = content[:100]
+    content_type = (content_type or '').lower()
+
+    # Excel files start with PK (zip format) or specific Excel magic bytes
+    is_excel = (
+        first_bytes.startswith(b'PK') or  # ZIP format (modern Excel)
+        'spreadsheet' in content_type or
+        'excel' in content_type or
+        content_type.startswith('application/vnd.openxmlformats')
+    )
+
+    # Check if it's HTML (redirect page)
+    is_html = (
+        first_bytes.startswith(b'<!DOCTYPE') or
+        first_bytes.startswith(b'<html') or
+        'text/html' in content_type
+    )
+
+    return is_excel, is_html
+
+
+def _current_cached_content(cache: VersionedCache, source: str, entry: dict, content: bytes) -> tuple[bytes, dict]:
+    """
+    Return the content to use after storing a version: if that content was
+    rolled back earlier, keep serving the current (previous) version instead
+    """
+    if not entry.get('rejected'):
+        return content, entry
+
+    cached = cache.read_latest(source)
+    if cached is None:
+        return content, entry
+
+    logger.warning(f"Version {entry['hash'][:12]} was rolled back, using {cached[1]['hash'][:12]}")
+    return cached
+
+
+def _format_fetch_time(entry: dict) -> str:
+    return datetime.fromisoformat(entry['fetched_at']).strftime("%Y-%m-%d %H:%M")
+
+
+def download_from_sharepoint(sharepoint_url: str, cache_folder: str = None, force_refresh: bool = False,
+                             cache_filename: str = "Stability.xlsx",
+                             max_age_hours: float = CACHE_MAX_AGE_HOURS) -> tuple[BytesIO, str]:
     """
     Download file from SharePoint/OneDrive with caching and fallback
 
     Args:
         sharepoint_url: SharePoint file URL
-        cache_path: Optional local cache file path
-        force_refresh: If True, ignore cache and force download from SharePoint
+        cache_folder: Optional versioned cache folder (see cache_manager.VersionedCache)
+        force_refresh: If True, ignore cache age and always ask SharePoint
+        cache_filename: Original filename recorded in the cache manifest
+        max_age_hours: Use the cached version without asking SharePoint if younger than this
 
     Returns:
         Tuple of (BytesIO object with file content, source description)
         source can be: "SharePoint", "Cache", "Local"
     """
+    cache = VersionedCache(cache_folder) if cache_folder else None
+    latest = cache.latest(sharepoint_url) if cache else None
+
     try:
         # If cache exists and we're not forcing refresh, use it if recent
-        if cache_path and Path(cache_path).exists() and not force_refresh:
-            cache_age = datetime.now().timestamp() - Path(cache_path).stat().st_mtime
-            cache_age_hours = cache_age / 3600
+        if latest and not force_refresh:
+            cache_age = datetime.now() - datetime.fromisoformat(latest['fetched_at'])
+            cache_age_hours = cache_age.total_seconds() / 3600
 
-            # Use cache if less than 24 hours old
-            if cache_age_hours < 24:
-                logger.info(f"Using recent cache (age: {cache_age_hours:.1f} hours)")
-                with open(cache_path, 'rb') as f:
-                    cache_time = datetime.fromtimestamp(Path(cache_path).stat().st_mtime).strftime("%Y-%m-%d %H:%M")
-                    return BytesIO(f.read()), f"Cache (updated: {cache_time})"
+            if cache_age_hours < max_age_hours:
+                try:
+                    content = cache.read(latest['hash'])
+                    logger.info(f"Using recent cache (age: {cache_age_hours:.1f} hours)")
+                    return BytesIO(content), f"Cache (updated: {_format_fetch_time(latest)})"
+                except CacheIntegrityError:
+                    latest = cache.latest(sharepoint_url)
 
         # Try to download from SharePoint
         logger.info(f"Downloading file from SharePoint...")
 
-        # Convert SharePoint sharing link to direct download link
-        # Format: https://asweu-my.sharepoint.com/:x:/g/personal/.../FILE_ID?e=CODE
-        # To: https://asweu-my.sharepoint.com/personal/.../_layouts/15/download.aspx?UniqueId=FILE_ID
-
-        download_url = sharepoint_url
-
-        # Try to extract the unique ID from the sharing URL
-        if "/:x:/" in sharepoint_url or "/:w:/" in sharepoint_url or "/:p:/" in sharepoint_url:
-            try:
-                # Extract parts from URL like: https://asweu-my.sharepoint.com/:x:/g/personal/c_maestroni_eu_aswatson_com/FILE_ID?e=CODE
-                parts = sharepoint_url.split("/")
-
-                # Find the unique ID (usually starts with IQD or similar)
-                file_id = None
-                for part in parts:
-                    if part.startswith("IQD") or part.startswith("EQD") or part.startswith("AQD"):
-                        # Extract just the ID before any query parameters
-                        file_id = part.split("?")[0]
-                        break
-
-                if file_id:
-                    # Extract the base URL and personal path
-                    base_url = "/".join(parts[:3])  # https://asweu-my.sharepoint.com
-                    personal_path = "/".join(parts[4:6])  # personal/c_maestroni_eu_aswatson_com
-
-                    # Construct direct download URL
-                    download_url = f"{base_url}/{personal_path}/_layouts/15/download.aspx?UniqueId={file_id}"
-                    logger.info(f"Converted to direct download URL: {download_url[:80]}...")
-                else:
-                    # Fallback: just add download=1 parameter
-                    if "download=1" not in sharepoint_url:
-                        download_url = sharepoint_url + ("&download=1" if "?" in sharepoint_url else "?download=1")
-            except Exception as e:
-                logger.warning(f"Could not convert URL to direct download: {e}")
-                # Fallback: just add download=1 parameter
-                if "download=1" not in sharepoint_url:
-                    download_url = sharepoint_url + ("&download=1" if "?" in sharepoint_url else "?download=1")
+        download_url = get_direct_download_url(sharepoint_url)
 
         # Add headers to mimic browser
         headers = {
@@ -87,29 +167,27 @@ def download_from_sharepoint(sharepoint_url: str, cache_path: str = None, force_
             'Accept-Language': 'en-US,en;q=0.5',
         }
 
-        # Attempt download with redirect following
+        # Conditional request: SharePoint answers 304 if our cached version is current
+        validators = latest.get('validators', {}) if latest else {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        # Attempt download with redirect following (requests is only needed here)
+        import requests
         response = requests.get(download_url, headers=headers, timeout=30, allow_redirects=True)
 
+        if response.status_code == 304 and latest:
+            content = cache.read(latest['hash'])
+            cache.put(content, sharepoint_url, validators, latest.get('filename'))
+            logger.info("✓ SharePoint file not modified, using cached version")
+            return BytesIO(content), "SharePoint (not modified)"
+
         if response.status_code == 200:
             # Verify that we got an Excel file, not an HTML page
             content_type = response.headers.get('Content-Type', '')
-            first_bytes = response.content[:100]
-
-            # Check if it's actually an Excel file
-            # Excel files start with PK (zip format) or specific Excel magic bytes
-            is_excel = (
-                first_bytes.startswith(b'PK') or  # ZIP format (modern Excel)
-                b'spreadsheet' in content_type.lower() or
-                b'excel' in content_type.lower() or
-                content_type.startswith('application/vnd.openxmlformats')
-            )
-
-            # Check if it's HTML (redirect page)
-            is_html = (
-                first_bytes.startswith(b'<!DOCTYPE') or
-                first_bytes.startswith(b'<html') or
-                b'text/html' in content_type.lower()
-            )
+            is_excel, is_html = sniff_content(response.content, content_type)
 
             if is_html:
                 logger.error("Received HTML page instead of Excel file - authentication may be required")
@@ -117,24 +195,28 @@ def download_from_sharepoint(sharepoint_url: str, cache_path: str = None, force_
 
             if not is_excel:
                 logger.warning(f"Unexpected content type: {content_type}")
-                logger.warning(f"First bytes: {first_bytes[:50]}")
+                logger.warning(f"First bytes: {response.content[:50]}")
                 # Don't fail immediately, let pandas try to read it
 
             logger.info("✓ File downloaded successfully from SharePoint")
-            file_content = BytesIO(response.content)
+            content = response.content
 
-            # Save to cache if path provided and content looks valid
-            if cache_path and is_excel:
+            # Save to cache if content looks valid
+            if cache and is_excel:
                 try:
-                    # Create cache directory if it doesn't exist
-                    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
-                    with open(cache_path, 'wb') as f:
-                        f.write(response.content)
-                    logger.info(f"✓ File cached locally at: {cache_path}")
+                    entry = cache.put(content, sharepoint_url, {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified')
+                    }, cache_filename)
+                    logger.info(f"✓ File cached locally in: {cache_folder}")
+
+                    if entry.get('rejected'):
+                        content, entry = _current_cached_content(cache, sharepoint_url, entry, content)
+                        return BytesIO(content), f"Cache (rolled back, updated: {_format_fetch_time(entry)})"
                 except Exception as e:
                     logger.warning(f"Could not save cache file: {e}")
 
-            return file_content, "SharePoint (live)"
+            return BytesIO(content), "SharePoint (live)"
         else:
             raise Exception(f"HTTP {response.status_code}: Could not download file")
 
@@ -142,29 +224,31 @@ def download_from_sharepoint(sharepoint_url: str, cache_path: str = None, force_
         logger.error(f"✗ Error downloading from SharePoint: {e}")
 
         # Try to use cache if available (even if old)
-        if cache_path and Path(cache_path).exists():
-            logger.info(f"⚠ Using cached file as fallback from: {cache_path}")
-            with open(cache_path, 'rb') as f:
-                cache_time = datetime.fromtimestamp(Path(cache_path).stat().st_mtime).strftime("%Y-%m-%d %H:%M")
-                return BytesIO(f.read()), f"Cache (fallback, updated: {cache_time})"
+        cached = cache.read_latest(sharepoint_url) if cache else None
+        if cached is not None:
+            content, entry = cached
+            logger.info(f"⚠ Using cached version {entry['hash'][:12]} as fallback from: {cache_folder}")
+            return BytesIO(content), f"Cache (fallback, updated: {_format_fetch_time(entry)})"
         else:
             raise Exception(f"Could not download from SharePoint and no cache available: {e}")
 
 
-def load_excel_from_sharepoint(sharepoint_url: str, cache_path: str = None, force_refresh: bool = False) -> tuple[pd.ExcelFile, str]:
+def load_excel_from_sharepoint(sharepoint_url: str, cache_folder: str = None, force_refresh: bool = False,
+                               cache_filename: str = "Stability.xlsx") -> tuple[pd.ExcelFile, str]:
     """
     Load Excel file from SharePoint with caching
 
     Args:
         sharepoint_url: SharePoint file URL
-        cache_path: Optional local cache file path
+        cache_folder: Optional versioned cache folder
         force_refresh: If True, force download from SharePoint
+        cache_filename: Original filename recorded in the cache manifest
 
     Returns:
         Tuple of (pandas ExcelFile object, source description)
     """
     try:
-        file_content, source = download_from_sharepoint(sharepoint_url, cache_path, force_refresh)
+        file_content, source = download_from_sharepoint(sharepoint_url, cache_folder, force_refresh, cache_filename)
         excel_file = pd.ExcelFile(file_content, engine='openpyxl')
         logger.info(f"✓ Excel file loaded successfully from {source}. Sheets: {excel_file.sheet_names}")
         return excel_file, source
@@ -175,28 +259,37 @@ def load_excel_from_sharepoint(sharepoint_url: str, cache_path: str = None, forc
 
 def load_excel_with_fallback(sharepoint_url: str = None, local_path: str = None,
                              cache_folder: str = ".cache", cache_filename: str = "Stability.xlsx",
-                             force_refresh: bool = False, use_sharepoint: bool = True) -> tuple[pd.ExcelFile, str]:
+                             force_refresh: bool = False, use_sharepoint: bool = True,
+                             version: str = None) -> tuple[pd.ExcelFile, str]:
     """
     Load Excel file with full fallback logic: SharePoint -> Cache -> Local File
 
     Args:
         sharepoint_url: SharePoint file URL
         local_path: Local file path as final fallback
-        cache_folder: Folder for cache files
-        cache_filename: Name of cached file
+        cache_folder: Folder for the versioned cache (None disables caching)
+        cache_filename: Original filename recorded in the cache manifest
         force_refresh: If True, force download from SharePoint
         use_sharepoint: If False, skip SharePoint and use local file only
+        version: Content hash of a cached version to load directly (e.g. after a rollback)
 
     Returns:
         Tuple of (pandas ExcelFile object, source description)
     """
-    cache_path = Path(cache_folder) / cache_filename if cache_folder else None
+    # Explicit version: served straight from the cache
+    if version:
+        if not cache_folder:
+            raise Exception("A cache folder is required to load a specific version")
+        content = VersionedCache(cache_folder).read(version)
+        excel_file = pd.ExcelFile(BytesIO(content), engine='openpyxl')
+        logger.info(f"✓ Excel file loaded from cached version {version[:12]}")
+        return excel_file, f"Cache (version {version[:12]})"
 
     # Strategy 1: Try SharePoint (if enabled)
     if use_sharepoint and sharepoint_url:
         try:
             logger.info("Attempting to load from SharePoint...")
-            excel_file, source = load_excel_from_sharepoint(sharepoint_url, str(cache_path), force_refresh)
+            excel_file, source = load_excel_from_sharepoint(sharepoint_url, cache_folder, force_refresh, cache_filename)
             return excel_file, source
         except Exception as e:
             logger.warning(f"SharePoint loading failed: {e}")
@@ -206,11 +299,22 @@ def load_excel_with_fallback(sharepoint_url: str = None, local_path: str = None,
     if local_path and Path(local_path).exists():
         try:
             logger.info(f"Loading from local file: {local_path}")
-            excel_file = pd.ExcelFile(local_path, engine='openpyxl')
+            content = Path(local_path).read_bytes()
+            source = f"Local file: {Path(local_path).name}"
+
+            # Keep a versioned copy so a bad update of the local file can be rolled back
+            if cache_folder:
+                cache = VersionedCache(cache_folder)
+                entry = cache.put(content, str(local_path), filename=Path(local_path).name)
+                if entry.get('rejected'):
+                    content, entry = _current_cached_content(cache, str(local_path), entry, content)
+                    source = f"Cache (rolled back, updated: {_format_fetch_time(entry)})"
+
+            excel_file = pd.ExcelFile(BytesIO(content), engine='openpyxl')
             logger.info(f"✓ Excel file loaded from local file. Sheets: {excel_file.sheet_names}")
-            return excel_file, f"Local file: {Path(local_path).name}"
+            return excel_file, source
         except Exception as e:
             logger.error(f"✗ Error loading local file: {e}")
             raise Exception(f"All loading methods failed. Last error: {e}")
 
-    raise Exception("No valid data source available. Please check SharePoint URL or local file path.")
\ No newline at end of file
+    raise Exception("No valid data source available. Please check SharePoint URL or local file path.")
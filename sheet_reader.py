@@ -0,0 +1,316 @@
+"""
+Sheet Reader - Read only the real data of a worksheet
+Tracker sheets often carry formatting down to row 1,048,576 or across hundreds
+of empty columns, so their stored used range is far larger than their data.
+Rows are streamed from the read-only openpyxl worksheet and reading stops after
+a run of blank rows; the width is cut at the last non-empty header cell, and
+only the requested columns are kept. Parse time follows the real data extent.
+
+With DTYPE_BACKEND = "pyarrow" the columns are built as Arrow arrays straight
+from the cell values (pandas ArrowDtype), skipping NumPy object columns.
+"""
+
+import json
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from config import MAX_BLANK_ROWS, DTYPE_BACKEND
+except ImportError:
+    MAX_BLANK_ROWS = 50
+    DTYPE_BACKEND = "pyarrow"
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None  # Optional: without it columns stay NumPy-backed
+
+if pa is None:
+    DTYPE_BACKEND = "numpy"
+
+# Keyword arguments that make pd.read_excel / pd.to_numeric return columns of the same backend
+DTYPE_BACKEND_OPTIONS = {'dtype_backend': 'pyarrow'} if DTYPE_BACKEND == "pyarrow" else {}
+
+logger = logging.getLogger(__name__)
+
+
+def _is_blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def is_number_column(series: pd.Series) -> bool:
+    """True for integer or float columns, NumPy- or Arrow-backed (not bool)"""
+    return pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_float_dtype(series.dtype)
+
+
+def get_worksheet(excel_file: pd.ExcelFile, sheet_name: str):
+    """
+    Get the streaming worksheet behind a pandas ExcelFile
+
+    Args:
+        excel_file: ExcelFile opened with the openpyxl engine
+        sheet_name: Sheet to read
+
+    Returns:
+        Read-only openpyxl worksheet, or None for other engines (callers fall back to pd.read_excel)
+    """
+    if getattr(excel_file, 'engine', None) != 'openpyxl' or not getattr(excel_file.book, 'read_only', False):
+        return None
+    return excel_file.book[sheet_name]
+
+
+def header_names(values: Iterable) -> List[str]:
+    """
+    Column names for a header row, named like pd.read_excel names them
+
+    Names are stripped, then empty cells become "Unnamed: <i>" and duplicates
+    (also ones that only differed by spaces) get ".1", ".2" suffixes, so decisions
+    keyed by column name keep matching.
+
+    Args:
+        values: Header cell values
+
+    Returns:
+        List of column names
+    """
+    names = []
+    seen = {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if _is_blank(value) else str(value).strip()
+        base = name
+        while name in seen:
+            seen[base] += 1
+            name = f"{base}.{seen[base]}"
+        seen[name] = 0
+        names.append(name)
+    return names
+
+
+def read_header(worksheet) -> List[str]:
+    """
+    Read only the header row, cut at the last non-empty cell
+
+    Args:
+        worksheet: Read-only openpyxl worksheet
+
+    Returns:
+        List of column names (empty for an empty sheet)
+    """
+    values = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    width = max((i + 1 for i, value in enumerate(values) if not _is_blank(value)), default=0)
+    return header_names(values[:width])
+
+
+def _arrow_frame(rows: List[tuple], labels: List) -> pd.DataFrame:
+    """
+    Build a DataFrame of ArrowDtype columns from row tuples
+
+    Empty strings are missing values and empty columns are float, as with
+    pd.read_excel; columns mixing types Arrow cannot hold in one array
+    (e.g. numbers and text) stay object columns.
+    """
+    import pyarrow.compute as pc
+
+    data = {}
+    columns = zip(*rows) if rows else [()] * len(labels)
+    for label, values in zip(labels, columns):
+        try:
+            array = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            data[label] = pd.Series([None if value == '' else value for value in values], dtype=object)
+            continue
+        if pa.types.is_string(array.type):
+            array = pc.if_else(pc.equal(array, ''), None, array)
+        if array.null_count == len(array):
+            array = array.cast(pa.float64())
+        data[label] = pd.Series(pd.arrays.ArrowExtensionArray(array))
+    return pd.DataFrame(data, columns=labels)
+
+
+def read_sheet(worksheet, columns: Optional[List[str]] = None, header: bool = True,
+               max_blank_rows: int = MAX_BLANK_ROWS, dtype_backend: str = DTYPE_BACKEND) -> pd.DataFrame:
+    """
+    Read a worksheet up to the end of its real data
+
+    Args:
+        worksheet: Read-only openpyxl worksheet
+        columns: Column names to keep (None = all); requires header
+        header: First row holds the column names (False = integer labels like header=None)
+        max_blank_rows: Stop after this many consecutive blank rows
+        dtype_backend: "pyarrow" for ArrowDtype columns, "numpy" for NumPy columns
+
+    Returns:
+        DataFrame with the data rows (blank rows inside the data are kept as empty rows)
+    """
+    if header:
+        names = read_header(worksheet)
+        if not names:
+            return pd.DataFrame()
+        positions = [i for i, name in enumerate(names) if columns is None or name in columns]
+        width = len(names)
+        min_row = 2
+    else:
+        positions = None
+        width = None
+        min_row = 1
+
+    rows = []
+    blank_run = 0
+    data_width = 0
+    stopped_early = False
+
+    for values in worksheet.iter_rows(min_row=min_row, max_col=width, values_only=True):
+        if all(_is_blank(value) for value in values):
+            blank_run += 1
+            if blank_run >= max_blank_rows:
+                stopped_early = True
+                break
+            continue
+
+        # Blank rows between data rows are kept, trailing ones are not
+        empty = () if positions is None else (None,) * len(positions)
+        rows.extend([empty] * blank_run)
+        blank_run = 0
+
+        if positions is None:
+            data_width = max(data_width, max(i + 1 for i, value in enumerate(values) if not _is_blank(value)))
+            rows.append(values)
+        else:
+            rows.append(tuple(values[i] for i in positions))
+
+    if positions is None:
+        rows = [tuple(row[:data_width]) + (None,) * (data_width - len(row)) for row in rows]
+        labels = list(range(data_width))
+    else:
+        labels = [names[i] for i in positions]
+
+    if dtype_backend == "pyarrow" and pa is not None:
+        df = _arrow_frame(rows, labels)
+    else:
+        df = pd.DataFrame.from_records(rows, columns=labels)
+
+        # Match pd.read_excel: empty strings are missing values and empty columns are float NaN
+        df = df.replace('', None)
+        for col in df.columns:
+            if df[col].isna().all():
+                df[col] = df[col].astype('float64')
+
+    extent = f"stopped after {max_blank_rows} blank rows" if stopped_early else "read to the end"
+    logger.info(f"Read '{worksheet.title}': {len(df)} rows × {len(df.columns)} columns "
+                f"(used range {worksheet.max_row} × {worksheet.max_column}, {extent})")
+    return df
+
+
+def _encode_cell(value):
+    """JSON value for one cell, tagged where JSON alone would lose the type"""
+    if value is None or isinstance(value, (str, bool, float)):
+        return value  # json writes NaN/Infinity for the special floats and reads them back
+    if value is pd.NA:
+        return {'na': True}
+    if value is pd.NaT:
+        return {'nat': True}
+    if isinstance(value, (np.bool_, np.integer, np.floating)):
+        return value.item()
+    if isinstance(value, int):
+        return value
+    if isinstance(value, pd.Timestamp):
+        return {'timestamp': value.isoformat()}
+    if isinstance(value, datetime):
+        return {'datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'date': value.isoformat()}
+    if isinstance(value, time):
+        return {'time': value.isoformat()}
+    if isinstance(value, pd.Timedelta):
+        return {'timedelta': value.value}
+    if isinstance(value, timedelta):
+        return {'pytimedelta': [value.days, value.seconds, value.microseconds]}
+    return str(value)
+
+
+def _decode_cell(value):
+    if not isinstance(value, dict):
+        return value
+    tag, data = next(iter(value.items()))
+    return {
+        'na': lambda: pd.NA,
+        'nat': lambda: pd.NaT,
+        'timestamp': lambda: pd.Timestamp(data),
+        'datetime': lambda: datetime.fromisoformat(data),
+        'date': lambda: date.fromisoformat(data),
+        'time': lambda: time.fromisoformat(data),
+        'timedelta': lambda: pd.Timedelta(data),
+        'pytimedelta': lambda: timedelta(*data),
+    }[tag]()
+
+
+def _dtype_spec(dtype):
+    # "string[pyarrow]" names both ArrowDtype(pa.string()) and StringDtype("pyarrow"): keep them apart
+    if isinstance(dtype, pd.StringDtype):
+        na_value = getattr(dtype, 'na_value', pd.NA)
+        return {'string': dtype.storage, 'na': 'NA' if na_value is pd.NA else 'nan'}
+    if isinstance(dtype, pd.ArrowDtype):
+        return {'arrow': str(dtype.pyarrow_dtype)}
+    return str(dtype)
+
+
+def _dtype_from_spec(spec):
+    if isinstance(spec, str):
+        return pd.api.types.pandas_dtype(spec)
+    if 'arrow' in spec:
+        try:
+            return pd.ArrowDtype(pa.type_for_alias(spec['arrow']))
+        except ValueError:
+            return pd.ArrowDtype.construct_from_string(f"{spec['arrow']}[pyarrow]")
+    if spec['na'] == 'nan':
+        return pd.StringDtype(spec['string'], na_value=np.nan)
+    return pd.StringDtype(spec['string'])
+
+
+def frame_to_json(df: pd.DataFrame) -> str:
+    """
+    Serialize a frame read from a sheet (e.g. Static Values) without losing its dtypes
+
+    Unlike DataFrame.to_json, mixed object columns keep each cell's type (text,
+    numbers, dates, None vs. NA vs. NaN) and the column dtypes and labels are kept.
+
+    Args:
+        df: Frame with a default or scalar-labelled index
+
+    Returns:
+        JSON text for frame_from_json
+    """
+    default_index = isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1
+    return json.dumps({
+        'columns': [_encode_cell(label) for label in df.columns],
+        'index': None if default_index else [_encode_cell(label) for label in df.index],
+        'dtypes': [_dtype_spec(dtype) for dtype in df.dtypes],
+        'data': [[_encode_cell(value) for value in df.iloc[:, i].astype(object)] for i in range(df.shape[1])],
+    })
+
+
+def frame_from_json(text: str) -> pd.DataFrame:
+    """
+    Rebuild a frame written by frame_to_json
+
+    Args:
+        text: JSON text
+
+    Returns:
+        DataFrame equal to the serialized one (values, dtypes, labels)
+    """
+    spec = json.loads(text)
+    index = None if spec['index'] is None else pd.Index([_decode_cell(label) for label in spec['index']])
+    columns = {}
+    for i, (values, dtype) in enumerate(zip(spec['data'], spec['dtypes'])):
+        column = pd.Series([_decode_cell(value) for value in values], dtype=object, index=index)
+        dtype = _dtype_from_spec(dtype)
+        columns[i] = column if dtype == object else column.astype(dtype)
+    df = pd.DataFrame(columns, index=index if index is not None else pd.RangeIndex(len(spec['data'][0])
+                                                                                 if spec['data'] else 0))
+    df.columns = pd.Index([_decode_cell(label) for label in spec['columns']])
+    return df
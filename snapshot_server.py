@@ -0,0 +1,317 @@
+"""
+Snapshot Server - Pre-rendered static pages for read-only viewers
+Whenever the dashboard ingests a new version of the default source, every BU's
+chart grid and breach summary is rendered once to static HTML (the same pages
+as batch_report.py) in a folder named after the version, and the "current"
+pointer is switched atomically. A small HTTP server sends the current files
+with ETags, so viewers that already have a page get a 304 until the data
+changes. Serving needs neither Streamlit nor pandas.
+
+Serve the snapshots from a separate process:
+    python snapshot_server.py --port 8502
+or set ENABLE_SNAPSHOTS = True in config.py to publish and serve from the dashboard.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    from config import CACHE_FOLDER, SNAPSHOT_PORT, SNAPSHOT_KEEP
+except ImportError:
+    CACHE_FOLDER = ".cache"
+    SNAPSHOT_PORT = 8502
+    SNAPSHOT_KEEP = 2
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FOLDER = Path(CACHE_FOLDER) / "snapshots"
+CURRENT_FILE = "current.json"
+MANIFEST_FILE = "manifest.json"
+
+_publishing = set()  # Versions being rendered in this process
+_publish_lock = threading.Lock()
+_server = None
+_server_lock = threading.Lock()
+
+
+def snapshot_id(version: str) -> str:
+    """
+    Folder name of a workbook version's snapshot
+
+    Args:
+        version: Workbook version key
+
+    Returns:
+        Short hex digest of the version
+    """
+    return hashlib.sha256(version.encode('utf-8')).hexdigest()[:16]
+
+
+def get_current(folder: Path = SNAPSHOT_FOLDER) -> Optional[Dict]:
+    """
+    Read the current snapshot pointer
+
+    Args:
+        folder: Snapshot root folder
+
+    Returns:
+        Dictionary with snapshot, version and published, or None if nothing was published
+    """
+    try:
+        return json.loads((folder / CURRENT_FILE).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path: Path, text: str):
+    """Write a file so readers never see it half-written"""
+    temp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temp.write_text(text, encoding='utf-8')
+    os.replace(temp, path)
+
+
+def publish(workbook: Dict, version: str, folder: Path = SNAPSHOT_FOLDER) -> Optional[Path]:
+    """
+    Render a workbook version to static pages and make it the current snapshot
+
+    Args:
+        workbook: Workbook cache dictionary (with the derived views)
+        version: Workbook version key
+        folder: Snapshot root folder
+
+    Returns:
+        Snapshot folder, or None if rendering failed
+    """
+    from batch_report import write_reports  # Imports the dashboard; only needed when publishing
+
+    snapshot = snapshot_id(version)
+    target = folder / snapshot
+    current = get_current(folder)
+
+    if not (target / MANIFEST_FILE).exists():
+        start = time.perf_counter()
+        staging = folder / f".{snapshot}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+
+        results = write_reports(workbook, str(staging), workers=1)
+        failed = [bu_name for bu_name, _, error in results if error]
+        if failed:
+            logger.error(f"✗ Snapshot not published, failed BUs: {', '.join(failed)}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return None
+
+        # Strong ETag per file: the content hash (plotly.min.js keeps its ETag across versions)
+        manifest = {path.name: hashlib.sha256(path.read_bytes()).hexdigest()[:32]
+                    for path in staging.iterdir() if path.is_file()}
+        (staging / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+        logger.info(f"✓ Rendered snapshot {snapshot} ({len(results)} BUs) in {time.perf_counter() - start:.2f}s")
+
+    if current is None or current['snapshot'] != snapshot:
+        _write_atomic(folder / CURRENT_FILE, json.dumps({
+            'snapshot': snapshot,
+            'version': version,
+            'published': datetime.now().isoformat(timespec='seconds')
+        }))
+        logger.info(f"✓ Published snapshot {snapshot} for {version}")
+
+    _prune(folder, keep={snapshot})
+    return target
+
+
+def _prune(folder: Path, keep: set):
+    """Delete all but the newest SNAPSHOT_KEEP snapshot folders (the current one always stays)"""
+    snapshots = sorted((path for path in folder.iterdir() if path.is_dir() and not path.name.startswith('.')),
+                       key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in snapshots[SNAPSHOT_KEEP:]:
+        if path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def publish_async(workbook: Dict, version: str, folder: Path = SNAPSHOT_FOLDER) -> bool:
+    """
+    Publish in a background thread, once per version at a time
+
+    Args:
+        workbook: Workbook cache dictionary (shared, only read)
+        version: Workbook version key
+        folder: Snapshot root folder
+
+    Returns:
+        bool: True if a render was started
+    """
+    with _publish_lock:
+        if version in _publishing:
+            return False
+        _publishing.add(version)
+
+    def run():
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            publish(workbook, version, folder)
+        except Exception as e:
+            logger.error(f"✗ Snapshot publishing failed: {e}", exc_info=True)
+        finally:
+            with _publish_lock:
+                _publishing.discard(version)
+
+    threading.Thread(target=run, name="snapshot-publish", daemon=True).start()
+    return True
+
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    """Serves the files of the current snapshot with ETag / If-None-Match revalidation"""
+
+    folder = SNAPSHOT_FOLDER
+    server_version = "StabilitySnapshot/1.0"
+
+    # Files of the current snapshot kept in memory: snapshot id -> {name: bytes}
+    _files = {}
+    _files_lock = threading.Lock()
+
+    def _resolve(self) -> Tuple[int, Optional[str], Optional[str], Optional[bytes]]:
+        """Map the request path to (status, ETag, content type, body)"""
+        current = get_current(self.folder)
+        if current is None:
+            return 503, None, None, b"No snapshot published yet\n"
+
+        snapshot = current['snapshot']
+        try:
+            manifest = json.loads((self.folder / snapshot / MANIFEST_FILE).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return 503, None, None, b"Snapshot is being replaced, retry shortly\n"
+
+        name = self.path.split('?', 1)[0].lstrip('/') or "index.html"
+        if name not in manifest:  # Only files listed in the manifest; no path traversal
+            return 404, None, None, b"Not found\n"
+
+        with self._files_lock:
+            files = self._files.get(snapshot)
+            if files is None:
+                SnapshotHandler._files = {snapshot: {}}  # Drop the previous snapshot's files
+                files = SnapshotHandler._files[snapshot]
+            body = files.get(name)
+            if body is None:
+                try:
+                    body = files[name] = (self.folder / snapshot / name).read_bytes()
+                except OSError:
+                    return 503, None, None, b"Snapshot is being replaced, retry shortly\n"
+
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type.endswith('javascript'):
+            content_type += '; charset=utf-8'
+        return 200, f'"{manifest[name]}"', content_type, body
+
+    def _send(self, include_body: bool):
+        status, etag, content_type, body = self._resolve()
+
+        if_none_match = {tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip()
+                         for tag in self.headers.get('If-None-Match', '').split(',')}
+        if status == 200 and (etag in if_none_match or '*' in if_none_match):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')  # Always revalidate, 304 while unchanged
+        self.send_header('Content-Type', content_type or 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(include_body=True)
+
+    def do_HEAD(self):
+        self._send(include_body=False)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def make_server(port: int = SNAPSHOT_PORT, folder: Path = SNAPSHOT_FOLDER,
+                host: str = "") -> ThreadingHTTPServer:
+    """
+    Create the snapshot HTTP server (not started)
+
+    Args:
+        port: Port to listen on (0 = any free port)
+        folder: Snapshot root folder
+        host: Interface to bind ("" = all)
+
+    Returns:
+        ThreadingHTTPServer instance
+    """
+    handler = type('SnapshotHandler', (SnapshotHandler,), {'folder': Path(folder)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def start_once(port: int = SNAPSHOT_PORT, folder: Path = SNAPSHOT_FOLDER) -> Optional[ThreadingHTTPServer]:
+    """
+    Start the snapshot server in a background thread, once per process
+
+    Args:
+        port: Port to listen on
+        folder: Snapshot root folder
+
+    Returns:
+        The running server, or None if the port is taken (e.g. by another worker process)
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = make_server(port, folder)
+            except OSError as e:
+                logger.warning(f"✗ Snapshot server not started on port {port}: {e}")
+                _server = False
+                return None
+            threading.Thread(target=_server.serve_forever, name="snapshot-server", daemon=True).start()
+            logger.info(f"✓ Serving snapshots on port {_server.server_address[1]}")
+        return _server or None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Serve the pre-rendered dashboard snapshots")
+    parser.add_argument("--port", type=int, default=SNAPSHOT_PORT, help="Port to listen on")
+    parser.add_argument("--folder", default=str(SNAPSHOT_FOLDER), help="Snapshot root folder")
+    parser.add_argument("--source", default=None,
+                        help="Render this workbook as the current snapshot before serving")
+    args = parser.parse_args()
+
+    folder = Path(args.folder)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    if args.source is not None:
+        from stability_dashboard import get_workbook_version, load_workbook_cache
+
+        workbook = load_workbook_cache(get_workbook_version(args.source), args.source)
+        if workbook is None or publish(workbook, get_workbook_version(args.source), folder) is None:
+            sys.exit(1)
+
+    server = make_server(args.port, folder)
+    logger.info(f"Serving snapshots from {folder} on http://localhost:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
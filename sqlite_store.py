@@ -0,0 +1,449 @@
+"""
+SQLite Store - Materialized workbook data in a local SQLite file
+Every ingested version of a shared source (local file, archive, SharePoint) is
+written as a normalized series (bu, root_cause, date, value) together with the
+Static Values thresholds and important KPIs. Refreshes are incremental: BUs
+whose data did not change are skipped and changed BUs only touch the rows that
+differ. The file survives restarts and is shared by every worker process, so a
+process that finds the current version here rebuilds its cache without reading
+the Excel file, and the dashboard queries slices and aggregates through the
+(bu, root_cause, date) primary key index.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from rollups import ROLLUP_FREQUENCIES
+from sheet_reader import frame_from_json, frame_to_json
+
+try:
+    from config import CACHE_FOLDER, SQLITE_STORE_FILE, DEFAULT_THRESHOLD
+except ImportError:
+    CACHE_FOLDER = ".cache"
+    SQLITE_STORE_FILE = "stability.sqlite"
+    DEFAULT_THRESHOLD = 0.05
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset      TEXT PRIMARY KEY,
+    version      TEXT NOT NULL,
+    meta         TEXT NOT NULL,
+    static_values TEXT,
+    refreshed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bus (
+    dataset         TEXT NOT NULL,
+    bu              TEXT NOT NULL,
+    root_cause_cols TEXT NOT NULL,
+    important_kpis  TEXT NOT NULL,
+    content_hash    TEXT NOT NULL,
+    PRIMARY KEY (dataset, bu)
+);
+CREATE TABLE IF NOT EXISTS thresholds (
+    dataset    TEXT NOT NULL,
+    bu         TEXT NOT NULL,
+    root_cause TEXT NOT NULL,
+    threshold  REAL NOT NULL,
+    PRIMARY KEY (dataset, bu, root_cause)
+);
+CREATE TABLE IF NOT EXISTS series (
+    dataset    TEXT NOT NULL,
+    bu         TEXT NOT NULL,
+    root_cause TEXT NOT NULL,
+    date       TEXT NOT NULL,
+    value      REAL,
+    PRIMARY KEY (dataset, bu, root_cause, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_series_date ON series (dataset, date);
+"""
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Granularity label -> SQL expression for the period start of series.date
+PERIOD_SQL = {
+    "Weekly": "s.date",
+    "Monthly": "datetime(s.date, 'start of month')",
+    "Quarterly": "datetime(s.date, 'start of month', "
+                 "printf('-%d months', (CAST(strftime('%m', s.date) AS INTEGER) - 1) % 3))",
+}
+
+# Timestamps inside the dataset metadata, restored on load
+_TIMESTAMP_FIELDS = ('last_modified',)
+_ARCHIVE_TIMESTAMP_FIELDS = ('last_modified', 'first_date', 'last_date')
+
+
+def _timestamp(value) -> Optional[pd.Timestamp]:
+    return None if value is None else pd.Timestamp(value)
+
+
+def _float32(value) -> Optional[float]:
+    """SQL function float32(x): round a REAL like the in-memory series (float32) stores it"""
+    return None if value is None else float(np.float32(value))
+
+
+def _json_default(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def bu_content_hash(entry: Dict) -> str:
+    """
+    Hash everything stored for one BU (prepared values, columns, thresholds, KPIs)
+
+    Args:
+        entry: Cached BU entry
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    prepared = entry['prepared']
+    if not prepared.empty:
+        digest.update(pd.util.hash_pandas_object(prepared, index=True).to_numpy().tobytes())
+    digest.update(json.dumps([entry['root_cause_cols'], entry['thresholds'], entry['important_kpis']],
+                             sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _series_rows(dataset: str, bu_name: str, entry: Dict) -> List[tuple]:
+    prepared = entry['prepared']
+    if prepared.empty or not entry['root_cause_cols']:
+        return []
+
+    # A week entered twice in the sheet keeps its last row: the primary key holds one value per date
+    if prepared.index.has_duplicates:
+        prepared = prepared[~prepared.index.duplicated(keep='last')]
+
+    dates = prepared.index.strftime(DATE_FORMAT)
+    rows = []
+    for root_cause in entry['root_cause_cols']:
+        values = prepared[root_cause].to_numpy(dtype='float64')
+        rows.extend((dataset, bu_name, root_cause, date, None if value != value else float(value))
+                    for date, value in zip(dates, values))
+    return rows
+
+
+class SeriesDatabase:
+    """SQLite file with the materialized series of each dataset"""
+
+    def __init__(self, path: str):
+        """
+        Initialize the database (tables and indexes are created if missing)
+
+        Args:
+            path: SQLite file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()  # One writer per process; other processes wait on SQLite's lock
+
+        with closing(self._connect()) as conn:
+            # WAL lets worker processes read while one of them refreshes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (one per call, so any thread can use the database)"""
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def get_version(self, dataset: str) -> Optional[str]:
+        """
+        Get the version currently materialized for a dataset
+
+        Args:
+            dataset: Dataset name (e.g. "local", "archive", "sharepoint")
+
+        Returns:
+            Version key or None if the dataset was never synced
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT version FROM datasets WHERE dataset = ?", (dataset,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, dataset: str, version: str, workbook: Dict) -> Dict:
+        """
+        Materialize a workbook version as the dataset's content, touching only what changed
+
+        Args:
+            dataset: Dataset name
+            version: Version key of the workbook
+            workbook: Workbook cache dictionary (build_workbook_cache or an archive merge)
+
+        Returns:
+            Dictionary with bus_changed, bus_unchanged, bus_removed, rows_written, rows_deleted and seconds
+        """
+        start = time.perf_counter()
+        stats = {'bus_changed': 0, 'bus_unchanged': 0, 'bus_removed': 0,
+                 'rows_written': 0, 'rows_deleted': 0, 'seconds': 0.0}
+
+        meta = {
+            'data_source': workbook['data_source'],
+            'last_modified': workbook['last_modified'],
+            'sheet_names': workbook['sheet_names'],
+            'available_bus': workbook['available_bus'],
+            'compaction': workbook.get('compaction', {}),
+            'archive_files': workbook.get('archive_files')
+        }
+        thresholds_df = workbook.get('thresholds_df')
+        static_values = frame_to_json(thresholds_df) if thresholds_df is not None else None
+
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                stored = dict(conn.execute("SELECT bu, content_hash FROM bus WHERE dataset = ?", (dataset,)))
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS staging "
+                             "(bu TEXT, root_cause TEXT, date TEXT, value REAL, PRIMARY KEY (bu, root_cause, date))")
+
+                for bu_name, entry in workbook['bus'].items():
+                    content = bu_content_hash(entry)
+                    if stored.get(bu_name) == content:
+                        stats['bus_unchanged'] += 1
+                        continue
+
+                    # Stage the new rows, then delete vanished ones and upsert only differing values
+                    conn.execute("DELETE FROM staging")
+                    conn.executemany("INSERT INTO staging VALUES (?, ?, ?, ?)",
+                                     [row[1:] for row in _series_rows(dataset, bu_name, entry)])
+                    stats['rows_deleted'] += conn.execute(
+                        "DELETE FROM series WHERE dataset = ? AND bu = ? AND NOT EXISTS ("
+                        "SELECT 1 FROM staging st WHERE st.root_cause = series.root_cause AND st.date = series.date)",
+                        (dataset, bu_name)).rowcount
+                    stats['rows_written'] += conn.execute(
+                        "INSERT INTO series (dataset, bu, root_cause, date, value) "
+                        "SELECT ?, bu, root_cause, date, value FROM staging WHERE true "
+                        "ON CONFLICT (dataset, bu, root_cause, date) DO UPDATE SET value = excluded.value "
+                        "WHERE series.value IS NOT excluded.value",
+                        (dataset,)).rowcount
+
+                    conn.execute("DELETE FROM thresholds WHERE dataset = ? AND bu = ?", (dataset, bu_name))
+                    conn.executemany("INSERT INTO thresholds VALUES (?, ?, ?, ?)",
+                                     [(dataset, bu_name, root_cause, float(threshold))
+                                      for root_cause, threshold in entry['thresholds'].items()])
+                    conn.execute("INSERT OR REPLACE INTO bus VALUES (?, ?, ?, ?, ?)",
+                                 (dataset, bu_name, json.dumps(entry['root_cause_cols']),
+                                  json.dumps(entry['important_kpis']), content))
+                    stats['bus_changed'] += 1
+
+                for bu_name in set(stored) - set(workbook['bus']):
+                    for table in ('series', 'thresholds', 'bus'):
+                        deleted = conn.execute(f"DELETE FROM {table} WHERE dataset = ? AND bu = ?",
+                                               (dataset, bu_name)).rowcount
+                        if table == 'series':
+                            stats['rows_deleted'] += deleted
+                    stats['bus_removed'] += 1
+
+                conn.execute("INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, ?)",
+                             (dataset, version, json.dumps(meta, default=_json_default), static_values,
+                              pd.Timestamp.now().isoformat(timespec='seconds')))
+                conn.execute("DROP TABLE staging")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        stats['seconds'] = time.perf_counter() - start
+        logger.info(f"✓ Synced {dataset} to SQLite in {stats['seconds']:.2f}s: {stats['bus_changed']} BUs changed, "
+                    f"{stats['bus_unchanged']} unchanged, {stats['bus_removed']} removed, "
+                    f"{stats['rows_written']} rows written, {stats['rows_deleted']} deleted")
+        return stats
+
+    def load_workbook(self, dataset: str, version: str) -> Optional[Dict]:
+        """
+        Rebuild the workbook cache of a dataset without the Excel file
+
+        Args:
+            dataset: Dataset name
+            version: Expected version key
+
+        Returns:
+            Workbook cache dictionary without the derived views (see derive_workbook_views),
+            or None if the dataset holds another version
+        """
+        start = time.perf_counter()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT version, meta, static_values FROM datasets WHERE dataset = ?",
+                               (dataset,)).fetchone()
+            if row is None or row[0] != version:
+                return None
+
+            meta = json.loads(row[1])
+            bu_rows = conn.execute("SELECT bu, root_cause_cols, important_kpis FROM bus WHERE dataset = ?",
+                                   (dataset,)).fetchall()
+            thresholds = pd.read_sql_query("SELECT bu, root_cause, threshold FROM thresholds WHERE dataset = ?",
+                                           conn, params=(dataset,))
+            series = pd.read_sql_query("SELECT bu, root_cause, date, value FROM series WHERE dataset = ?",
+                                       conn, params=(dataset,))
+
+        series['date'] = pd.to_datetime(series['date'], format=DATE_FORMAT)
+        series_by_bu = dict(tuple(series.groupby('bu', sort=False)))
+        thresholds_by_bu = dict(tuple(thresholds.groupby('bu', sort=False)))
+
+        bus = {}
+        for bu_name, root_cause_cols, important_kpis in bu_rows:
+            root_cause_cols = json.loads(root_cause_cols)
+            bu_series = series_by_bu.get(bu_name)
+            if bu_series is not None and root_cause_cols:
+                prepared = bu_series.pivot(index='date', columns='root_cause', values='value')
+                prepared = prepared.reindex(columns=root_cause_cols).astype('float32')
+                prepared.index.name = 'Date'
+                prepared.columns.name = None
+            else:
+                prepared = pd.DataFrame()
+            bu_thresholds = thresholds_by_bu.get(bu_name)
+            bus[bu_name] = {
+                'root_cause_cols': root_cause_cols,
+                'prepared': prepared,
+                'thresholds': dict(zip(bu_thresholds['root_cause'], bu_thresholds['threshold']))
+                if bu_thresholds is not None else {},
+                'important_kpis': json.loads(important_kpis)
+            }
+
+        # Same BU order as the parsed workbook
+        bus = {bu_name: bus[bu_name] for bu_name in meta['available_bus'] if bu_name in bus}
+
+        for field in _TIMESTAMP_FIELDS:
+            meta[field] = _timestamp(meta[field])
+        for archive_file in meta['archive_files'] or []:
+            for field in _ARCHIVE_TIMESTAMP_FIELDS:
+                archive_file[field] = _timestamp(archive_file[field])
+        if meta['archive_files'] is None:
+            del meta['archive_files']
+
+        workbook = dict(meta)
+        workbook['thresholds_df'] = frame_from_json(row[2]) if row[2] else None
+        workbook['bus'] = bus
+        logger.info(f"✓ Loaded {dataset} from SQLite in {time.perf_counter() - start:.2f}s "
+                    f"({len(series)} points, {len(bus)} BUs)")
+        return workbook
+
+    def query_series(self, dataset: str, bu_name: str, root_causes: Optional[List[str]] = None,
+                     start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                     version: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Query a slice of one BU's series
+
+        Args:
+            dataset: Dataset name
+            bu_name: Business unit name
+            root_causes: Root cause columns (None = all, in stored order)
+            start: First date included (None = from the beginning)
+            end: Last date included (None = to the end)
+            version: Only answer if the dataset holds this version
+
+        Returns:
+            Date-indexed wide frame (float32), or None if the dataset or version does not match
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT d.version, b.root_cause_cols FROM datasets d "
+                               "JOIN bus b ON b.dataset = d.dataset AND b.bu = ? WHERE d.dataset = ?",
+                               (bu_name, dataset)).fetchone()
+            if row is None or (version is not None and row[0] != version):
+                return None
+
+            if root_causes is None:
+                root_causes = json.loads(row[1])
+            sql, params = self._series_filter(dataset, bu_name, root_causes, start, end)
+            df = pd.read_sql_query(f"SELECT s.root_cause, s.date, s.value FROM series s WHERE {sql}",
+                                   conn, params=params)
+
+        if df.empty:
+            return pd.DataFrame(columns=root_causes, dtype='float32').rename_axis('Date')
+
+        df['date'] = pd.to_datetime(df['date'], format=DATE_FORMAT)
+        wide = df.pivot(index='date', columns='root_cause', values='value')
+        wide = wide.reindex(columns=root_causes).astype('float32').rename_axis('Date')
+        wide.columns.name = None
+        return wide
+
+    def query_aggregates(self, dataset: str, bu_name: str, granularity: str = "Monthly",
+                         start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                         version: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Aggregate one BU's series per period in SQL
+
+        Args:
+            dataset: Dataset name
+            bu_name: Business unit name
+            granularity: Key of PERIOD_SQL ("Weekly", "Monthly", "Quarterly")
+            start: Window start; the period containing it is kept whole (None = from the beginning)
+            end: Last date included (None = to the end)
+            version: Only answer if the dataset holds this version
+
+        Returns:
+            Frame indexed by (root_cause, Date) with mean, max, breaches and weeks (like the
+            rollup stats), or None if the dataset or version does not match
+        """
+        if version is not None and self.get_version(dataset) != version:
+            return None
+
+        freq = ROLLUP_FREQUENCIES.get(granularity)
+        if start is not None and freq is not None:
+            start = pd.Timestamp(start).to_period(freq).start_time
+
+        sql, params = self._series_filter(dataset, bu_name, None, start, end)
+        query = (
+            f"SELECT s.root_cause, {PERIOD_SQL[granularity]} AS period, AVG(s.value) AS mean, "
+            f"MAX(s.value) AS max, COALESCE(SUM(s.value > float32(COALESCE(t.threshold, ?))), 0) AS breaches, "
+            f"COUNT(s.value) AS weeks "
+            f"FROM series s LEFT JOIN thresholds t "
+            f"ON t.dataset = s.dataset AND t.bu = s.bu AND t.root_cause = s.root_cause "
+            f"WHERE {sql} GROUP BY s.root_cause, period ORDER BY s.root_cause, period"
+        )
+        with closing(self._connect()) as conn:
+            # Values are stored from float32; the threshold is compared at the same precision,
+            # as rollups.compute_rollups does, so exact-threshold weeks count the same
+            conn.create_function("float32", 1, _float32, deterministic=True)
+            df = pd.read_sql_query(query, conn, params=[DEFAULT_THRESHOLD] + params)
+
+        df['Date'] = pd.to_datetime(df.pop('period'), format=DATE_FORMAT)
+        df['breaches'] = df['breaches'].astype(int)
+        return df.set_index(['root_cause', 'Date'])[['mean', 'max', 'breaches', 'weeks']]
+
+    @staticmethod
+    def _series_filter(dataset: str, bu_name: str, root_causes: Optional[List[str]],
+                       start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]):
+        """WHERE clause and parameters for a BU slice (served by the primary key index)"""
+        clauses = ["s.dataset = ?", "s.bu = ?"]
+        params = [dataset, bu_name]
+        if root_causes is not None:
+            clauses.append(f"s.root_cause IN ({', '.join('?' * len(root_causes))})")
+            params += list(root_causes)
+        if start is not None:
+            clauses.append("s.date >= ?")
+            params.append(pd.Timestamp(start).strftime(DATE_FORMAT))
+        if end is not None:
+            clauses.append("s.date <= ?")
+            params.append(pd.Timestamp(end).strftime(DATE_FORMAT))
+        return " AND ".join(clauses), params
+
+
+_database = None
+_database_lock = threading.Lock()
+
+
+def get_series_database() -> SeriesDatabase:
+    """
+    Get the process-wide series database
+
+    Returns:
+        SeriesDatabase instance (created on first use)
+    """
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = SeriesDatabase(str(Path(CACHE_FOLDER) / SQLITE_STORE_FILE))
+            logger.info(f"Series database at {_database.path}")
+        return _database
@@ -3,12 +3,37 @@ Stability Dashboard - Interactive Streamlit Application
 Displays root cause analysis with threshold comparisons
 """
 
+import startup_profile
+startup_profile.install_if_enabled()  # Before the heavy imports so they are measured
+
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 import pandas as pd
-import plotly.graph_objects as go
-import streamlit as st
+
+from analytics import OVERLAY_OPTIONS, compute_analytics
+from archive import list_archive_workbooks, merge_workbook_caches
+from breaches import build_breach_index
+from cache_manager import CacheIntegrityError, VersionedCache, content_hash
+from forecasting import fit_breach_forecast, forecast_band
+from column_classification import get_classification_store, schema_hash
+from workbook_store import estimate_size, get_workbook_store
+from prepared_cache import get_prepared_cache, prefix_hash
+from sqlite_store import get_series_database
+import memory_accounting
+import sheet_reader
+from rollups import (ROLLUP_FREQUENCIES, apply_date_window, build_long_series, compute_rollups,
+                     get_window_start, pick_overview_granularity)
+
+# Plotly, Streamlit and the file watcher are imported where they are used, so the
+# batch report and other headless callers don't pay for them at import time
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+    from file_watcher import WorkbookWatcher
 
 try:
     from config import *
@@ -23,11 +48,41 @@ except ImportError:
     ENABLE_FILE_UPLOAD = True
     SHOW_SHAREPOINT_LINK = True
     SHAREPOINT_LINK = ""
+    DEFAULT_THRESHOLD = 0.05
+    ROLLUP_GRANULARITIES = ["Weekly", "Monthly", "Quarterly"]
+    ENABLE_FILE_WATCHER = True
+    WATCHER_DEBOUNCE_SECONDS = 2.0
+    WATCHER_STABLE_SECONDS = 1.0
+    WATCHER_POLL_INTERVAL = 5.0
+    WATCHER_NOTIFY_INTERVAL = 5
+    PROFILE_STARTUP = False
+    FORECAST_HORIZON_WEEKS = 8
+    ARCHIVE_FOLDER = None
+    SHAREPOINT_SOURCES = {}
+    FETCH_MAX_CONNECTIONS = 4
+    CACHE_FOLDER = ".cache"
+    CACHE_TTL = 300
+    ENABLE_WARMUP = True
+    ENABLE_SQLITE_STORE = True
+    ENABLE_SNAPSHOTS = False
+    SNAPSHOT_PORT = 8502
+    SANDBOX_UPLOADS = True
+    UPLOAD_MAX_BYTES = 50 * 1024 * 1024
+    DATE_WINDOWS = {"Last 12 weeks": 12, "Last quarter": 13, "Last year": 52, "All": None}
 
 # Configure logging
 logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO))
 logger = logging.getLogger(__name__)
 
+memory_accounting.start_if_enabled()  # No-op unless STABILITY_MEMORY_PROFILE / MEMORY_PROFILE
+
+# Data source option -> dataset in the SQLite store (uploads are private and not materialized)
+SOURCE_DATASETS = {
+    "Use local file": "local",
+    "Archive folder": "archive",
+    "SharePoint sources": "sharepoint",
+}
+
 
 def clean_column_name(col_name: str) -> str:
     """
@@ -51,10 +106,46 @@ def clean_column_name(col_name: str) -> str:
     return clean
 
 
+def get_workbook_version(excel_source) -> str:
+    """
+    Build a key identifying the current version of a workbook source
+
+    Args:
+        excel_source: Same kinds of source accepted by StabilityDashboard
+
+    Returns:
+        Version key (changes whenever the underlying file changes)
+    """
+    if isinstance(excel_source, (str, Path)):
+        file_path = Path(excel_source)
+        if not file_path.exists():
+            return f"path:{file_path}:missing"
+        stat = file_path.stat()
+        return f"path:{file_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    # In-memory files (uploads) are keyed by content, so the same workbook uploaded
+    # in several sessions or several times is parsed once
+    if hasattr(excel_source, 'getvalue'):
+        return f"upload:{content_hash(excel_source.getvalue())}"
+
+    return f"object:{id(excel_source)}"
+
+
 class StabilityDashboard:
     """Main dashboard class for stability analysis"""
 
-    def __init__(self, excel_source=None):
+    # Common root cause column patterns
+    CLASSIFIER_PATTERNS = [
+        'Maintenance', 'System Issue', 'No Defect', 'Configuration',
+        'Test Data', 'Deployment', 'System.Issue'
+    ]
+
+    # Patterns to exclude (these are not actual data columns)
+    EXCLUDE_PATTERNS = [
+        'threshold', 'treshold', 'limit', 'target', 'goal'
+    ]
+
+    def __init__(self, excel_source=None, on_error: Optional[Callable[[str], None]] = None):
         """
         Initialize the dashboard
 
@@ -63,14 +154,29 @@ class StabilityDashboard:
                 - String path to local Excel file
                 - BytesIO object from uploaded file
                 - pd.ExcelFile object
+            on_error: Optional callback for user-facing error messages (e.g. st.error);
+                      defaults to logging so the class also works outside Streamlit
         """
         self.excel_source = excel_source
+        self.on_error = on_error
         self.excel_file = None
         self.thresholds_df = None
         self.available_bus = []
         self.data_source = "Unknown"
         self.last_modified = None
 
+    def _report_error(self, message: str):
+        """
+        Surface a user-facing error message
+
+        Args:
+            message: Message to show
+        """
+        if self.on_error is not None:
+            self.on_error(message)
+        else:
+            logger.error(message)
+
     def load_excel_file(self) -> bool:
         """
         Load the Excel file from the provided source
@@ -90,7 +196,8 @@ class StabilityDashboard:
             # Case 2: BytesIO object (uploaded file)
             elif hasattr(self.excel_source, 'read'):
                 self.excel_file = pd.ExcelFile(self.excel_source, engine='openpyxl')
-                self.data_source = "Uploaded file"
+                name = getattr(self.excel_source, 'name', None)
+                self.data_source = f"File: {name}" if name else "Uploaded file"
                 logger.info(f"Successfully loaded from BytesIO")
                 logger.info(f"Sheets: {self.excel_file.sheet_names}")
                 return True
@@ -99,7 +206,7 @@ class StabilityDashboard:
             elif isinstance(self.excel_source, (str, Path)):
                 file_path = Path(self.excel_source)
                 if not file_path.exists():
-                    st.error(f"❌ Excel file not found at: {file_path}")
+                    self._report_error(f"❌ Excel file not found at: {file_path}")
                     return False
 
                 self.excel_file = pd.ExcelFile(file_path, engine='openpyxl')
@@ -110,11 +217,11 @@ class StabilityDashboard:
                 return True
 
             else:
-                st.error("❌ Invalid Excel source provided")
+                self._report_error("❌ Invalid Excel source provided")
                 return False
 
         except Exception as e:
-            st.error(f"❌ Error loading Excel file: {str(e)}")
+            self._report_error(f"❌ Error loading Excel file: {str(e)}")
             logger.error(f"Error loading Excel file: {e}", exc_info=True)
             return False
 
@@ -127,11 +234,16 @@ class StabilityDashboard:
         """
         try:
             if STATIC_VALUES_SHEET not in self.excel_file.sheet_names:
-                st.error(f"❌ '{STATIC_VALUES_SHEET}' sheet not found in Excel file")
+                self._report_error(f"❌ '{STATIC_VALUES_SHEET}' sheet not found in Excel file")
                 return False
 
             # Read the Static Values sheet WITHOUT headers (structure is custom)
-            df = pd.read_excel(self.excel_file, sheet_name=STATIC_VALUES_SHEET, header=None)
+            worksheet = sheet_reader.get_worksheet(self.excel_file, STATIC_VALUES_SHEET)
+            if worksheet is not None:
+                df = sheet_reader.read_sheet(worksheet, header=False)
+            else:
+                df = pd.read_excel(self.excel_file, sheet_name=STATIC_VALUES_SHEET, header=None,
+                                   **sheet_reader.DTYPE_BACKEND_OPTIONS)
 
             self.thresholds_df = df
             logger.info("Successfully loaded static values")
@@ -139,7 +251,7 @@ class StabilityDashboard:
             return True
 
         except Exception as e:
-            st.error(f"❌ Error loading static values: {str(e)}")
+            self._report_error(f"❌ Error loading static values: {str(e)}")
             logger.error(f"Error loading static values: {e}", exc_info=True)
             return False
 
@@ -259,6 +371,10 @@ class StabilityDashboard:
         """
         Load data for a specific BU
 
+        Only the date column and the columns the root cause classification can
+        pick (chosen from a header-only pre-read) are read, up to the end of the
+        real data rather than the sheet's formatted used range.
+
         Args:
             bu_name: Business unit name
 
@@ -267,43 +383,161 @@ class StabilityDashboard:
         """
         try:
             if bu_name not in self.excel_file.sheet_names:
-                st.error(f"❌ Sheet '{bu_name}' not found in Excel file")
+                self._report_error(f"❌ Sheet '{bu_name}' not found in Excel file")
                 return None
 
-            df = pd.read_excel(self.excel_file, sheet_name=bu_name)
+            worksheet = sheet_reader.get_worksheet(self.excel_file, bu_name)
+            if worksheet is not None:
+                header = sheet_reader.read_header(worksheet)
+                columns = self.select_needed_columns(header, bu_name)
+                df = sheet_reader.read_sheet(worksheet, columns=columns)
+                logger.info(f"Reading {len(columns)} of {len(header)} columns for {bu_name}")
+            else:
+                df = pd.read_excel(self.excel_file, sheet_name=bu_name, **sheet_reader.DTYPE_BACKEND_OPTIONS)
 
-            # Clean column names
-            df.columns = df.columns.str.strip()
+                # Clean column names
+                df.columns = df.columns.str.strip()
 
             logger.info(f"Loaded {len(df)} rows for BU: {bu_name}")
             return df
 
         except Exception as e:
-            st.error(f"❌ Error loading data for {bu_name}: {str(e)}")
+            self._report_error(f"❌ Error loading data for {bu_name}: {str(e)}")
             logger.error(f"Error loading BU data: {e}", exc_info=True)
             return None
 
-    def identify_root_cause_columns(self, df: pd.DataFrame) -> List[str]:
+    @staticmethod
+    def find_date_column(columns) -> Optional[str]:
+        """
+        Find the date column of a BU sheet
+
+        Args:
+            columns: Column names
+
+        Returns:
+            First column whose name contains "date" or "week", or None
+        """
+        for col in columns:
+            if 'date' in str(col).lower() or 'week' in str(col).lower():
+                return col
+        return None
+
+    def is_root_cause_candidate(self, col) -> bool:
+        """
+        Check whether a column name can hold a root cause (the classifier still checks its values)
+
+        Args:
+            col: Column name
+
+        Returns:
+            bool: True if the name matches a root cause pattern and no exclude pattern
+        """
+        col_clean = str(col).strip().lower()
+        if any(exclude.lower() in col_clean for exclude in self.EXCLUDE_PATTERNS):
+            return False
+        return any(pattern.lower() in col_clean for pattern in self.CLASSIFIER_PATTERNS)
+
+    def select_needed_columns(self, header: List[str], bu_name: str) -> List[str]:
+        """
+        Pick the columns worth reading from a header-only pre-read
+
+        Args:
+            header: Column names of the BU sheet
+            bu_name: Business unit name (its override pins are always read)
+
+        Returns:
+            Date column, root cause candidates and pinned columns, in sheet order
+        """
+        pinned = set(get_classification_store().get_overrides(bu_name).values())
+        date_col = self.find_date_column(header)
+        return [col for col in header
+                if col == date_col or col in pinned or self.is_root_cause_candidate(col)]
+
+    def identify_root_cause_columns(self, df: pd.DataFrame, bu_name: Optional[str] = None) -> List[str]:
         """
         Identify root cause columns in the dataframe
 
+        With a BU name, the decision is reused from the local cache while the sheet's
+        header and dtypes are unchanged, and admin overrides are applied on top.
+
         Args:
             df: Input dataframe
+            bu_name: Optional business unit name (enables persisted decisions and overrides)
 
         Returns:
             List of root cause column names
         """
-        # Common root cause column patterns
-        root_cause_patterns = [
-            'Maintenance', 'System Issue', 'No Defect', 'Configuration',
-            'Test Data', 'Deployment', 'System.Issue'
-        ]
+        if bu_name is None:
+            return self._classify_root_cause_columns(df)
 
-        # Patterns to exclude (these are not actual data columns)
-        exclude_patterns = [
-            'threshold', 'treshold', 'limit', 'target', 'goal'
-        ]
+        store = get_classification_store()
+        schema = schema_hash(df)
+        root_cause_cols = store.get(bu_name, schema)
 
+        if root_cause_cols is not None and all(col in df.columns for col in root_cause_cols):
+            logger.info(f"Reusing column classification for {bu_name} (schema {schema[:12]}): {root_cause_cols}")
+        else:
+            root_cause_cols = self._classify_root_cause_columns(df)
+            store.put(bu_name, schema, root_cause_cols)
+
+        return self._apply_column_overrides(df, bu_name, root_cause_cols, store.get_overrides(bu_name))
+
+    def _apply_column_overrides(self, df: pd.DataFrame, bu_name: str, root_cause_cols: List[str],
+                                pins: Dict[str, Optional[str]]) -> List[str]:
+        """
+        Apply admin pins to the automatically chosen root cause columns
+
+        Args:
+            df: Input dataframe
+            bu_name: Business unit name
+            root_cause_cols: Automatically chosen columns
+            pins: Root cause name -> pinned column (None = exclude)
+
+        Returns:
+            Final list of root cause column names
+        """
+        if not pins:
+            return root_cause_cols
+
+        result = []
+        pinned_bases = set()
+
+        for col in root_cause_cols:
+            base_name = clean_column_name(col)
+            if base_name in pins:
+                pinned_bases.add(base_name)
+                pinned = pins[base_name]
+                if pinned is None:
+                    logger.info(f"Override: excluding '{col}' for {bu_name}")
+                    continue
+                if pinned in df.columns:
+                    if pinned != col:
+                        logger.info(f"Override: using '{pinned}' instead of '{col}' for {bu_name}")
+                    col = pinned
+                else:
+                    logger.warning(f"Override column '{pinned}' not found in {bu_name}, keeping '{col}'")
+            result.append(col)
+
+        # Pins for root causes the classification did not pick at all
+        for base_name, pinned in pins.items():
+            if base_name in pinned_bases or pinned is None or pinned in result:
+                continue
+            if pinned in df.columns:
+                logger.info(f"Override: adding '{pinned}' for {bu_name}")
+                result.append(pinned)
+
+        return result
+
+    def _classify_root_cause_columns(self, df: pd.DataFrame) -> List[str]:
+        """
+        Classify columns as percentage or count and pick one column per root cause
+
+        Args:
+            df: Input dataframe
+
+        Returns:
+            List of root cause column names
+        """
         # STRATEGY: Two-pass approach
         # Pass 1: Find all columns with " %" or "%" suffix (calculated percentages)
         # Pass 2: Only if no % column found for a root cause, add the non-% version
@@ -316,14 +550,14 @@ class StabilityDashboard:
             col_clean = str(col).strip()
 
             # Skip if column contains excluded patterns (like "threshold")
-            if any(exclude.lower() in col_clean.lower() for exclude in exclude_patterns):
+            if any(exclude.lower() in col_clean.lower() for exclude in self.EXCLUDE_PATTERNS):
                 logger.info(f"Skipping threshold/reference column: {col_clean}")
                 continue
 
             # Check if column name matches root cause patterns
-            if any(pattern.lower() in col_clean.lower() for pattern in root_cause_patterns):
+            if self.is_root_cause_candidate(col):
                 # Verify it contains numeric or percentage data
-                if df[col].dtype in ['float64', 'int64'] or \
+                if sheet_reader.is_number_column(df[col]) or \
                    (df[col].dtype == 'object' and df[col].astype(str).str.contains('%').any()):
 
                     sample_values = df[col].dropna()
@@ -402,13 +636,24 @@ class StabilityDashboard:
         Returns:
             Prepared dataframe with date and percentage values
         """
+        return self._prepare_with_scales(df, root_cause_cols)[0]
+
+    def _prepare_with_scales(self, df: pd.DataFrame, root_cause_cols: List[str],
+                             scales: Optional[Dict[str, Dict]] = None) -> Tuple[pd.DataFrame, Dict[str, Dict]]:
+        """
+        Prepare data, deciding the per-column scale or reusing given decisions
+
+        Args:
+            df: Input dataframe
+            root_cause_cols: List of root cause column names
+            scales: Decisions from decide_column_scales (None = decide from this data)
+
+        Returns:
+            Tuple of (prepared dataframe, scale decisions used)
+        """
         try:
             # Find date column
-            date_col = None
-            for col in df.columns:
-                if 'date' in str(col).lower() or 'week' in str(col).lower():
-                    date_col = col
-                    break
+            date_col = self.find_date_column(df.columns)
 
             if date_col is None:
                 # Use index as date
@@ -428,42 +673,12 @@ class StabilityDashboard:
 
             if len(df_plot) == 0:
                 logger.error("All rows dropped after date processing!")
-                return pd.DataFrame()
+                return pd.DataFrame(), scales or {}
 
             # Convert percentage strings to floats
-            for col in root_cause_cols:
-                col_name = str(col).strip()
-
-                # Check if this is a "%" column (already calculated as percentage)
-                is_pct_column = col_name.endswith(' %') or col_name.endswith('%')
-
-                if df_plot[col].dtype == 'object':
-                    # Handle string percentages like "5.00%"
-                    df_plot[col] = df_plot[col].astype(str).str.replace('%', '').str.strip()
-                    df_plot[col] = pd.to_numeric(df_plot[col], errors='coerce')
-                    # If it was a string with %, it's likely already a percentage that needs division
-                    if not is_pct_column:
-                        df_plot[col] = df_plot[col] / 100
-                elif df_plot[col].dtype in ['float64', 'int64']:
-                    # If column name ends with " %" or "%", values are already in decimal format
-                    # (e.g., 0.0030 = 0.30%, 0.0230 = 2.30%)
-                    if is_pct_column:
-                        # Values are already correct: 0.0030 = 0.30%
-                        # No conversion needed!
-                        logger.info(f"Column '{col}' is percentage column, keeping values as-is (decimal format)")
-                        pass
-                    else:
-                        # Non-% columns: check if values look like raw numbers needing conversion
-                        sample_values = df_plot[col].dropna()
-                        if len(sample_values) > 0:
-                            # If more than 50% of non-zero values are > 1, assume it's percentage format
-                            non_zero_values = sample_values[sample_values != 0]
-                            if len(non_zero_values) > 0:
-                                pct_above_one = (non_zero_values > 1).sum() / len(non_zero_values)
-                                if pct_above_one > 0.5:
-                                    # Values are in percentage format (e.g., 50 for 50%)
-                                    df_plot[col] = df_plot[col] / 100
-                                # Otherwise, values are already in decimal format (e.g., 0.50 for 50%)
+            if scales is None:
+                scales = self.decide_column_scales(df_plot, root_cause_cols)
+            df_plot = self.apply_column_scales(df_plot, scales)
 
             # Remove rows with all NaN values in root cause columns
             df_plot = df_plot.dropna(subset=root_cause_cols, how='all')
@@ -476,26 +691,189 @@ class StabilityDashboard:
                         sample = df_plot[col].head(3).tolist()
                         logger.info(f"  {col} sample: {sample}")
 
-            return df_plot
+            return df_plot, scales
 
         except Exception as e:
             logger.error(f"Error preparing time series data: {e}", exc_info=True)
-            return pd.DataFrame()
+            return pd.DataFrame(), scales or {}
+
+    def decide_column_scales(self, df_plot: pd.DataFrame, root_cause_cols: List[str]) -> Dict[str, Dict]:
+        """
+        Decide how each root cause column is converted to a decimal fraction
+
+        Args:
+            df_plot: Data with the root cause columns as read from the sheet
+            root_cause_cols: List of root cause column names
+
+        Returns:
+            Column -> {'parse_strings': strip "%" and parse, 'divisor': 1 or 100}
+        """
+        scales = {}
+        for col in root_cause_cols:
+            col_name = str(col).strip()
+
+            # Check if this is a "%" column (already calculated as percentage)
+            is_pct_column = col_name.endswith(' %') or col_name.endswith('%')
+
+            if df_plot[col].dtype == 'object':
+                # Handle string percentages like "5.00%"
+                # If it was a string with %, it's likely already a percentage that needs division
+                scales[col] = {'parse_strings': True, 'divisor': 1 if is_pct_column else 100}
+            elif sheet_reader.is_number_column(df_plot[col]):
+                # If column name ends with " %" or "%", values are already in decimal format
+                # (e.g., 0.0030 = 0.30%, 0.0230 = 2.30%)
+                divisor = 1
+                if is_pct_column:
+                    # Values are already correct: 0.0030 = 0.30%
+                    # No conversion needed!
+                    logger.info(f"Column '{col}' is percentage column, keeping values as-is (decimal format)")
+                else:
+                    # Non-% columns: check if values look like raw numbers needing conversion
+                    sample_values = df_plot[col].dropna()
+                    if len(sample_values) > 0:
+                        # If more than 50% of non-zero values are > 1, assume it's percentage format
+                        non_zero_values = sample_values[sample_values != 0]
+                        if len(non_zero_values) > 0:
+                            pct_above_one = (non_zero_values > 1).sum() / len(non_zero_values)
+                            if pct_above_one > 0.5:
+                                # Values are in percentage format (e.g., 50 for 50%)
+                                divisor = 100
+                            # Otherwise, values are already in decimal format (e.g., 0.50 for 50%)
+                scales[col] = {'parse_strings': False, 'divisor': divisor}
+            else:
+                scales[col] = {'parse_strings': False, 'divisor': 1}
+        return scales
+
+    def apply_column_scales(self, df_plot: pd.DataFrame, scales: Dict[str, Dict]) -> pd.DataFrame:
+        """
+        Convert the root cause columns with the given scale decisions
+
+        Args:
+            df_plot: Data with the root cause columns as read from the sheet (modified in place)
+            scales: Decisions from decide_column_scales
+
+        Returns:
+            The converted dataframe
+        """
+        for col, scale in scales.items():
+            if scale['parse_strings']:
+                df_plot[col] = df_plot[col].astype(str).str.replace('%', '').str.strip()
+                df_plot[col] = pd.to_numeric(df_plot[col], errors='coerce', **sheet_reader.DTYPE_BACKEND_OPTIONS)
+            if scale['divisor'] != 1:
+                df_plot[col] = df_plot[col] / scale['divisor']
+        return df_plot
+
+    def prepare_bu_data(self, df: pd.DataFrame, root_cause_cols: List[str], bu_name: str) -> pd.DataFrame:
+        """
+        Prepare a BU sheet, reusing the previous preparation of the same sheet when possible
+
+        If the sheet starts with exactly the raw rows prepared last time, only the
+        appended tail is prepared (with the previous scale decisions) and added to
+        the previous result. Any other change prepares the whole sheet again.
+
+        Args:
+            df: Raw BU sheet
+            root_cause_cols: List of root cause column names
+            bu_name: Business unit name
+
+        Returns:
+            Prepared dataframe (as prepare_time_series_data)
+        """
+        cache = get_prepared_cache()
+        key = (self.data_source, bu_name, tuple(root_cause_cols))
+        date_col = self.find_date_column(df.columns)
+        raw = df[([date_col] if date_col is not None else []) + root_cause_cols]
+
+        previous = cache.get(key)
+        if previous is not None and len(raw) >= previous['rows'] and \
+                prefix_hash(raw, previous['rows']) == previous['prefix_hash']:
+            if len(raw) == previous['rows']:
+                cache.record('reused')
+                logger.info(f"Sheet {bu_name} unchanged, reusing prepared data")
+                return previous['prepared']
+
+            prepared = self._append_tail(raw.iloc[previous['rows']:], root_cause_cols, previous)
+            if prepared is not None:
+                cache.put(key, len(raw), prefix_hash(raw, len(raw)), previous['scales'], prepared)
+                cache.record('appended')
+                logger.info(f"Appended {len(raw) - previous['rows']} rows to {bu_name} "
+                            f"(scale decisions reused: {previous['scales']})")
+                return prepared
+
+        prepared, scales = self._prepare_with_scales(df, root_cause_cols)
+        if not prepared.empty:
+            cache.put(key, len(raw), prefix_hash(raw, len(raw)), scales, prepared)
+        cache.record('rebuilt')
+        logger.info(f"Prepared {bu_name} from scratch (scale decisions: {scales})")
+        return prepared
+
+    def _append_tail(self, tail: pd.DataFrame, root_cause_cols: List[str], previous: Dict) -> Optional[pd.DataFrame]:
+        """
+        Prepare appended rows and add them to the previous result
+
+        Returns:
+            Combined prepared dataframe, or None when the tail cannot simply be appended
+            (earlier dates, or values the previous scale decisions cannot convert)
+        """
+        scales = previous['scales']
+        for col in root_cause_cols:
+            if not scales[col]['parse_strings'] and tail[col].dtype.kind not in 'iufb' and tail[col].notna().any():
+                logger.info(f"Column '{col}' now holds text, preparing the whole sheet")
+                return None
+
+        prepared_tail, _ = self._prepare_with_scales(tail, root_cause_cols, scales)
+        if prepared_tail.empty:
+            return previous['prepared']
+        if prepared_tail['Date'].min() <= previous['prepared']['Date'].max():
+            logger.info("Appended rows are not after the previous data, preparing the whole sheet")
+            return None
+
+        return pd.concat([previous['prepared'], prepared_tail])
+
+    def compact_time_series_data(self, df: pd.DataFrame, root_cause_cols: List[str]) -> pd.DataFrame:
+        """
+        Shrink prepared data for caching: Date index and float32 root cause values only
+
+        Args:
+            df: Prepared dataframe from prepare_time_series_data
+            root_cause_cols: List of root cause column names
+
+        Returns:
+            Compact dataframe indexed by Date
+        """
+        if df.empty:
+            return df
+
+        return df.set_index('Date')[root_cause_cols].astype('float32')
 
     def create_root_cause_chart(self, df: pd.DataFrame, root_cause: str,
-                               threshold: float, important_kpis: List[str]) -> go.Figure:
+                               threshold: float, important_kpis: List[str],
+                               rollup_stats: Optional[pd.DataFrame] = None,
+                               analytics: Optional[Dict[str, pd.DataFrame]] = None,
+                               overlays: Optional[List[str]] = None,
+                               forecast: Optional[pd.DataFrame] = None,
+                               initial_weeks: Optional[int] = 12) -> "go.Figure":
         """
         Create interactive chart for a specific root cause
 
         Args:
-            df: Prepared dataframe
+            df: Compact prepared dataframe (weekly) or rollup values (monthly/quarterly), Date-indexed
             root_cause: Name of the root cause
             threshold: Threshold value for this root cause
             important_kpis: List of important KPIs
+            rollup_stats: Optional rollup stats indexed by (root_cause, Date); when given,
+                          the chart shows period averages with max and breach count on hover
+            analytics: Optional weekly analytics frames from analytics.compute_bu_analytics
+            overlays: Analytics traces to add (subset of analytics.OVERLAY_OPTIONS)
+            forecast: Optional projection from forecasting.forecast_band (forecast, lower, upper)
+            initial_weeks: Weekly charts open zoomed to this many weeks (None = show all of df,
+                           e.g. when df was already cut to a date window)
 
         Returns:
             Plotly figure object
         """
+        import plotly.graph_objects as go
+
         try:
             fig = go.Figure()
 
@@ -504,21 +882,35 @@ class StabilityDashboard:
             is_important = clean_name in important_kpis
 
             # Add actual data line
+            if rollup_stats is not None:
+                period_stats = rollup_stats.xs(root_cause, level='root_cause').reindex(df.index)
+                customdata = list(zip(period_stats['max'] * 100, period_stats['breaches'],
+                                      period_stats['weeks']))
+                hovertemplate = ('<b>%{x|%b %Y}</b><br>' +
+                                 f'{root_cause} (avg): %{{y:.2f}}%<br>' +
+                                 'Max: %{customdata[0]:.2f}%<br>' +
+                                 'Breaches: %{customdata[1]} of %{customdata[2]} weeks<br>' +
+                                 '<extra></extra>')
+            else:
+                customdata = None
+                hovertemplate = ('<b>%{x|%d %b %Y}</b><br>' +
+                                 f'{root_cause}: %{{y:.2f}}%<br>' +
+                                 '<extra></extra>')
+
             fig.add_trace(go.Scatter(
-                x=df['Date'],
+                x=df.index,
                 y=df[root_cause] * 100,  # Convert to percentage for display
                 mode='lines+markers',
-                name='Actual',
+                name='Actual' if rollup_stats is None else 'Average',
                 line=dict(color='#2E86AB', width=3),
                 marker=dict(size=8, symbol='circle', line=dict(width=1, color='white')),
-                hovertemplate='<b>%{x|%d %b %Y}</b><br>' +
-                             f'{root_cause}: %{{y:.2f}}%<br>' +
-                             '<extra></extra>'
+                customdata=customdata,
+                hovertemplate=hovertemplate
             ))
 
             # Add threshold line
             fig.add_trace(go.Scatter(
-                x=df['Date'],
+                x=df.index,
                 y=[threshold * 100] * len(df),  # Convert to percentage for display
                 mode='lines',
                 name=f'Threshold ({threshold * 100:.1f}%)',
@@ -527,10 +919,11 @@ class StabilityDashboard:
                              '<extra></extra>'
             ))
 
-            # Highlight areas where actual exceeds threshold
+            # Highlight areas where actual exceeds threshold (fill between threshold and
+            # the exceeding part only; below-threshold points collapse onto the threshold)
             fig.add_trace(go.Scatter(
-                x=df['Date'],
-                y=df[root_cause] * 100,
+                x=df.index,
+                y=df[root_cause].clip(lower=threshold) * 100,
                 fill='tonexty',
                 mode='none',
                 fillcolor='rgba(255, 0, 0, 0.1)',
@@ -538,11 +931,44 @@ class StabilityDashboard:
                 hoverinfo='skip'
             ))
 
+            # Optional trend and anomaly overlays (weekly data only)
+            if analytics is not None and overlays and root_cause in analytics['rolling_mean'].columns:
+                self._add_analytics_overlays(fig, df, root_cause, analytics, overlays)
+
+            # Optional trend projection with its prediction band
+            if forecast is not None and not forecast.empty:
+                fig.add_trace(go.Scatter(
+                    x=list(forecast.index) + list(forecast.index[::-1]),
+                    y=list(forecast['upper'] * 100) + list(forecast['lower'][::-1] * 100),
+                    fill='toself',
+                    mode='none',
+                    fillcolor='rgba(46, 134, 171, 0.15)',
+                    name='Forecast band',
+                    hoverinfo='skip'
+                ))
+                fig.add_trace(go.Scatter(
+                    x=forecast.index,
+                    y=forecast['forecast'] * 100,
+                    mode='lines',
+                    name='Forecast',
+                    line=dict(color='#2E86AB', width=2, dash='dash'),
+                    hovertemplate='Forecast: %{y:.2f}%<br><extra></extra>'
+                ))
+                x_end = max(df.index.max(), forecast.index.max())
+            else:
+                x_end = df.index.max()
+
             # Update layout
             title = clean_name
             if is_important:
                 title = f"⭐ {title}"
 
+            # Show the last weeks by default (whole range for rollups), but allow scrolling to see all data
+            if rollup_stats is None and initial_weeks:
+                x_start = max(df.index.min(), df.index.max() - pd.Timedelta(weeks=initial_weeks))
+            else:
+                x_start = df.index.min()
+
             fig.update_layout(
                 title=dict(
                     text=title,
@@ -559,8 +985,7 @@ class StabilityDashboard:
                     tickangle=0,
                     tickfont=dict(size=11, color='#666666'),
                     tickmode='auto',
-                    # Show last 12 weeks by default, but allow scrolling to see all data
-                    range=[max(df['Date'].min(), df['Date'].max() - pd.Timedelta(weeks=12)), df['Date'].max()],
+                    range=[x_start, x_end],
                     rangeslider=dict(visible=True, thickness=0.05),
                     type='date'
                 ),
@@ -579,7 +1004,7 @@ class StabilityDashboard:
                 hovermode='x unified',
                 template='plotly_white',
                 height=450,
-                width=max(1200, len(df['Date']) * 30),  # Dynamic width: min 1200px, 30px per data point
+                width=max(1200, len(df) * 30),  # Dynamic width: min 1200px, 30px per data point
                 plot_bgcolor='white',
                 paper_bgcolor='white',
                 margin=dict(l=60, r=40, t=80, b=60),
@@ -602,45 +1027,108 @@ class StabilityDashboard:
             logger.error(f"Error creating chart for {root_cause}: {e}", exc_info=True)
             return go.Figure()
 
+    def _add_analytics_overlays(self, fig: "go.Figure", df: pd.DataFrame, root_cause: str,
+                                analytics: Dict[str, pd.DataFrame], overlays: List[str]):
+        """
+        Add rolling mean, EWMA and anomaly traces to a root cause chart
+
+        Args:
+            fig: Chart to extend
+            df: Weekly data shown on the chart (Date-indexed)
+            root_cause: Name of the root cause
+            analytics: Analytics frames from analytics.compute_bu_analytics
+            overlays: Traces to add (subset of analytics.OVERLAY_OPTIONS)
+        """
+        import plotly.graph_objects as go
+
+        if "Rolling mean" in overlays:
+            fig.add_trace(go.Scatter(
+                x=analytics['rolling_mean'].index,
+                y=analytics['rolling_mean'][root_cause] * 100,
+                mode='lines',
+                name='Rolling mean',
+                line=dict(color='#6A994E', width=2, dash='dot'),
+                hovertemplate='Rolling mean: %{y:.2f}%<br><extra></extra>'
+            ))
+
+        if "EWMA" in overlays:
+            fig.add_trace(go.Scatter(
+                x=analytics['ewma'].index,
+                y=analytics['ewma'][root_cause] * 100,
+                mode='lines',
+                name='EWMA',
+                line=dict(color='#A23B72', width=2),
+                hovertemplate='EWMA: %{y:.2f}%<br><extra></extra>'
+            ))
+
+        if "Anomalies" in overlays:
+            flagged = analytics['anomalies'][root_cause]
+            flagged_dates = flagged.index[flagged.to_numpy()]
+            fig.add_trace(go.Scatter(
+                x=flagged_dates,
+                y=df[root_cause].reindex(flagged_dates) * 100,
+                mode='markers',
+                name='Anomaly',
+                marker=dict(size=14, symbol='circle-open', line=dict(width=2.5, color='#C73E1D')),
+                customdata=list(zip(analytics['zscore'][root_cause].reindex(flagged_dates),
+                                    analytics['delta'][root_cause].reindex(flagged_dates) * 100)),
+                hovertemplate='Anomaly: z=%{customdata[0]:.1f}, '
+                              'Δ week: %{customdata[1]:+.2f} pp<br><extra></extra>'
+            ))
+
     def create_summary_chart(self, df: pd.DataFrame, thresholds: Dict[str, float],
-                           root_cause_cols: List[str]) -> go.Figure:
+                           root_cause_cols: List[str], initial_weeks: Optional[int] = 12,
+                           granularity: str = "Weekly") -> "go.Figure":
         """
         Create summary chart showing all root causes
 
         Args:
-            df: Prepared dataframe
+            df: Compact prepared dataframe or rollup values (Date-indexed)
             thresholds: Dictionary of thresholds
             root_cause_cols: List of root cause columns
+            initial_weeks: Chart opens zoomed to this many weeks (None = show all of df)
+            granularity: Granularity of df ("Weekly", "Monthly", "Quarterly"), shown in the title
 
         Returns:
             Plotly figure object
         """
+        import plotly.graph_objects as go
+
         try:
             fig = go.Figure()
 
             # Color palette for different root causes
             colors = ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#6A994E', '#BC4B51']
 
+            if granularity == "Weekly":
+                title = "Root Causes Overview"
+                date_format = '%{x|%d %b %Y}'
+            else:
+                title = f"Root Causes Overview ({granularity.lower()} averages)"
+                date_format = '%{x|%b %Y}'
+
             # Add line for each root cause
             for idx, root_cause in enumerate(root_cause_cols):
+                if root_cause not in df.columns:
+                    continue
                 color = colors[idx % len(colors)]
                 clean_name = clean_column_name(root_cause)
                 fig.add_trace(go.Scatter(
-                    x=df['Date'],
+                    x=df.index,
                     y=df[root_cause] * 100,
                     mode='lines+markers',
                     name=clean_name,
                     line=dict(color=color, width=2.5),
                     marker=dict(size=6, symbol='circle', line=dict(width=1, color='white')),
                     hovertemplate=f'<b>{clean_name}</b><br>' +
-                                 '%{x|%d %b %Y}<br>' +
+                                 f'{date_format}<br>' +
                                  'Value: %{y:.2f}%<br>' +
                                  '<extra></extra>'
                 ))
 
             fig.update_layout(
                 title=dict(
-                    text="Root Causes Overview",
+                    text=title,
                     font=dict(size=20, weight='bold', color='#1a1a1a'),
                     x=0.5,
                     xanchor='center'
@@ -654,8 +1142,9 @@ class StabilityDashboard:
                     tickangle=0,
                     tickfont=dict(size=11, color='#666666'),
                     tickmode='auto',
-                    # Show last 12 weeks by default, but allow scrolling to see all data
-                    range=[max(df['Date'].min(), df['Date'].max() - pd.Timedelta(weeks=12)), df['Date'].max()],
+                    # Show the last weeks by default, but allow scrolling to see all data
+                    range=[max(df.index.min(), df.index.max() - pd.Timedelta(weeks=initial_weeks))
+                           if initial_weeks else df.index.min(), df.index.max()],
                     rangeslider=dict(visible=True, thickness=0.05),
                     type='date'
                 ),
@@ -674,7 +1163,7 @@ class StabilityDashboard:
                 hovermode='x unified',
                 template='plotly_white',
                 height=550,
-                width=max(1400, len(df['Date']) * 30),  # Dynamic width: min 1400px, 30px per data point
+                width=max(1400, len(df) * 30),  # Dynamic width: min 1400px, 30px per data point
                 plot_bgcolor='white',
                 paper_bgcolor='white',
                 margin=dict(l=60, r=180, t=80, b=60),
@@ -714,9 +1203,712 @@ class StabilityDashboard:
             logger.error(f"Error getting available BUs: {e}", exc_info=True)
             return []
 
+    def build_workbook_cache(self, derive_views: bool = True) -> Optional[Dict]:
+        """
+        Load every BU once and derive all cached views for this workbook version
+
+        Args:
+            derive_views: Also build the derived views (False when they are built elsewhere,
+                          e.g. by the process receiving a sandboxed parse)
+
+        Returns:
+            Dictionary with workbook metadata, per-BU prepared data and rollups,
+            or None if the workbook could not be loaded
+        """
+        with memory_accounting.stage("open workbook"):
+            if not self.load_excel_file() or not self.load_static_values():
+                self.close_excel_file()
+                return None
+
+        available_bus = self.get_available_bus()
+        bus = {}
+        compaction = {}
+
+        for bu_name in available_bus:
+            with memory_accounting.stage(f"read {bu_name}"):
+                bu_data = self.load_bu_data(bu_name)
+            if bu_data is None or bu_data.empty:
+                continue
+
+            with memory_accounting.stage(f"prepare {bu_name}"):
+                root_cause_cols = self.identify_root_cause_columns(bu_data, bu_name)
+                if root_cause_cols:
+                    prepared = self.prepare_bu_data(bu_data, root_cause_cols, bu_name)
+                else:
+                    prepared = pd.DataFrame()
+
+                # Only the compact frame is kept; the raw sheet is released here
+                compact = self.compact_time_series_data(prepared, root_cause_cols)
+            raw_bytes = int(bu_data.memory_usage(deep=True).sum())
+            compact_bytes = int(compact.memory_usage(deep=True).sum())
+            compaction[bu_name] = {
+                'raw_bytes': raw_bytes,
+                'prepared_bytes': int(prepared.memory_usage(deep=True).sum()),
+                'compact_bytes': compact_bytes
+            }
+            logger.info(f"Compacted {bu_name}: {raw_bytes / 1024:.1f} KB raw → "
+                        f"{compact_bytes / 1024:.1f} KB ({(raw_bytes - compact_bytes) / 1024:.1f} KB saved)")
+
+            bus[bu_name] = {
+                'root_cause_cols': root_cause_cols,
+                'prepared': compact,
+                'thresholds': self.get_bu_thresholds(bu_name),
+                'important_kpis': self.get_bu_important_kpis(bu_name)
+            }
+
+        workbook = {
+            'data_source': self.data_source,
+            'last_modified': self.last_modified,
+            'sheet_names': list(self.excel_file.sheet_names),
+            'available_bus': available_bus,
+            'thresholds_df': self.thresholds_df,
+            'bus': bus,
+            'compaction': compaction
+        }
+        if derive_views:
+            with memory_accounting.stage("derive views"):
+                workbook.update(derive_workbook_views(bus))
+
+        self.close_excel_file()
+        return workbook
+
+    def close_excel_file(self):
+        """Release the openpyxl workbook once every sheet has been read (caller-provided ExcelFile objects stay open)"""
+        if self.excel_file is not None and self.excel_file is not self.excel_source:
+            self.excel_file.close()
+        self.excel_file = None
+
+
+def derive_workbook_views(bus: Dict[str, Dict]) -> Dict:
+    """
+    Build the views derived from the prepared BU data (shared by single-file and archive caches)
+
+    Args:
+        bus: Mapping of BU name -> cached BU entry
+
+    Returns:
+        Dictionary with series, rollups, analytics, forecast, breach_runs, breach_summary and
+        an empty display_tables memo (see get_display_table)
+    """
+    series = build_long_series(bus, DEFAULT_THRESHOLD)
+    breach_runs, breach_summary = build_breach_index(series)
+
+    return {
+        'series': series,
+        'rollups': compute_rollups(series),
+        'analytics': compute_analytics(bus),
+        'forecast': fit_breach_forecast(series),
+        'breach_runs': breach_runs,
+        'breach_summary': breach_summary,
+        'display_tables': {'lock': threading.Lock(), 'tables': OrderedDict(), 'sizes': {}}
+    }
+
+
+def build_materialized(dataset: Optional[str], version: str,
+                       build: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+    """
+    Build a workbook cache through the SQLite store
+
+    If the dataset already holds this version (written by an earlier run or another
+    worker process) the cache is rebuilt from SQLite without reading any workbook;
+    otherwise it is built normally and the dataset is refreshed incrementally.
+    New versions of the default source are also published as static snapshots.
+
+    Args:
+        dataset: Dataset name in the SQLite store (None = not materialized, e.g. uploads)
+        version: Version key of the workbook
+        build: Builds the workbook cache from the source
+
+    Returns:
+        Workbook cache dictionary (with 'materialized' when it is in SQLite) or None if loading failed
+    """
+    if dataset is None or not ENABLE_SQLITE_STORE:
+        workbook = build()
+    else:
+        workbook = _load_or_sync(dataset, version, build)
+
+    if workbook is not None and ENABLE_SNAPSHOTS and dataset is not None and dataset == get_default_dataset():
+        import snapshot_server
+        snapshot_server.publish_async(workbook, version)
+
+    return workbook
+
+
+def _load_or_sync(dataset: str, version: str, build: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+    """Load a version from the SQLite store, or build it and refresh the store"""
+    database = get_series_database()
+    try:
+        workbook = database.load_workbook(dataset, version)
+    except Exception as e:
+        logger.warning(f"✗ Could not load {dataset} from SQLite, parsing instead: {e}")
+        workbook = None
+
+    if workbook is not None:
+        with memory_accounting.stage("derive views"):
+            workbook.update(derive_workbook_views(workbook['bus']))
+    else:
+        workbook = build()
+        if workbook is None:
+            return None
+        try:
+            with memory_accounting.stage("sync sqlite"):
+                database.sync(dataset, version, workbook)
+        except Exception as e:
+            logger.warning(f"✗ Could not sync {dataset} to SQLite: {e}")
+            return workbook
+
+    workbook['materialized'] = {'dataset': dataset, 'version': version}
+    return workbook
+
+
+def load_workbook_cache(version: str, excel_source,
+                        on_error: Optional[Callable[[str], None]] = None,
+                        dataset: Optional[str] = None, sandboxed: bool = False,
+                        derive_views: bool = True) -> Optional[Dict]:
+    """
+    Parse a workbook version once per process and share it across sessions and reruns
+
+    Args:
+        version: Key from get_workbook_version (store key)
+        excel_source: Excel source, only read on a store miss
+        on_error: Optional callback for user-facing errors (e.g. st.error); defaults to logging
+        dataset: Optional SQLite dataset the version is materialized as (see build_materialized)
+        sandboxed: Parse in a worker process with size, time and memory limits (untrusted uploads,
+                   see sandboxed_parser.py)
+        derive_views: Also build the derived views; False for archive members, whose views are
+                      only derived on the merged history (stored under their own key)
+
+    Returns:
+        Workbook cache dictionary (shared, treat as read-only) or None if loading failed
+    """
+    def parse():
+        logger.info(f"Building workbook cache for version: {version}")
+        if sandboxed:
+            import sandboxed_parser
+
+            workbook = sandboxed_parser.parse_workbook(excel_source, on_error)
+            if workbook is not None and derive_views:
+                with memory_accounting.stage("derive views"):
+                    workbook.update(derive_workbook_views(workbook['bus']))
+            return workbook
+
+        dashboard = StabilityDashboard(excel_source=excel_source, on_error=on_error)
+        return dashboard.build_workbook_cache(derive_views=derive_views)
+
+    # A workbook without views must never answer a lookup that expects them
+    store_version = version if derive_views else f"{version}:without-views"
+    return get_workbook_store().get_or_load(store_version, lambda: build_materialized(dataset, version, parse))
+
+
+def get_archive_version(versions: List[str]) -> str:
+    """
+    Build a key identifying a set of workbook versions
+
+    Args:
+        versions: Version keys of the member workbooks, oldest first
+
+    Returns:
+        Version key (changes when any workbook changes or is added/removed)
+    """
+    joined = "|".join(versions)
+    return f"archive:{hashlib.sha256(joined.encode('utf-8')).hexdigest()}"
+
+
+def load_archive_cache(sources: List, on_error: Optional[Callable[[str], None]] = None,
+                       versions: Optional[List[str]] = None, dataset: Optional[str] = None,
+                       sandboxed: bool = False) -> Optional[Dict]:
+    """
+    Merge several workbooks into one continuous history
+
+    Each workbook is parsed through the shared store under its own version, so adding
+    a new archive file only parses that file; the others are store hits. The derived
+    views are only built once, on the merged history.
+
+    Args:
+        sources: Workbook sources, oldest first (see archive.list_archive_workbooks)
+        on_error: Optional callback for user-facing errors (e.g. st.error); defaults to logging
+        versions: Optional version keys of the sources (default: get_workbook_version of each)
+        dataset: Optional SQLite dataset the merged history is materialized as (see build_materialized)
+        sandboxed: Parse each workbook in a worker process (see load_workbook_cache)
+
+    Returns:
+        Merged workbook cache dictionary (shared, treat as read-only) or None if no workbook loaded
+    """
+    if versions is None:
+        versions = [get_workbook_version(source) for source in sources]
+    archive_version = get_archive_version(versions)
+
+    def merge():
+        workbooks = []
+        for version, source in zip(versions, sources):
+            workbook = load_workbook_cache(version, source, on_error, sandboxed=sandboxed, derive_views=False)
+            if workbook is None:
+                logger.warning(f"Skipping unreadable archive workbook: {getattr(source, 'name', source)}")
+                continue
+            workbooks.append(workbook)
+
+        if not workbooks:
+            return None
+
+        logger.info(f"Merging {len(workbooks)} archive workbooks")
+        with memory_accounting.stage("merge archive"):
+            return merge_workbook_caches(workbooks, derive_workbook_views)
+
+    return get_workbook_store().get_or_load(archive_version,
+                                            lambda: build_materialized(dataset, archive_version, merge))
+
+
+def get_sharepoint_workbooks(force_refresh: bool = False) -> List[Dict]:
+    """
+    Fetch the configured SHAREPOINT_SOURCES concurrently (shared by all sessions for CACHE_TTL seconds)
+
+    Args:
+        force_refresh: Ask every server again instead of using recent results or cached files
+
+    Returns:
+        Per-source results from async_fetcher.fetch_sources
+    """
+    from async_fetcher import fetch_sources_shared
+
+    return fetch_sources_shared(SHAREPOINT_SOURCES, CACHE_TTL, CACHE_FOLDER, FETCH_MAX_CONNECTIONS, force_refresh)
+
+
+def get_sharepoint_source_list(fetched: List[Dict]) -> Tuple[List[BytesIO], List[str]]:
+    """
+    Turn fetched SharePoint results into an archive source list
+
+    Args:
+        fetched: Results from get_sharepoint_workbooks
+
+    Returns:
+        Tuple of (named in-memory workbooks, their version keys) for the sources that downloaded
+    """
+    sources = []
+    versions = []
+    for result in fetched:
+        if not result['ok']:
+            continue
+        content = BytesIO(result['content'])
+        content.name = result['name']
+        sources.append(content)
+        versions.append(f"sharepoint:{result['name']}:{result['hash']}")
+    return sources, versions
+
+
+def get_default_dataset() -> Optional[str]:
+    """
+    Dataset a new session opens with: local file, else archive folder, else SharePoint sources
+
+    Returns:
+        Dataset name from SOURCE_DATASETS, or None if only uploads are available
+    """
+    if EXCEL_FILE_PATH and Path(EXCEL_FILE_PATH).exists():
+        return SOURCE_DATASETS["Use local file"]
+    if ARCHIVE_FOLDER and Path(ARCHIVE_FOLDER).is_dir() and list_archive_workbooks(ARCHIVE_FOLDER):
+        return SOURCE_DATASETS["Archive folder"]
+    if SHAREPOINT_SOURCES:
+        return SOURCE_DATASETS["SharePoint sources"]
+    return None
+
+
+def get_local_source(path: str) -> Tuple[object, str, Optional[Dict]]:
+    """
+    Local workbook to load: the file itself, or its previous cached version if the
+    file's current content was rolled back (see VersionedCache.track_file)
+
+    Args:
+        path: Local workbook path
+
+    Returns:
+        Tuple of (excel source, version key, cache entry served instead of the file or None)
+    """
+    if CACHE_FOLDER:
+        cache = VersionedCache(CACHE_FOLDER)
+        try:
+            current = cache.track_file(path)
+            if current is not None:
+                content = BytesIO(cache.read(current['hash']))
+                content.name = f"{Path(path).name} (rolled back to {current['hash'][:12]})"
+                return content, f"cache:{current['hash']}", current
+        except (OSError, KeyError, CacheIntegrityError) as e:
+            logger.warning(f"✗ Versioned cache unavailable for {path}, loading the file: {e}")
+
+    return path, get_workbook_version(path), None
+
+
+def get_default_bu(available_bus: List[str]) -> str:
+    """BU selected when a session opens (Kruidvat if present, else the first one)"""
+    return "Kruidvat" if "Kruidvat" in available_bus else available_bus[0]
+
+
+def warm_default_source(progress: Callable[[str], None]) -> str:
+    """
+    Warm-up job (see warmup.py): load the source a new session opens with and
+    build the default BU's charts once
+
+    The figures are not kept (sessions build their own); building them once
+    loads plotly and its validators, which otherwise costs the first page ~1s.
+
+    Args:
+        progress: Called with the current step
+
+    Returns:
+        Description of the warmed source
+    """
+    dataset = get_default_dataset()
+    if dataset == SOURCE_DATASETS["Use local file"]:
+        progress("parsing local workbook")
+        excel_source, version, _ = get_local_source(EXCEL_FILE_PATH)
+        workbook = load_workbook_cache(version, excel_source, dataset=dataset)
+    elif dataset == SOURCE_DATASETS["Archive folder"]:
+        progress("parsing archive workbooks")
+        workbook = load_archive_cache(list_archive_workbooks(ARCHIVE_FOLDER), dataset=dataset)
+    elif dataset == SOURCE_DATASETS["SharePoint sources"]:
+        progress(f"downloading {len(SHAREPOINT_SOURCES)} SharePoint sources")
+        sources, versions = get_sharepoint_source_list(get_sharepoint_workbooks())
+        if not sources:
+            raise Exception("None of the SharePoint sources could be downloaded")
+        progress("parsing SharePoint workbooks")
+        workbook = load_archive_cache(sources, versions=versions, dataset=dataset)
+    else:
+        return "nothing to warm (upload only)"
+
+    if workbook is None or not workbook['available_bus']:
+        raise Exception("The default source could not be loaded")
+
+    bu_name = get_default_bu(workbook['available_bus'])
+    bu_entry = workbook['bus'].get(bu_name)
+    if bu_entry is not None and not bu_entry['prepared'].empty:
+        progress(f"building charts for {bu_name}")
+        prepared = bu_entry['prepared']
+        window_start = get_window_start(prepared.index.max(), next(iter(DATE_WINDOWS.values())))
+        window_data = apply_date_window(prepared, window_start)
+
+        dashboard = StabilityDashboard()
+        figures = [dashboard.create_summary_chart(window_data, bu_entry['thresholds'], bu_entry['root_cause_cols'],
+                                                  initial_weeks=None)]
+        for root_cause in bu_entry['root_cause_cols']:
+            threshold = bu_entry['thresholds'].get(root_cause, DEFAULT_THRESHOLD)
+            figures.append(dashboard.create_root_cause_chart(window_data, root_cause, threshold,
+                                                             bu_entry['important_kpis'], initial_weeks=None))
+        for fig in figures:
+            fig.to_json()
+
+    return workbook['data_source']
+
+
+def render_warmup_status():
+    """Show the background warm-up progress in the sidebar"""
+    import streamlit as st
+    import warmup
+
+    status = warmup.get_status()
+    if status['state'] == 'running':
+        st.caption(f"⏳ Warming up: {status['step']}...")
+    elif status['state'] == 'ready':
+        st.caption(f"🔥 Ready: warmed up in {status['seconds']:.1f}s")
+    elif status['state'] == 'failed':
+        st.caption(f"⚠️ Warm-up failed: {status['error']}")
+
+
+def render_snapshot_status():
+    """Show which data version the static snapshot pages serve"""
+    import streamlit as st
+    import snapshot_server
+
+    current = snapshot_server.get_current()
+    if current is not None:
+        st.caption(f"📄 Static snapshot (port {SNAPSHOT_PORT}) published {current['published'].replace('T', ' ')}")
+
+
+def _reingest_workbook(path: Path):
+    """
+    Watcher callback: parse the new workbook version once so every session gets a cache hit
+
+    Args:
+        path: Path of the updated workbook
+    """
+    excel_source, version, _ = get_local_source(str(path))
+    load_workbook_cache(version, excel_source, dataset=SOURCE_DATASETS["Use local file"])
+
+
+def get_workbook_watcher(path: str) -> "WorkbookWatcher":
+    """
+    Start (once per process) the shared watcher for the local workbook
+
+    Args:
+        path: Local workbook path
+
+    Returns:
+        Running WorkbookWatcher
+    """
+    from file_watcher import get_shared_watcher
+
+    return get_shared_watcher(
+        path,
+        on_change=_reingest_workbook,
+        debounce_seconds=WATCHER_DEBOUNCE_SECONDS,
+        stable_seconds=WATCHER_STABLE_SECONDS,
+        poll_interval=WATCHER_POLL_INTERVAL
+    )
+
+
+def render_update_notice(watcher: "WorkbookWatcher"):
+    """
+    Tell the session when the watcher has ingested a newer workbook version
+    (runs as a fragment every WATCHER_NOTIFY_INTERVAL seconds, see main)
+
+    Args:
+        watcher: Shared workbook watcher
+    """
+    import streamlit as st
+
+    if watcher.version > st.session_state.get('workbook_watcher_version', watcher.version):
+        st.info("🆕 A new version of the data is ready")
+        if st.button("Load new version", use_container_width=True, type="primary"):
+            st.rerun(scope="app")
+
+
+def get_table_data(workbook: Dict, bu_name: str, granularity: str,
+                   window_start: Optional[pd.Timestamp]) -> Tuple[pd.DataFrame, str]:
+    """
+    Rows for the data table: weekly values or period means for the date window
+
+    Materialized workbooks are queried from the SQLite store (an indexed range scan);
+    uploads, or a store that has moved on to a newer version, use the in-memory cache.
+
+    Args:
+        workbook: Workbook cache dictionary
+        bu_name: Business unit name
+        granularity: "Weekly", "Monthly" or "Quarterly"
+        window_start: Window start from get_window_start (None = all)
+
+    Returns:
+        Tuple of (Date-indexed frame with one column per root cause, where it came from)
+    """
+    bu_entry = workbook['bus'][bu_name]
+    materialized = workbook.get('materialized')
+
+    if materialized is not None:
+        database = get_series_database()
+        try:
+            if granularity == "Weekly":
+                data = database.query_series(materialized['dataset'], bu_name, bu_entry['root_cause_cols'],
+                                             start=window_start, version=materialized['version'])
+            else:
+                stats = database.query_aggregates(materialized['dataset'], bu_name, granularity,
+                                                  start=window_start, version=materialized['version'])
+                data = None if stats is None else \
+                    stats['mean'].unstack(level='root_cause').reindex(columns=bu_entry['root_cause_cols'])
+            if data is not None:
+                data.columns.name = None
+                return data, "SQLite"
+        except Exception as e:
+            logger.warning(f"✗ SQLite query failed for {bu_name}, using the in-memory cache: {e}")
+
+    rollup_view = workbook['rollups'].get(granularity, {}).get(bu_name)
+    if ROLLUP_FREQUENCIES.get(granularity) is not None and rollup_view is not None:
+        return apply_date_window(rollup_view['values'], window_start, granularity), "memory"
+    return apply_date_window(bu_entry['prepared'], window_start), "memory"
+
+
+DISPLAY_TABLE_MAX_ENTRIES = 32  # Memoized data tables per workbook version
+
+
+def get_display_table(workbook: Dict, bu_name: str, granularity: str,
+                      window_start: Optional[pd.Timestamp]) -> Tuple[pd.DataFrame, str, object]:
+    """
+    Data table rows for st.dataframe, built once per workbook version, BU, granularity and window
+
+    With DTYPE_BACKEND = "pyarrow" the values (in percent, kept numeric) are converted
+    to a pyarrow Table on the first request only; later reruns hand Streamlit the same
+    Table, which it serializes as it is. The "%" formatting is done by the column config.
+
+    Args:
+        workbook: Workbook cache dictionary (its display_tables memo is filled here)
+        bu_name: Business unit name
+        granularity: "Weekly", "Monthly" or "Quarterly"
+        window_start: Window start from get_window_start (None = all)
+
+    Returns:
+        Tuple of (frame from get_table_data, where it came from, pyarrow Table or
+        DataFrame for st.dataframe)
+    """
+    memo = workbook.get('display_tables')
+    key = (bu_name, granularity, window_start)
+    if memo is not None:
+        with memo['lock']:
+            cached = memo['tables'].get(key)
+            if cached is not None:
+                memo['tables'].move_to_end(key)
+                return cached
+
+    table_data, origin = get_table_data(workbook, bu_name, granularity, window_start)
+    display_data = (table_data * 100).reset_index()
+    if sheet_reader.DTYPE_BACKEND == "pyarrow":
+        import pyarrow as pa
+        display_data = pa.Table.from_pandas(display_data, preserve_index=False)
+
+    result = (table_data, origin, display_data)
+    if memo is not None:
+        # The memo grows after the store sized the workbook, so the store is charged
+        # for each table kept and credited for each one dropped
+        size = estimate_size(table_data) + estimate_size(display_data)
+        with memo['lock']:
+            delta = size - memo['sizes'].pop(key, 0)
+            memo['tables'][key] = result
+            memo['sizes'][key] = size
+            while len(memo['tables']) > DISPLAY_TABLE_MAX_ENTRIES:
+                dropped, _ = memo['tables'].popitem(last=False)
+                delta -= memo['sizes'].pop(dropped)
+        get_workbook_store().charge(workbook, delta)
+    return result
+
+
+def render_breach_summary(breach_summary: pd.DataFrame, selected_bu: str):
+    """
+    Show the "currently breaching / longest streak" panel above the chart grid
+
+    Args:
+        breach_summary: Summary frame from breaches.build_breach_index
+        selected_bu: Currently selected BU (used for the optional filter)
+    """
+    import streamlit as st
+
+    if breach_summary.empty:
+        return
+
+    breaching = breach_summary[breach_summary['currently_breaching']]
+    title = f"🚨 Breach Summary: {len(breaching)} root causes above threshold right now"
+
+    with st.expander(title, expanded=not breaching.empty):
+        show_all = st.toggle("All BUs", value=True, help="Show every BU or only the selected one")
+        summary = breach_summary if show_all else breach_summary[breach_summary['bu'] == selected_bu]
+
+        display_summary = pd.DataFrame({
+            'BU': summary['bu'],
+            'Root Cause': summary['root_cause'].map(clean_column_name),
+            'Breaching': summary['currently_breaching'].map({True: '🔴', False: '🟢'}),
+            'Current Streak (weeks)': summary['current_streak'],
+            'Since': summary['current_since'].dt.strftime('%d %b %Y').fillna(''),
+            'Longest Streak (weeks)': summary['longest_streak'],
+            'Latest': (summary['latest_value'] * 100).map(lambda x: f"{x:.2f}%" if pd.notna(x) else ""),
+            'Threshold': (summary['threshold'] * 100).map(lambda x: f"{x:.2f}%")
+        })
+
+        st.dataframe(display_summary, use_container_width=True, hide_index=True, height=250)
+
+
+def render_forecast_summary(forecast: pd.DataFrame, selected_bu: str):
+    """
+    Show projected weeks to breach for root causes trending towards their threshold
+
+    Args:
+        forecast: Frame from forecasting.fit_breach_forecast
+        selected_bu: Currently selected BU (used for the optional filter)
+    """
+    import streamlit as st
+
+    # Already breaching series are covered by the breach summary
+    upcoming = forecast[forecast['weeks_to_breach'] > 0]
+    if upcoming.empty:
+        return
+
+    soon = upcoming['weeks_to_breach'] <= FORECAST_HORIZON_WEEKS
+    title = f"📈 Breach Forecast: {int(soon.sum())} root causes projected to breach within {FORECAST_HORIZON_WEEKS} weeks"
+
+    with st.expander(title, expanded=False):
+        show_all = st.toggle("All BUs", value=True, key="forecast_all_bus",
+                             help="Show every BU or only the selected one")
+        if not show_all:
+            upcoming = upcoming[upcoming['bu'] == selected_bu]
+
+        weeks = upcoming['weeks_to_breach']
+        display_forecast = pd.DataFrame({
+            'BU': upcoming['bu'],
+            'Root Cause': upcoming['root_cause'].map(clean_column_name),
+            'Weeks to Breach': weeks.where(weeks != float('inf')).round(1),
+            'Projected Date': upcoming['breach_date'],
+            'Trend (pp/week)': upcoming['slope'] * 100,
+            'Latest (%)': upcoming['latest_value'] * 100,
+            'Threshold (%)': upcoming['threshold'] * 100
+        })
+
+        # Numeric columns stay numeric so the table sorts correctly
+        st.dataframe(
+            display_forecast,
+            use_container_width=True,
+            hide_index=True,
+            height=250,
+            column_config={
+                'Weeks to Breach': st.column_config.NumberColumn(format="%.1f", help="Empty = not trending up"),
+                'Projected Date': st.column_config.DateColumn(format="DD MMM YYYY"),
+                'Trend (pp/week)': st.column_config.NumberColumn(format="%+.3f"),
+                'Latest (%)': st.column_config.NumberColumn(format="%.2f%%"),
+                'Threshold (%)': st.column_config.NumberColumn(format="%.2f%%")
+            }
+        )
+
+
+def render_startup_profile(top_n: int = 15):
+    """
+    Show the slowest imports and the time to first page (logged once per process)
+
+    Args:
+        top_n: Number of modules to list
+    """
+    import streamlit as st
+
+    startup_profile.log_first_page(top_n)
+
+    with st.expander("⏱️ Startup Profile"):
+        st.caption(f"{startup_profile.elapsed():.2f}s since launch")
+        st.dataframe(
+            pd.DataFrame(startup_profile.report(top_n), columns=['Module', 'Self (s)', 'Total (s)']),
+            use_container_width=True,
+            hide_index=True
+        )
+
+
+def render_memory_report():
+    """Show the memory report (store categories, pipeline stages, allocation sites) with a dump button"""
+    import streamlit as st
+
+    with st.expander("🧠 Memory Report"):
+        report = memory_accounting.build_report()
+
+        if report['traced'] is not None:
+            st.caption(f"Traced: {report['traced']['current_bytes'] / 1024 / 1024:.1f} MB now, "
+                       f"{report['traced']['peak_bytes'] / 1024 / 1024:.1f} MB peak")
+
+        st.markdown("**Workbook store by category (KB)**")
+        if report['store']:
+            store = pd.DataFrame(report['store']).set_index('version')
+            st.dataframe((store / 1024).round(1), use_container_width=True)
+
+        live = ", ".join(f"{label}: {count}" for label, count in report['live_objects'].items())
+        st.caption(f"Live objects: {live}")
+
+        if report['stages']:
+            st.markdown("**Pipeline stages**")
+            stages = pd.DataFrame(report['stages'])
+            stages['net KB'] = (stages['net_bytes'] / 1024).round(1)
+            stages['peak KB'] = (stages['peak_bytes'] / 1024).round(1)
+            stages['top site'] = stages['top'].map(lambda top: top[0]['site'] if top else "")
+            st.dataframe(stages[['time', 'stage', 'seconds', 'net KB', 'peak KB', 'top site']],
+                         use_container_width=True, hide_index=True)
+
+        if report['top_allocations']:
+            st.markdown("**Largest live allocation sites**")
+            st.dataframe(pd.DataFrame(report['top_allocations']), use_container_width=True, hide_index=True)
+
+        if st.button("💾 Dump report to file"):
+            st.success(f"✅ Written to {memory_accounting.dump_report()}")
+
 
 def main():
     """Main function to run the Streamlit dashboard"""
+    import streamlit as st
 
     # Page configuration
     st.set_page_config(
@@ -726,47 +1918,166 @@ def main():
         initial_sidebar_state="expanded"
     )
 
+    # Background warm-up of the default source (once per process; no-op if
+    # `python warmup.py` already started it with the server)
+    if ENABLE_WARMUP:
+        import warmup
+        warmup.start_once(warm_default_source)
+
+    # Static snapshot server for read-only viewers (once per process; a second worker
+    # process finds the port taken and leaves serving to the first)
+    if ENABLE_SNAPSHOTS:
+        import snapshot_server
+        snapshot_server.start_once(SNAPSHOT_PORT)
+
     # Sidebar: File source selection
     with st.sidebar:
         st.header("📁 Data Source")
 
-        # Check if local file exists
+        if ENABLE_WARMUP:
+            render_warmup_status()
+        if ENABLE_SNAPSHOTS:
+            render_snapshot_status()
+
+        # Check if local file and archive folder exist
         local_file_exists = Path(EXCEL_FILE_PATH).exists() if EXCEL_FILE_PATH else False
+        archive_exists = Path(ARCHIVE_FOLDER).is_dir() if ARCHIVE_FOLDER else False
+
+        if not local_file_exists:
+            st.warning("⚠️ Local file not found")
 
-        # Option 1: Local file (if available)
-        if local_file_exists:
-            use_local = st.radio(
+        # Option 1: Local file, option 2: archive folder (if available), option 3: upload
+        source_options = (["Use local file"] if local_file_exists else []) + \
+                         (["Archive folder"] if archive_exists else []) + \
+                         (["SharePoint sources"] if SHAREPOINT_SOURCES else []) + ["Upload file"]
+        if len(source_options) > 1:
+            source_choice = st.radio(
                 "Select data source:",
-                options=["Use local file", "Upload file"],
-                help="Local file is automatically updated if you have OneDrive sync enabled"
+                options=source_options,
+                help="Local file is automatically updated if you have OneDrive sync enabled; "
+                     "the archive folder merges older copies into one history"
             )
-            use_uploaded = (use_local == "Upload file")
         else:
-            st.warning("⚠️ Local file not found")
-            use_uploaded = True
+            source_choice = "Upload file"
+        use_uploaded = (source_choice == "Upload file")
+        dataset = SOURCE_DATASETS.get(source_choice)
 
         excel_source = None
+        source_versions = None
+        uploaded_version = None
 
         # Local file path
-        if not use_uploaded and local_file_exists:
-            excel_source = EXCEL_FILE_PATH
-            st.success(f"✓ Using local file")
+        if source_choice == "Use local file":
+            excel_source, local_version, rolled_back = get_local_source(EXCEL_FILE_PATH)
+            source_versions = [local_version]
             file_path = Path(EXCEL_FILE_PATH)
-            last_modified = pd.Timestamp.fromtimestamp(file_path.stat().st_mtime)
-            st.caption(f"Last updated: {last_modified.strftime('%Y-%m-%d %H:%M')}")
+            if rolled_back is None:
+                st.success(f"✓ Using local file")
+                last_modified = pd.Timestamp.fromtimestamp(file_path.stat().st_mtime)
+                st.caption(f"Last updated: {last_modified.strftime('%Y-%m-%d %H:%M')}")
+            else:
+                st.warning(f"↩️ Using the previous version {rolled_back['hash'][:12]} "
+                           f"(the current file was rolled back)")
+                st.caption(f"Cached: {rolled_back['fetched_at'][:16].replace('T', ' ')}")
+
+            # Reject the current version (e.g. a broken save) and serve the previous cached one
+            if CACHE_FOLDER and st.button("↩️ Roll back to previous version", use_container_width=True,
+                                          help="Serve the previous cached version of the local file "
+                                               "until the file changes again"):
+                if VersionedCache(CACHE_FOLDER).rollback(str(file_path)) is None:
+                    st.warning("⚠️ No previous version in the cache")
+                else:
+                    st.rerun()
+
+            # Shared watcher re-ingests once when the file changes and notifies open sessions
+            if ENABLE_FILE_WATCHER:
+                watcher = get_workbook_watcher(str(EXCEL_FILE_PATH))
+                st.caption(f"👀 Watching for updates: {watcher.mode}")
+                st.session_state['workbook_watcher_version'] = watcher.version
+                st.fragment(render_update_notice, run_every=WATCHER_NOTIFY_INTERVAL)(watcher)
+
+        # Archive folder: every workbook in it, merged into one history
+        elif source_choice == "Archive folder":
+            archive_files = list_archive_workbooks(ARCHIVE_FOLDER)
+            if archive_files:
+                excel_source = archive_files
+                st.success(f"✓ Using {len(archive_files)} archived workbooks")
+            else:
+                st.warning(f"⚠️ No workbooks found in {ARCHIVE_FOLDER}")
+
+        # Team trackers on SharePoint: fetched concurrently, merged into one view
+        elif source_choice == "SharePoint sources":
+            force_refresh = st.button("🔄 Refresh sources", use_container_width=True,
+                                      help="Download every source again")
+            with st.spinner(f"Fetching {len(SHAREPOINT_SOURCES)} sources..."):
+                fetched = get_sharepoint_workbooks(force_refresh)
+
+            available = [r for r in fetched if r['ok']]
+            if available:
+                excel_source, source_versions = get_sharepoint_source_list(fetched)
+                st.success(f"✓ {len(available)} of {len(fetched)} sources available")
+            else:
+                st.error("❌ None of the SharePoint sources could be downloaded")
+
+            with st.expander("📡 Source status", expanded=len(available) < len(fetched)):
+                st.dataframe(pd.DataFrame({
+                    'Source': [r['name'] for r in fetched],
+                    'Status': ['✓ ' + r['origin'] if r['ok'] else '✗ ' + r['error'] for r in fetched],
+                    'KB': [round(r['bytes'] / 1024) for r in fetched],
+                    'Seconds': [round(r['seconds'], 2) for r in fetched]
+                }), use_container_width=True, hide_index=True)
+
+                if available and CACHE_FOLDER:
+                    rollback_name = st.selectbox("Source to roll back:", [r['name'] for r in available])
+                    if st.button("↩️ Roll back to previous version", use_container_width=True,
+                                 help="Serve the previous cached version of this source"):
+                        from async_fetcher import rollback_source
+
+                        if rollback_source(rollback_name, SHAREPOINT_SOURCES[rollback_name], CACHE_FOLDER) is None:
+                            st.warning(f"⚠️ No previous version of {rollback_name} in the cache")
+                        else:
+                            st.rerun()
+
+        # Upload already ingested: the parsed workbook is served from the store by content hash
+        elif ENABLE_FILE_UPLOAD and 'ingested_upload' in st.session_state:
+            ingested = st.session_state['ingested_upload']
+            uploaded_version = ingested['version']
+            st.success(f"✓ File uploaded: {', '.join(ingested['names'])}")
+            if st.button("📤 Upload a different file", use_container_width=True):
+                del st.session_state['ingested_upload']
+                st.rerun()
 
         # File uploader
         elif ENABLE_FILE_UPLOAD:
             st.info("📤 Upload your Excel file below")
-            uploaded_file = st.file_uploader(
+            uploaded_files = st.file_uploader(
                 "Choose Excel file",
                 type=['xlsx', 'xls'],
-                help="Upload the KPIsStabilityTAS.xlsx file from SharePoint"
+                accept_multiple_files=True,
+                help="Upload the KPIsStabilityTAS.xlsx file from SharePoint "
+                     "(several files are merged into one history)",
+                # A new key after ingestion drops the widget, so Streamlit frees the uploaded bytes
+                key=f"uploader_{st.session_state.get('uploader_generation', 0)}"
             )
 
-            if uploaded_file:
-                excel_source = uploaded_file
-                st.success(f"✓ File uploaded: {uploaded_file.name}")
+            too_large = [uploaded_file.name for uploaded_file in uploaded_files
+                         if uploaded_file.size > UPLOAD_MAX_BYTES]
+            if too_large:
+                # Rejected before the bytes are hashed or parsed
+                st.error(f"❌ {', '.join(too_large)}: uploads are limited to "
+                         f"{UPLOAD_MAX_BYTES / (1024 * 1024):.0f} MB")
+                st.stop()
+
+            if uploaded_files:
+                # Hashed once on arrival; identical uploads map to the same store entry
+                source_versions = [get_workbook_version(uploaded_file) for uploaded_file in uploaded_files]
+
+            if len(uploaded_files) == 1:
+                excel_source = uploaded_files[0]
+                st.success(f"✓ File uploaded: {uploaded_files[0].name}")
+            elif uploaded_files:
+                excel_source = list(uploaded_files)
+                st.success(f"✓ {len(uploaded_files)} files uploaded, merged into one history")
             else:
                 st.warning("👆 Please upload an Excel file to continue")
 
@@ -780,25 +2091,46 @@ def main():
         st.divider()
 
     # Stop if no data source available
-    if excel_source is None:
+    if excel_source is None and uploaded_version is None:
         st.info("👈 Please select or upload a data file to begin")
         st.stop()
 
     # Initialize dashboard
     dashboard = StabilityDashboard(excel_source=excel_source)
 
-    # Load Excel file
+    # Load (or reuse) the parsed workbook for this version; a list is merged into one history
     with st.spinner("Loading Excel file..."):
-        if not dashboard.load_excel_file():
-            st.stop()
+        if uploaded_version is not None:
+            workbook = get_workbook_store().get(uploaded_version)
+            if workbook is None:
+                # Evicted from the store; the bytes were released, so ask for the file again
+                del st.session_state['ingested_upload']
+                st.warning("⚠️ The uploaded file is no longer in memory, please upload it again")
+                st.stop()
+        elif isinstance(excel_source, list):
+            workbook = load_archive_cache(excel_source, on_error=st.error, versions=source_versions,
+                                          dataset=dataset, sandboxed=use_uploaded and SANDBOX_UPLOADS)
+        else:
+            workbook = load_workbook_cache(
+                source_versions[0] if source_versions else get_workbook_version(excel_source),
+                excel_source, on_error=st.error, dataset=dataset, sandboxed=use_uploaded and SANDBOX_UPLOADS
+            )
 
-    # Load static values
-    with st.spinner("Loading thresholds and KPIs..."):
-        if not dashboard.load_static_values():
-            st.stop()
+    if workbook is None:
+        st.stop()
+
+    # Uploads are parsed now: keep only the store key and drop the uploader with its bytes
+    if use_uploaded and uploaded_version is None:
+        st.session_state['ingested_upload'] = {
+            'version': get_archive_version(source_versions) if isinstance(excel_source, list) else source_versions[0],
+            'names': [uploaded_file.name for uploaded_file in (excel_source if isinstance(excel_source, list)
+                                                                 else [excel_source])]
+        }
+        st.session_state['uploader_generation'] = st.session_state.get('uploader_generation', 0) + 1
+        st.rerun()
 
     # Get available BUs
-    available_bus = dashboard.get_available_bus()
+    available_bus = workbook['available_bus']
 
     if not available_bus:
         st.error("❌ No Business Units (sheets) found in the Excel file")
@@ -811,16 +2143,35 @@ def main():
         selected_bu = st.selectbox(
             "Select BU to analyze:",
             options=available_bus,
-            index=0 if "Kruidvat" not in available_bus else available_bus.index("Kruidvat"),
+            index=available_bus.index(get_default_bu(available_bus)),
             help="Choose the Business Unit to analyze"
         )
 
         st.divider()
 
         # Show file info
-        st.caption(f"📊 {len(dashboard.excel_file.sheet_names)} sheets available")
-        if dashboard.last_modified:
-            st.caption(f"🕒 Data from: {dashboard.last_modified.strftime('%Y-%m-%d %H:%M')}")
+        st.caption(f"📊 {len(workbook['sheet_names'])} sheets available")
+        if workbook['last_modified']:
+            st.caption(f"🕒 Data from: {workbook['last_modified'].strftime('%Y-%m-%d %H:%M')}")
+
+        # Workbooks merged into this history
+        if workbook.get('archive_files'):
+            with st.expander(f"🗂️ {len(workbook['archive_files'])} workbooks merged"):
+                for archive_file in workbook['archive_files']:
+                    if archive_file['first_date'] is not None:
+                        st.caption(f"{archive_file['data_source']}: "
+                                   f"{archive_file['first_date'].strftime('%d %b %Y')} – "
+                                   f"{archive_file['last_date'].strftime('%d %b %Y')}")
+                    else:
+                        st.caption(f"{archive_file['data_source']}: no data")
+
+        # Shared workbook store counters
+        store_stats = get_workbook_store().stats()
+        st.caption(
+            f"🗄️ Cache: {store_stats['entries']} versions, "
+            f"{store_stats['bytes'] / 1024 / 1024:.1f} / {store_stats['max_bytes'] / 1024 / 1024:.0f} MB "
+            f"(hits {store_stats['hits']}, misses {store_stats['misses']}, evictions {store_stats['evictions']})"
+        )
 
         # Refresh button (only if using local file)
         if not use_uploaded:
@@ -830,43 +2181,91 @@ def main():
     # Main content area - simple header
     st.title(f"{selected_bu}")
 
-    # Load BU data
-    with st.spinner(f"Loading data for {selected_bu}..."):
-        bu_data = dashboard.load_bu_data(selected_bu)
+    bu_entry = workbook['bus'].get(selected_bu)
 
-    if bu_data is None or bu_data.empty:
+    if bu_entry is None:
         st.error(f"❌ No data available for {selected_bu}")
         st.stop()
 
     # Get thresholds and important KPIs
-    thresholds = dashboard.get_bu_thresholds(selected_bu)
-    important_kpis = dashboard.get_bu_important_kpis(selected_bu)
+    thresholds = bu_entry['thresholds']
+    important_kpis = bu_entry['important_kpis']
 
     # Display important KPIs - more subtle
     if important_kpis:
         st.caption(f"⭐ Important KPIs: {', '.join(important_kpis)}")
 
-    # Identify root cause columns
-    root_cause_cols = dashboard.identify_root_cause_columns(bu_data)
+    # Identified root cause columns
+    root_cause_cols = bu_entry['root_cause_cols']
 
     if not root_cause_cols:
         st.warning("⚠️ No root cause columns identified in the data")
         st.stop()
 
-    # Prepare data for visualization
-    with st.spinner("Preparing visualizations..."):
-        prepared_data = dashboard.prepare_time_series_data(bu_data, root_cause_cols)
+    # Prepared data for visualization
+    prepared_data = bu_entry['prepared']
 
     if prepared_data.empty:
         st.error("❌ Unable to prepare data for visualization")
         st.stop()
 
+    # Breach summary across all BUs (precomputed index, no chart rendering needed)
+    render_breach_summary(workbook['breach_summary'], selected_bu)
+    render_forecast_summary(workbook['forecast'], selected_bu)
+
+    # Date window: data is cut before any figure or table is built, so work scales with the window
+    window_label = st.radio(
+        "Date window",
+        options=list(DATE_WINDOWS),
+        horizontal=True,
+        help="Only the selected range is sent to the charts and the data table"
+    )
+    window_start = get_window_start(prepared_data.index.max(), DATE_WINDOWS[window_label])
+    window_data = apply_date_window(prepared_data, window_start)
+
     # Display individual charts for each root cause
 
     # Create tabs for different views
-    tab1, tab2 = st.tabs(["📊 All Charts", "📋 Data Table"])
+    tab1, tab_overview, tab2 = st.tabs(["📊 All Charts", "📈 Overview", "📋 Data Table"])
 
     with tab1:
+        granularity = st.radio(
+            "Granularity",
+            options=ROLLUP_GRANULARITIES,
+            horizontal=True,
+            help="Monthly and quarterly views show period averages; hover for max and breach count"
+        )
+
+        # Rollups are precomputed with the workbook cache, so switching is a lookup
+        rollup_view = workbook['rollups'].get(granularity, {}).get(selected_bu)
+        if rollup_view is not None:
+            chart_data = apply_date_window(rollup_view['values'], window_start, granularity)
+            rollup_stats = rollup_view['stats']
+        else:
+            chart_data = window_data
+            rollup_stats = None
+
+        # Analytics are precomputed per workbook version (on the full history, so rolling
+        # windows are complete); overlays only toggle traces
+        analytics = None
+        overlays = []
+        if rollup_stats is None:
+            analytics = workbook['analytics'].get(selected_bu)
+            if analytics is not None:
+                analytics = {key: apply_date_window(frame, window_start) for key, frame in analytics.items()}
+            overlays = st.multiselect(
+                "Overlays",
+                options=OVERLAY_OPTIONS + ["Forecast"],
+                default=[],
+                help="Rolling mean and EWMA trends; anomalies are weeks far from the recent baseline "
+                     "(rolling z-score); forecast projects the recent trend with a prediction band"
+            )
+
+        # Trend fits are precomputed for every series; only the band points are built here
+        bu_forecast = None
+        if "Forecast" in overlays:
+            bu_forecast = workbook['forecast'][workbook['forecast']['bu'] == selected_bu].set_index('root_cause')
+
         # Display charts in a grid
         for i in range(0, len(root_cause_cols), 2):
             cols = st.columns(2)
@@ -874,33 +2273,70 @@ def main():
             for j, col in enumerate(cols):
                 if i + j < len(root_cause_cols):
                     root_cause = root_cause_cols[i + j]
-                    threshold = thresholds.get(root_cause, 0.05)  # Default 5% if not found
+                    threshold = thresholds.get(root_cause, DEFAULT_THRESHOLD)  # Default 5% if not found
 
                     with col:
                         chart = dashboard.create_root_cause_chart(
-                            prepared_data, root_cause, threshold, important_kpis
+                            chart_data, root_cause, threshold, important_kpis, rollup_stats,
+                            analytics, overlays,
+                            forecast_band(bu_forecast.loc[root_cause])
+                            if bu_forecast is not None and root_cause in bu_forecast.index else None,
+                            initial_weeks=None
                         )
                         st.plotly_chart(chart, key=f"chart_{root_cause}_{i}_{j}")
 
+    with tab_overview:
+        # Aggregation level follows the visible span: the precomputed rollups act as a
+        # resolution pyramid, so the point count stays bounded however long the history is
+        overview_granularity = pick_overview_granularity(window_data.index.min(), window_data.index.max())
+        overview_view = workbook['rollups'].get(overview_granularity, {}).get(selected_bu)
+        if overview_view is not None:
+            overview_data = apply_date_window(overview_view['values'], window_start, overview_granularity)
+        else:
+            overview_granularity = "Weekly"
+            overview_data = window_data
+
+        hint = " (narrow the date window for more detail)" if overview_granularity != "Weekly" else ""
+        st.caption(f"{overview_granularity} resolution: {len(overview_data)} points per root cause{hint}")
+        overview_chart = dashboard.create_summary_chart(
+            overview_data, thresholds, root_cause_cols,
+            initial_weeks=None, granularity=overview_granularity
+        )
+        st.plotly_chart(overview_chart, key="overview_chart")
+
     with tab2:
         st.subheader("Raw Data")
 
-        # Display data with formatting
-        display_data = prepared_data.copy()
+        compaction = workbook['compaction'].get(selected_bu)
+        if compaction:
+            saved = compaction['raw_bytes'] - compaction['compact_bytes']
+            st.caption(f"💾 {compaction['compact_bytes'] / 1024:.1f} KB in memory "
+                       f"({saved / 1024:.1f} KB saved vs. raw sheet)")
+
+        table_granularity = st.radio(
+            "Rows",
+            options=ROLLUP_GRANULARITIES,
+            horizontal=True,
+            key="table_granularity",
+            help="Weekly values, or monthly/quarterly means"
+        )
+        table_data, table_origin, display_table = get_display_table(workbook, selected_bu, table_granularity,
+                                                                    window_start)
 
-        # Format percentage columns
-        for col in root_cause_cols:
-            if col in display_data.columns:
-                display_data[col] = display_data[col].apply(lambda x: f"{x*100:.2f}%" if pd.notna(x) else "")
+        st.caption(f"Showing {len(window_data)} of {len(prepared_data)} weeks ({window_label.lower()})"
+                   + (f" as {len(table_data)} {table_granularity.lower()} means" if table_granularity != "Weekly" else "")
+                   + (" · 🗃️ from the SQLite store" if table_origin == "SQLite" else ""))
 
+        # Display data with percentage formatting
         st.dataframe(
-            display_data,
+            display_table,
             use_container_width=True,
-            height=400
+            height=400,
+            column_config={col: st.column_config.NumberColumn(col, format="%.2f%%") for col in root_cause_cols}
         )
 
         # Download button
-        csv = prepared_data.to_csv(index=False)
+        csv = table_data.to_csv()
         st.download_button(
             label="📥 Download Data as CSV",
             data=csv,
@@ -908,6 +2344,14 @@ def main():
             mime="text/csv"
         )
 
+    # Startup import profile (STABILITY_PROFILE_STARTUP=1 or PROFILE_STARTUP in config)
+    if startup_profile.is_active():
+        render_startup_profile()
+
+    # Memory report (STABILITY_MEMORY_PROFILE=1 or MEMORY_PROFILE in config)
+    if memory_accounting.is_active():
+        render_memory_report()
+
     # Footer
     st.divider()
     st.markdown(
@@ -921,6 +2365,8 @@ def main():
 
 
 if __name__ == "__main__":
+    import streamlit as st
+
     try:
         main()
     except Exception as e:
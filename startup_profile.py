@@ -0,0 +1,158 @@
+"""
+Startup Profile - Report import time per module at launch
+Enabled with the STABILITY_PROFILE_STARTUP=1 environment variable (or
+PROFILE_STARTUP = True in config.py). Must be installed before the heavy
+imports it should measure; stability_dashboard does this first thing.
+
+For imports done by Streamlit itself before the app script runs, use
+`python -X importtime -m streamlit run stability_dashboard.py` instead.
+"""
+
+import importlib.abc
+import logging
+import os
+import sys
+import threading
+import time
+from typing import List, Tuple
+
+ENV_VAR = "STABILITY_PROFILE_STARTUP"
+
+logger = logging.getLogger(__name__)
+
+_timings = {}  # module name -> (self seconds, inclusive seconds)
+_first_page_logged = False
+_state = threading.local()
+_finder = None
+_start_time = time.perf_counter()
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wrap a loader and time module execution (inclusive and self time)"""
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = getattr(_state, 'stack', None)
+        if stack is None:
+            stack = _state.stack = []
+
+        stack.append(0.0)  # Accumulates time spent in nested imports
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            inclusive = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += inclusive
+            _timings[module.__name__] = (inclusive - nested, inclusive)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Delegate to the real finders and wrap the loader they return"""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader)
+                return spec
+        return None
+
+
+def is_enabled() -> bool:
+    """
+    Check whether startup profiling was requested
+
+    Returns:
+        bool: True if the environment variable or config flag is set
+    """
+    if os.environ.get(ENV_VAR, '').lower() in ('1', 'true', 'yes'):
+        return True
+    try:
+        from config import PROFILE_STARTUP
+        return bool(PROFILE_STARTUP)
+    except ImportError:
+        return False
+
+
+def install_if_enabled() -> bool:
+    """
+    Start recording import times if profiling is enabled
+
+    Returns:
+        bool: True if the profiler is active
+    """
+    global _finder, _start_time
+    if _finder is not None:
+        return True
+    if not is_enabled():
+        return False
+
+    _finder = _TimingFinder()
+    sys.meta_path.insert(0, _finder)
+    _start_time = time.perf_counter()
+    logger.info("Startup profiling enabled")
+    return True
+
+
+def is_active() -> bool:
+    """Whether the profiler is installed"""
+    return _finder is not None
+
+
+def elapsed() -> float:
+    """Seconds since the profiler was installed (or since this module was imported)"""
+    return time.perf_counter() - _start_time
+
+
+def report(top_n: int = 20) -> List[Tuple[str, float, float]]:
+    """
+    Get the slowest imports
+
+    Args:
+        top_n: Number of modules to return
+
+    Returns:
+        List of (module, self seconds, inclusive seconds), slowest self time first
+    """
+    rows = [(name, self_time, inclusive) for name, (self_time, inclusive) in list(_timings.items())]
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top_n]
+
+
+def log_report(top_n: int = 20):
+    """
+    Log the slowest imports and the time since launch
+
+    Args:
+        top_n: Number of modules to log
+    """
+    logger.info(f"Startup profile: {len(_timings)} modules imported, {elapsed():.3f}s since launch")
+    for name, self_time, inclusive in report(top_n):
+        logger.info(f"  {self_time * 1000:8.1f} ms self | {inclusive * 1000:8.1f} ms total | {name}")
+
+
+def log_first_page(top_n: int = 20):
+    """
+    Log the time to first page and the slowest imports, once per process
+
+    Args:
+        top_n: Number of modules to log
+    """
+    global _first_page_logged
+    if _first_page_logged:
+        return
+    _first_page_logged = True
+    logger.info(f"Time to first page: {elapsed():.3f}s")
+    log_report(top_n)
@@ -0,0 +1,157 @@
+"""
+Benchmark of the Arrow dtype path against the NumPy path
+Reads a generated BU sheet with both DTYPE_BACKEND settings and measures, per
+stage, the time and the memory of the result: the sheet reader, the time
+series preparation, and the data table handed to Streamlit (the old string
+formatted DataFrame vs. the numeric DataFrame vs. the pyarrow Table built on
+the first request vs. the memoized Table later reruns reuse, each serialized to
+Arrow IPC bytes the way st.dataframe does).
+
+Usage: python tests/benchmark_arrow.py --weeks 520 --repeat 5
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+import pyarrow as pa
+from streamlit.dataframe_util import convert_anything_to_arrow_bytes
+
+import sheet_reader
+from load_test import make_workbook
+from stability_dashboard import StabilityDashboard
+
+BU_NAME = "Kruidvat"
+
+
+def measure(func: Callable, repeat: int) -> Tuple[object, float, float]:
+    """
+    Run func repeatedly
+
+    Returns:
+        Tuple of (last result, median seconds, peak traced allocation in KB of one run)
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, statistics.median(timings), peak / 1024
+
+
+def frame_kb(df: pd.DataFrame) -> float:
+    """Deep memory usage of a frame in KB"""
+    return df.memory_usage(deep=True).sum() / 1024
+
+
+def legacy_display(table_data: pd.DataFrame, root_cause_cols) -> pd.DataFrame:
+    """The data table as it was handed over before: percentages formatted to strings cell by cell"""
+    display_data = table_data.reset_index()
+    for col in root_cause_cols:
+        display_data[col] = display_data[col].apply(lambda x: f"{x*100:.2f}%" if pd.notna(x) else "")
+    return display_data
+
+
+def run_backend(path: str, backend: str, repeat: int) -> Dict:
+    """
+    Read and prepare the BU sheet with one dtype backend
+
+    Returns:
+        Dictionary with per-stage rows and the compact prepared frame
+    """
+    sheet_reader.DTYPE_BACKEND = backend
+    sheet_reader.DTYPE_BACKEND_OPTIONS = {'dtype_backend': 'pyarrow'} if backend == "pyarrow" else {}
+    dashboard = StabilityDashboard(excel_source=path)
+    dashboard.load_excel_file()
+    worksheet = sheet_reader.get_worksheet(dashboard.excel_file, BU_NAME)
+    columns = dashboard.select_needed_columns(sheet_reader.read_header(worksheet), BU_NAME)
+
+    raw, read_s, read_peak = measure(
+        lambda: sheet_reader.read_sheet(worksheet, columns=columns, dtype_backend=backend), repeat)
+    root_cause_cols = dashboard.identify_root_cause_columns(raw, BU_NAME)
+    prepared, prepare_s, prepare_peak = measure(
+        lambda: dashboard.prepare_time_series_data(raw, root_cause_cols), repeat)
+    dashboard.close_excel_file()
+
+    return {
+        'rows': [
+            {'backend': backend, 'stage': 'read sheet', 'ms': read_s * 1000,
+             'result KB': frame_kb(raw), 'peak KB': read_peak},
+            {'backend': backend, 'stage': 'prepare', 'ms': prepare_s * 1000,
+             'result KB': frame_kb(prepared), 'peak KB': prepare_peak},
+        ],
+        'dtypes': sorted({str(dtype) for dtype in raw.dtypes}),
+        'compact': dashboard.compact_time_series_data(prepared, root_cause_cols),
+        'root_cause_cols': root_cause_cols,
+    }
+
+
+def run_handoff(table_data: pd.DataFrame, root_cause_cols, repeat: int):
+    """Time the data table handoff to Streamlit for the shapes it can take"""
+    memoized = pa.Table.from_pandas((table_data * 100).reset_index(), preserve_index=False)
+    handoffs = {
+        'strings (old)': lambda: convert_anything_to_arrow_bytes(legacy_display(table_data, root_cause_cols)),
+        'numeric DataFrame': lambda: convert_anything_to_arrow_bytes((table_data * 100).reset_index()),
+        'pyarrow Table': lambda: convert_anything_to_arrow_bytes(
+            pa.Table.from_pandas((table_data * 100).reset_index(), preserve_index=False)),
+        'memoized Table (rerun)': lambda: convert_anything_to_arrow_bytes(memoized),
+    }
+    rows = []
+    for name, handoff in handoffs.items():
+        payload, seconds, peak = measure(handoff, repeat)
+        rows.append({'backend': name, 'stage': 'table → Streamlit', 'ms': seconds * 1000,
+                     'result KB': len(payload) / 1024, 'peak KB': peak})
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Arrow vs NumPy dtype benchmark")
+    parser.add_argument('--weeks', type=int, default=520, help="Weeks in the generated BU sheet")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per stage (median reported)")
+    parser.add_argument('--verbose', action='store_true', help="Keep the dashboard's INFO logging")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = str(Path(folder) / "benchmark.xlsx")
+        make_workbook(path, args.weeks, [BU_NAME])
+
+        results = {backend: run_backend(path, backend, args.repeat) for backend in ("numpy", "pyarrow")}
+
+    for backend, result in results.items():
+        print(f"{backend} reader dtypes: {', '.join(result['dtypes'])}")
+
+    numpy_compact = results['numpy']['compact']
+    arrow_compact = results['pyarrow']['compact']
+    columns = sorted(numpy_compact.columns)  # The classifier does not guarantee a column order
+    same = columns == sorted(arrow_compact.columns) and numpy_compact[columns].equals(arrow_compact[columns])
+    print(f"Prepared data identical across backends: {'✓' if same else '✗'}")
+
+    rows = results['numpy']['rows'] + results['pyarrow']['rows']
+    rows += run_handoff(arrow_compact, results['pyarrow']['root_cause_cols'], args.repeat)
+
+    report = pd.DataFrame(rows).set_index(['stage', 'backend'])
+    print(f"\n{args.weeks} weeks × {len(results['pyarrow']['root_cause_cols'])} root causes, "
+          f"median of {args.repeat} runs\n")
+    print(report.round(1).to_string())
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+Load test for the dashboard rerun path
+Drives stability_dashboard.main() through Streamlit's headless AppTest with
+a generated workbook. N sessions run concurrently in one process (sharing the
+workbook store, like sessions on one server) and repeat realistic interactions;
+the report shows throughput, latency percentiles per interaction and peak RSS.
+
+Usage: python tests/load_test.py --sessions 8 --iterations 20 --weeks 260
+"""
+
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+import stability_dashboard  # Imported once up front, as in a running server
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows
+
+ROOT_CAUSES = ["Maintenance", "System Issue", "No Defect", "Configuration", "Test Data", "Deployment"]
+DEFAULT_BUS = ["Kruidvat", "Trekpleister", "Superdrug", "Savers", "Watsons"]
+
+# The script AppTest runs for every session; the workbook path is filled in per run
+APP_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import stability_dashboard
+stability_dashboard.EXCEL_FILE_PATH = {workbook!r}
+stability_dashboard.main()
+"""
+
+
+def make_workbook(path: str, weeks: int, bu_names: List[str], seed: int = 0):
+    """
+    Write a workbook shaped like the real one (Static Values + one sheet per BU)
+
+    Args:
+        path: Output .xlsx path
+        weeks: Number of weekly rows per BU
+        bu_names: BU sheet names
+        seed: Random seed
+    """
+    rng = np.random.default_rng(seed)
+
+    static = [[None] * (len(ROOT_CAUSES) + 1) for _ in range(7)]
+    static[0][0] = "Thresholds"
+    for i, root_cause in enumerate(ROOT_CAUSES):
+        static[1][i + 1] = f"{root_cause} %"
+        static[2][i + 1] = 0.03 + 0.01 * i
+    for i, bu_name in enumerate(bu_names):
+        static[5][i + 1] = bu_name
+        static[6][i + 1] = "Maintenance, System Issue"
+
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        pd.DataFrame(static).to_excel(writer, sheet_name="Static Values", header=False, index=False)
+        for bu_name in bu_names:
+            data = {'Week': pd.date_range("2020-01-06", periods=weeks, freq="W-MON")}
+            for i, root_cause in enumerate(ROOT_CAUSES):
+                data[root_cause] = rng.integers(0, 40, weeks)
+                data[f"{root_cause} %"] = np.clip(rng.normal(0.03 + 0.01 * i, 0.015, weeks), 0, None)
+            pd.DataFrame(data).to_excel(writer, sheet_name=bu_name, index=False)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class RuntimeSwapCounter:
+    """
+    AppTest installs a process-global mock Runtime for each run and clears it when
+    the run ends. With concurrent sessions, a session can finish while another is
+    still in its end-of-run cleanup, which then raises "Runtime hasn't been created"
+    in the script thread. The script itself has completed, so these are counted
+    instead of printed as tracebacks.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+        self._default_hook = threading.excepthook
+
+    def __call__(self, args):
+        if isinstance(args.exc_value, RuntimeError) and "Runtime hasn't been created" in str(args.exc_value):
+            with self._lock:
+                self.count += 1
+            return
+        self._default_hook(args)
+
+
+def _set(elements, label: str, value):
+    """Set the widget with this label; widgets missing from the current view are left alone"""
+    for element in elements:
+        if element.label == label:
+            element.set_value(value)
+            return
+
+
+def _interactions(at: AppTest, bu_names: List[str]) -> Dict:
+    """Interaction name -> callable that changes one widget (the caller runs the script)"""
+    return {
+        'switch BU': lambda: _set(at.selectbox, "Select BU to analyze:", random.choice(bu_names)),
+        'granularity': lambda: _set(at.radio, "Granularity", random.choice(["Weekly", "Monthly", "Quarterly"])),
+        'date window': lambda: _set(at.radio, "Date window", random.choice(["Last 12 weeks", "Last year", "All"])),
+        'overlays': lambda: _set(at.multiselect, "Overlays",
+                                 random.sample(["Rolling mean", "EWMA", "Anomalies", "Forecast"], 2)),
+        'download CSV': lambda: at.download_button[0].click() if at.download_button else None,
+    }
+
+
+def run_session(session_id: int, script: str, bu_names: List[str], iterations: int,
+                timeout: float, start_barrier: threading.Barrier) -> List[Dict]:
+    """
+    One simulated analyst: first page load, then random interactions
+
+    Returns:
+        One record per script run with session, interaction, seconds and error
+    """
+    random.seed(session_id)
+    records = []
+    at = AppTest.from_string(script, default_timeout=timeout)
+    interactions = _interactions(at, bu_names)
+
+    def timed(name: str, action=None):
+        start = time.perf_counter()
+        error = None
+        try:
+            if action is not None:
+                action()
+            at.run()
+            if at.exception:
+                error = at.exception[0].value
+        except Exception as e:
+            error = str(e)
+        records.append({'session': session_id, 'interaction': name,
+                        'seconds': time.perf_counter() - start, 'error': error})
+
+    start_barrier.wait()
+    timed('first load')
+
+    for _ in range(iterations):
+        name = random.choice(list(interactions))
+        # Widgets missing in the current view (e.g. overlays on a rollup) just rerun the page
+        timed(name, interactions[name])
+
+    return records
+
+
+def summarize(records: List[Dict]) -> pd.DataFrame:
+    """
+    Latency percentiles per interaction
+
+    Returns:
+        Frame indexed by interaction with runs, errors, p50, p90, p99 and max (ms)
+    """
+    df = pd.DataFrame(records)
+    df['ms'] = df['seconds'] * 1000
+    summary = df.groupby('interaction').agg(
+        runs=('ms', 'size'),
+        errors=('error', lambda e: int(e.notna().sum())),
+        p50=('ms', lambda ms: np.percentile(ms, 50)),
+        p90=('ms', lambda ms: np.percentile(ms, 90)),
+        p99=('ms', lambda ms: np.percentile(ms, 99)),
+        max=('ms', 'max')
+    )
+    summary.loc['(all)'] = [len(df), int(df['error'].notna().sum()), *np.percentile(df['ms'], [50, 90, 99]),
+                            df['ms'].max()]
+    return summary.round(1).astype({'runs': int, 'errors': int})
+
+
+def run_load_test(sessions: int, iterations: int, weeks: int, bu_count: int,
+                  workbook: Optional[str] = None, timeout: float = 120) -> bool:
+    """
+    Run the load test and print the report
+
+    Args:
+        sessions: Number of concurrent sessions
+        iterations: Interactions per session after the first load
+        weeks: Weeks of history per BU in the generated workbook
+        bu_count: Number of BU sheets in the generated workbook
+        workbook: Existing workbook to use instead of a generated one
+        timeout: Per-run AppTest timeout in seconds
+
+    Returns:
+        True if no run raised an exception
+    """
+    print("=" * 60)
+    print("Stability Dashboard - Concurrent Session Load Test")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as folder:
+        bu_names = DEFAULT_BUS[:bu_count] if bu_count <= len(DEFAULT_BUS) else \
+            DEFAULT_BUS + [f"BU {i}" for i in range(len(DEFAULT_BUS), bu_count)]
+
+        if workbook is None:
+            workbook = str(Path(folder) / "load_test.xlsx")
+            make_workbook(workbook, weeks, bu_names)
+            print(f"\nGenerated workbook: {len(bu_names)} BUs × {weeks} weeks")
+        else:
+            bu_names = [sheet for sheet in pd.ExcelFile(workbook).sheet_names if sheet != "Static Values"]
+            print(f"\nUsing workbook: {workbook}")
+
+        script = APP_SCRIPT.format(root=str(Path(__file__).resolve().parent.parent), workbook=workbook)
+        print(f"Sessions: {sessions}, interactions per session: {iterations}")
+        rss_before = peak_rss_mb()
+
+        barrier = threading.Barrier(sessions)
+        runtime_swaps = RuntimeSwapCounter()
+        threading.excepthook = runtime_swaps
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=sessions) as executor:
+                futures = [executor.submit(run_session, i, script, bu_names, iterations, timeout, barrier)
+                           for i in range(sessions)]
+                records = [record for future in futures for record in future.result()]
+        finally:
+            threading.excepthook = runtime_swaps._default_hook
+        elapsed = time.perf_counter() - start
+
+    summary = summarize(records)
+    errors = [record for record in records if record['error']]
+
+    print("\nLatency per interaction (ms):")
+    print(summary.to_string())
+    print(f"\nScript runs: {len(records)} in {elapsed:.2f}s → {len(records) / elapsed:.1f} runs/s")
+
+    rss_after = peak_rss_mb()
+    if rss_after is not None:
+        print(f"Peak RSS: {rss_after:.0f} MB (before sessions: {rss_before:.0f} MB)")
+    else:
+        print("Peak RSS: not available on this platform")
+
+    if runtime_swaps.count:
+        print(f"AppTest cleanup races (not errors): {runtime_swaps.count}")
+
+    for record in errors[:5]:
+        print(f"  ✗ Session {record['session']} {record['interaction']}: {str(record['error'])[:100]}")
+
+    print(f"\n{'✓' if not errors else '✗'} {len(errors)} runs with errors")
+    print("=" * 60)
+    return not errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the dashboard")
+    parser.add_argument('--sessions', type=int, default=4, help="Concurrent sessions")
+    parser.add_argument('--iterations', type=int, default=10, help="Interactions per session")
+    parser.add_argument('--weeks', type=int, default=156, help="Weeks per BU in the generated workbook")
+    parser.add_argument('--bus', type=int, default=3, help="BUs in the generated workbook")
+    parser.add_argument('--workbook', default=None, help="Use this workbook instead of a generated one")
+    parser.add_argument('--timeout', type=float, default=120, help="Per-run timeout in seconds")
+    parser.add_argument('--verbose', action='store_true', help="Keep the dashboard's INFO logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    success = run_load_test(args.sessions, args.iterations, args.weeks, args.bus, args.workbook, args.timeout)
+    sys.exit(0 if success else 1)
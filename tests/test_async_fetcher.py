@@ -0,0 +1,187 @@
+"""
+Test script for the concurrent SharePoint fetcher
+Runs against local stand-in HTTP servers (no network or SharePoint login needed)
+
+Usage: python tests/test_async_fetcher.py
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from async_fetcher import fetch_sources
+
+DELAY_SECONDS = 0.5
+ETAG = '"v1"'
+
+
+def make_workbook() -> bytes:
+    """Build a tiny xlsx file in memory"""
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        pd.DataFrame({'Week': pd.date_range("2025-01-06", periods=4, freq="W-MON"),
+                      'System Issue %': [0.01, 0.02, 0.03, 0.04]}).to_excel(writer, sheet_name="Kruidvat", index=False)
+    return buffer.getvalue()
+
+
+WORKBOOK = make_workbook()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves one behaviour per path: /xlsx, /html, /error, /etag"""
+
+    def do_GET(self):
+        time.sleep(DELAY_SECONDS)
+        path = self.path.split('?')[0]
+
+        if path == '/etag' and self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        if path in ('/xlsx', '/etag'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+            self.send_header('ETag', ETAG)
+            self.send_header('Content-Length', str(len(WORKBOOK)))
+            self.end_headers()
+            self.wfile.write(WORKBOOK)
+        elif path == '/html':
+            body = b'<!DOCTYPE html><html><body>Sign in</body></html>'
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(500)
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    """Start a stand-in server on a free local port"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def url(server: ThreadingHTTPServer, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_concurrent_fetch():
+    """Three slow sources should take about as long as one"""
+    print("\nTesting concurrent fetch...")
+    servers = [start_server() for _ in range(3)]
+    try:
+        with tempfile.TemporaryDirectory() as cache_folder:
+            sources = {f"Team {i}": url(server, '/xlsx') for i, server in enumerate(servers)}
+
+            start = time.perf_counter()
+            results = fetch_sources(sources, cache_folder, max_connections=3, force_refresh=True)
+            elapsed = time.perf_counter() - start
+
+            ok = all(r['ok'] and r['origin'] == 'live' and r['content'] == WORKBOOK for r in results)
+            print(f"  {'✓' if ok else '✗'} {sum(r['ok'] for r in results)}/3 sources downloaded")
+            fast = elapsed < DELAY_SECONDS * 2
+            print(f"  {'✓' if fast else '✗'} Total {elapsed:.2f}s for 3 × {DELAY_SECONDS}s sources")
+            return ok and fast
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+def test_connection_limit():
+    """With one connection the sources are fetched one after another"""
+    print("\nTesting connection limit...")
+    server = start_server()
+    try:
+        sources = {f"Team {i}": url(server, '/xlsx') for i in range(3)}
+
+        start = time.perf_counter()
+        results = fetch_sources(sources, None, max_connections=1, force_refresh=True)
+        elapsed = time.perf_counter() - start
+
+        ok = all(r['ok'] for r in results) and elapsed >= DELAY_SECONDS * 3
+        print(f"  {'✓' if ok else '✗'} Total {elapsed:.2f}s with max_connections=1")
+        return ok
+    finally:
+        server.shutdown()
+
+
+def test_invalid_sources():
+    """HTML login pages and HTTP errors are reported per source without failing the others"""
+    print("\nTesting HTML and error sources...")
+    server = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as cache_folder:
+            results = fetch_sources({'Good': url(server, '/xlsx'), 'Login page': url(server, '/html'),
+                                     'Broken': url(server, '/error')}, cache_folder, force_refresh=True)
+            status = {r['name']: r for r in results}
+
+            ok = status['Good']['ok'] and not status['Login page']['ok'] and not status['Broken']['ok']
+            for name, result in status.items():
+                print(f"  {'✓' if result['ok'] else '✗'} {name}: {result['origin'] or result['error'][:60]}")
+            print(f"  {'✓' if ok else '✗'} Only the valid workbook was accepted")
+            return ok
+    finally:
+        server.shutdown()
+
+
+def test_conditional_request_and_fallback():
+    """Second fetch gets 304 from the server; with the server down the cached copy is used"""
+    print("\nTesting conditional requests and cache fallback...")
+    server = start_server()
+    sources = {'Team': url(server, '/etag')}
+
+    with tempfile.TemporaryDirectory() as cache_folder:
+        first = fetch_sources(sources, cache_folder, force_refresh=True)[0]
+        second = fetch_sources(sources, cache_folder, force_refresh=True)[0]
+        server.shutdown()
+        server.server_close()
+        third = fetch_sources(sources, cache_folder, force_refresh=True)[0]
+
+    ok = (first['origin'] == 'live' and second['origin'] == 'not modified' and
+          third['origin'] == 'fallback' and third['content'] == WORKBOOK)
+    print(f"  {'✓' if ok else '✗'} Origins: {first['origin']} → {second['origin']} → {third['origin']}")
+    return ok
+
+
+def run_all_tests():
+    """Run all tests and provide summary"""
+    print("=" * 60)
+    print("Async Fetcher - Stand-in Server Tests")
+    print("=" * 60)
+
+    tests = [
+        ("Concurrent fetch", test_concurrent_fetch),
+        ("Connection limit", test_connection_limit),
+        ("Invalid sources", test_invalid_sources),
+        ("Conditional request and fallback", test_conditional_request_and_fallback)
+    ]
+
+    results = {test_name: test_func() for test_name, test_func in tests}
+
+    print("\n" + "=" * 60)
+    for test_name, result in results.items():
+        print(f"  {'✓ PASS' if result else '✗ FAIL'}: {test_name}")
+    print(f"\nOverall: {sum(results.values())}/{len(results)} tests passed")
+    print("=" * 60)
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,98 @@
+"""
+Test script for the breach run index
+Builds small long series by hand and checks the runs and streaks found in them.
+
+Usage: python tests/test_breaches.py
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from breaches import build_breach_index
+
+THRESHOLD = 0.05
+
+
+def make_series(dates, values, bu_name: str = "Kruidvat", root_cause: str = "Maintenance") -> pd.DataFrame:
+    """Long series (as from rollups.build_long_series) for one BU and root cause"""
+    return pd.DataFrame({
+        'bu': pd.Categorical([bu_name] * len(dates)),
+        'root_cause': pd.Categorical([root_cause] * len(dates)),
+        'Date': pd.to_datetime(dates),
+        'value': pd.Series(values, dtype='float32'),
+        'threshold': pd.Series([THRESHOLD] * len(dates), dtype='float32')
+    })
+
+
+def test_consecutive_weeks():
+    """Consecutive breaching weeks form one run"""
+    print("\nTesting consecutive weeks...")
+    dates = pd.date_range("2025-01-06", periods=5, freq="W-MON")
+    runs, summary = build_breach_index(make_series(dates, [0.01, 0.06, 0.07, 0.08, 0.02]))
+
+    ok = len(runs) == 1 and runs.loc[0, 'length'] == 3 and summary.loc[0, 'longest_streak'] == 3
+    print(f"  {'✓' if ok else '✗'} Runs: {runs['length'].tolist()}")
+    return ok
+
+
+def test_gap_splits_runs():
+    """Missing weeks between two breaching weeks end the first run"""
+    print("\nTesting a gap in the weeks...")
+    dates = pd.to_datetime(["2025-01-06", "2025-01-13", "2025-02-03", "2025-02-10", "2025-02-17"])
+    runs, summary = build_breach_index(make_series(dates, [0.06, 0.07, 0.08, 0.09, 0.10]))
+
+    ok = (runs['length'].tolist() == [2, 3]
+          and runs['start'].tolist() == [dates[0], dates[2]]
+          and summary.loc[0, 'breach_runs'] == 2
+          and summary.loc[0, 'longest_streak'] == 3
+          and summary.loc[0, 'current_streak'] == 3
+          and summary.loc[0, 'current_since'] == dates[2])
+    print(f"  {'✓' if ok else '✗'} Runs: {runs['length'].tolist()}, current streak "
+          f"{summary.loc[0, 'current_streak']} since {summary.loc[0, 'current_since']:%Y-%m-%d}")
+    return ok
+
+
+def test_series_boundary():
+    """Runs never continue from one root cause into the next"""
+    print("\nTesting series boundaries...")
+    dates = pd.date_range("2025-01-06", periods=2, freq="W-MON")
+    series = pd.concat([make_series(dates, [0.06, 0.07], root_cause="Maintenance"),
+                        make_series(dates, [0.08, 0.09], root_cause="System Issue")], ignore_index=True)
+    runs, _ = build_breach_index(series)
+
+    ok = runs['length'].tolist() == [2, 2]
+    print(f"  {'✓' if ok else '✗'} Runs: {runs['length'].tolist()}")
+    return ok
+
+
+def run_all_tests():
+    """Run all tests and provide summary"""
+    print("=" * 60)
+    print("Breach Index - Tests")
+    print("=" * 60)
+
+    logging.disable(logging.INFO)
+    tests = [
+        ("Consecutive weeks", test_consecutive_weeks),
+        ("Gap splits runs", test_gap_splits_runs),
+        ("Series boundary", test_series_boundary)
+    ]
+    results = {test_name: test_func() for test_name, test_func in tests}
+
+    print("\n" + "=" * 60)
+    for test_name, result in results.items():
+        print(f"  {'✓ PASS' if result else '✗ FAIL'}: {test_name}")
+    print(f"\nOverall: {sum(results.values())}/{len(results)} tests passed")
+    print("=" * 60)
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,88 @@
+"""
+Test script for the sheet reader's header handling
+Checks that column names come out unique and stripped, from header cells
+alone and from a workbook written to disk.
+
+Usage: python tests/test_sheet_reader.py
+"""
+
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import openpyxl
+import pandas as pd
+
+import sheet_reader
+from sheet_reader import header_names
+
+HEADER_CASES = [
+    (["Week", "Maintenance %", None, "  "], ["Week", "Maintenance %", "Unnamed: 2", "Unnamed: 3"]),
+    (["Maintenance", "Maintenance", "Maintenance"], ["Maintenance", "Maintenance.1", "Maintenance.2"]),
+    (["Maintenance", "Maintenance ", " Maintenance"], ["Maintenance", "Maintenance.1", "Maintenance.2"]),
+    (["Maintenance", "Maintenance.1", "Maintenance "], ["Maintenance", "Maintenance.1", "Maintenance.2"]),
+]
+
+
+def test_header_names():
+    """Names are stripped before duplicates are numbered"""
+    print("\nTesting header names...")
+    ok = True
+    for values, expected in HEADER_CASES:
+        names = header_names(values)
+        passed = names == expected
+        print(f"  {'✓' if passed else '✗'} {values} → {names}")
+        ok = ok and passed
+    return ok
+
+
+def test_sheet_columns(folder: Path):
+    """A sheet whose headers only differ by spaces is read with unique columns"""
+    print("\nTesting a sheet with space-padded duplicate headers...")
+    path = folder / "headers.xlsx"
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.title = "Kruidvat"
+    sheet.append(["Week", "Maintenance", "Maintenance "])
+    sheet.append([pd.Timestamp("2025-01-06").to_pydatetime(), 0.01, 0.02])
+    book.save(path)
+
+    excel_file = pd.ExcelFile(path, engine='openpyxl')
+    worksheet = sheet_reader.get_worksheet(excel_file, "Kruidvat")
+    df = sheet_reader.read_sheet(worksheet)
+    excel_file.close()
+
+    ok = list(df.columns) == ["Week", "Maintenance", "Maintenance.1"] and df.columns.is_unique
+    print(f"  {'✓' if ok else '✗'} Columns: {list(df.columns)}")
+    return ok
+
+
+def run_all_tests():
+    """Run all tests and provide summary"""
+    print("=" * 60)
+    print("Sheet Reader - Header Tests")
+    print("=" * 60)
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as folder:
+        tests = [
+            ("Header names", test_header_names),
+            ("Sheet columns", lambda: test_sheet_columns(Path(folder)))
+        ]
+        results = {test_name: test_func() for test_name, test_func in tests}
+
+    print("\n" + "=" * 60)
+    for test_name, result in results.items():
+        print(f"  {'✓ PASS' if result else '✗ FAIL'}: {test_name}")
+    print(f"\nOverall: {sum(results.values())}/{len(results)} tests passed")
+    print("=" * 60)
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
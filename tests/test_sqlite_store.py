@@ -0,0 +1,147 @@
+"""
+Test script for the SQLite series store
+Syncs generated workbooks into a temporary SQLite file and checks that they
+load back and that the stored data matches the in-memory cache.
+
+Usage: python tests/test_sqlite_store.py
+"""
+
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from load_test import make_workbook
+from rollups import build_long_series, compute_rollups
+from sqlite_store import SeriesDatabase
+from stability_dashboard import DEFAULT_THRESHOLD, StabilityDashboard
+
+BU_NAMES = ["Kruidvat", "Superdrug"]
+WEEKS = 21
+
+
+def build(path: str):
+    """Parse a workbook into its cache dictionary"""
+    return StabilityDashboard(excel_source=path).build_workbook_cache()
+
+
+def test_duplicated_week(folder: Path):
+    """A week entered twice is stored once (its last row), like the last value pandas keeps"""
+    print("\nTesting a duplicated week...")
+    path = str(folder / "duplicated.xlsx")
+    make_workbook(path, WEEKS, BU_NAMES)
+    book = openpyxl.load_workbook(path)
+    sheet = book[BU_NAMES[0]]
+    last_row = [cell.value for cell in sheet[sheet.max_row]]
+    sheet.append([last_row[0]] + [value * 2 if isinstance(value, (int, float)) else value
+                                  for value in last_row[1:]])
+    book.save(path)
+
+    workbook = build(path)
+    prepared = workbook['bus'][BU_NAMES[0]]['prepared']
+    database = SeriesDatabase(str(folder / "duplicated.sqlite"))
+    try:
+        database.sync("local", "v1", workbook)
+    except Exception as e:
+        print(f"  ✗ Sync failed: {e}")
+        return False
+
+    loaded = database.load_workbook("local", "v1")['bus'][BU_NAMES[0]]['prepared']
+    expected = prepared[~prepared.index.duplicated(keep='last')]
+    ok = len(prepared) == WEEKS + 1 and len(loaded) == WEEKS and loaded.equals(expected)
+    print(f"  {'✓' if ok else '✗'} {len(prepared)} parsed rows, {len(loaded)} stored weeks, last row kept")
+    return ok
+
+
+def test_aggregates_match_memory(folder: Path):
+    """SQL aggregates (mean, max, breaches, weeks) equal the in-memory rollups, also at exact-threshold values"""
+    print("\nTesting SQLite aggregates against the in-memory rollups...")
+    path = str(folder / "thresholds.xlsx")
+    make_workbook(path, WEEKS, BU_NAMES)
+    book = openpyxl.load_workbook(path)
+    static = book["Static Values"]
+    static.cell(row=3, column=static.max_column).value = None  # Last root cause uses DEFAULT_THRESHOLD
+    thresholds = {static.cell(row=2, column=col).value: static.cell(row=3, column=col).value or DEFAULT_THRESHOLD
+                  for col in range(2, static.max_column + 1)}
+    for bu_name in BU_NAMES:
+        sheet = book[bu_name]
+        header = [cell.value for cell in sheet[1]]
+        # Every other week sits exactly on the threshold (several round up in float32)
+        for row in range(2, sheet.max_row + 1, 2):
+            for name, threshold in thresholds.items():
+                sheet.cell(row=row, column=header.index(name) + 1).value = threshold
+    book.save(path)
+
+    workbook = build(path)
+    rollups = compute_rollups(build_long_series(workbook['bus'], DEFAULT_THRESHOLD))
+    database = SeriesDatabase(str(folder / "thresholds.sqlite"))
+    database.sync("local", "v1", workbook)
+
+    ok = True
+    for granularity in ("Monthly", "Quarterly"):
+        for bu_name in BU_NAMES:
+            memory = rollups[granularity][bu_name]['stats']
+            memory.index = memory.index.set_levels(memory.index.levels[0].astype(str), level='root_cause')
+            stored = database.query_aggregates("local", bu_name, granularity).reindex(memory.index)
+            same = (stored['breaches'].equals(memory['breaches']) and stored['weeks'].equals(memory['weeks'])
+                    and np.allclose(stored[['mean', 'max']], memory[['mean', 'max']], rtol=1e-6))
+            print(f"  {'✓' if same else '✗'} {granularity} {bu_name}: {int(memory['breaches'].sum())} breaches "
+                  f"in memory, {int(stored['breaches'].sum())} in SQLite")
+            ok = ok and same
+    return ok
+
+
+def test_static_values_round_trip(folder: Path):
+    """The Static Values frame loads back from SQLite equal to the parsed one (values, dtypes, labels)"""
+    print("\nTesting the Static Values round trip...")
+    path = str(folder / "static.xlsx")
+    make_workbook(path, WEEKS, BU_NAMES)
+    workbook = build(path)
+    database = SeriesDatabase(str(folder / "static.sqlite"))
+    database.sync("local", "v1", workbook)
+    loaded = database.load_workbook("local", "v1")['thresholds_df']
+
+    try:
+        pd.testing.assert_frame_equal(loaded, workbook['thresholds_df'])
+        ok = True
+    except AssertionError as e:
+        print(f"  {e}")
+        ok = False
+    print(f"  {'✓' if ok else '✗'} Dtypes: {', '.join(sorted({str(dtype) for dtype in loaded.dtypes}))}")
+    return ok
+
+
+def run_all_tests():
+    """Run all tests and provide summary"""
+    print("=" * 60)
+    print("SQLite Store - Tests")
+    print("=" * 60)
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as folder:
+        folder = Path(folder)
+        tests = [
+            ("Duplicated week", lambda: test_duplicated_week(folder)),
+            ("Aggregates match memory", lambda: test_aggregates_match_memory(folder)),
+            ("Static Values round trip", lambda: test_static_values_round_trip(folder))
+        ]
+        results = {test_name: test_func() for test_name, test_func in tests}
+
+    print("\n" + "=" * 60)
+    for test_name, result in results.items():
+        print(f"  {'✓ PASS' if result else '✗ FAIL'}: {test_name}")
+    print(f"\nOverall: {sum(results.values())}/{len(results)} tests passed")
+    print("=" * 60)
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,110 @@
+"""
+Test script for the workbook store's byte accounting
+Checks that the memoized data tables of a stored workbook are charged to the
+store's budget (stats()['bytes']) and credited back when the memo drops them.
+
+Usage: python tests/test_workbook_store.py
+"""
+
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import stability_dashboard
+from load_test import make_workbook
+from stability_dashboard import get_display_table, get_workbook_version, load_workbook_cache
+from workbook_store import WorkbookStore, estimate_size, get_workbook_store
+
+BU_NAME = "Kruidvat"
+GRANULARITIES = ["Weekly", "Monthly", "Quarterly"]
+
+
+def memo_bytes(workbook) -> int:
+    """Bytes recorded for the tables currently in a workbook's display memo"""
+    return sum(workbook['display_tables']['sizes'].values())
+
+
+def test_memo_is_charged(path: str):
+    """stats() bytes grow by exactly the memoized tables and shrink when the memo drops them"""
+    print("\nTesting memo accounting...")
+    store = get_workbook_store()
+    store.clear()
+
+    workbook = load_workbook_cache(get_workbook_version(path), path)
+    before = store.stats()['bytes']
+
+    for granularity in GRANULARITIES:
+        get_display_table(workbook, BU_NAME, granularity, None)
+    grown = store.stats()['bytes']
+    charged = memo_bytes(workbook)
+
+    # A rerun is served from the memo and charges nothing
+    get_display_table(workbook, BU_NAME, "Weekly", None)
+    rerun = store.stats()['bytes']
+
+    # Over the entry limit the oldest table is dropped and credited back
+    stability_dashboard.DISPLAY_TABLE_MAX_ENTRIES = 2
+    get_display_table(workbook, "Superdrug", "Weekly", None)
+    stability_dashboard.DISPLAY_TABLE_MAX_ENTRIES = 32
+    trimmed = store.stats()['bytes']
+
+    ok = (charged > 0 and grown - before == charged and rerun == grown
+          and len(workbook['display_tables']['tables']) == 2
+          and trimmed - before == memo_bytes(workbook))
+    print(f"  {'✓' if ok else '✗'} Stored {before / 1024:.0f} KB, +{charged / 1024:.0f} KB for "
+          f"{len(GRANULARITIES)} tables, {trimmed / 1024:.0f} KB after trimming the memo to 2")
+    return ok
+
+
+def test_charge_evicts():
+    """A workbook whose memo grows past the budget evicts the least recently used version"""
+    print("\nTesting eviction on charge...")
+    old, current = {'name': 'old'}, {'name': 'current'}
+    store = WorkbookStore(max_bytes=estimate_size(old) + estimate_size(current) + 1000)
+    store.put("v1", old)
+    store.put("v2", current)
+
+    store.charge(current, 1001)  # One byte over the budget
+    stats = store.stats()
+    ok = (store.get("v1") is None and store.get("v2") is current and stats['evictions'] == 1
+          and stats['bytes'] == estimate_size(current) + 1001)
+    print(f"  {'✓' if ok else '✗'} Entries after charge: {stats['entries']}, evictions: {stats['evictions']}")
+
+    store.charge({'name': 'not stored'}, 10 ** 9)
+    ignored = store.stats()['bytes'] == stats['bytes']
+    print(f"  {'✓' if ignored else '✗'} Charging a workbook that is not stored is ignored")
+    return ok and ignored
+
+
+def run_all_tests():
+    """Run all tests and provide summary"""
+    print("=" * 60)
+    print("Workbook Store - Byte Accounting Tests")
+    print("=" * 60)
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as folder:
+        path = str(Path(folder) / "store.xlsx")
+        make_workbook(path, 104, [BU_NAME, "Superdrug"])
+
+        tests = [
+            ("Memoized tables are charged", lambda: test_memo_is_charged(path)),
+            ("Charge evicts over budget", test_charge_evicts)
+        ]
+        results = {test_name: test_func() for test_name, test_func in tests}
+
+    print("\n" + "=" * 60)
+    for test_name, result in results.items():
+        print(f"  {'✓ PASS' if result else '✗ FAIL'}: {test_name}")
+    print(f"\nOverall: {sum(results.values())}/{len(results)} tests passed")
+    print("=" * 60)
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,115 @@
+"""
+Warmup - Prepare the default data source once per process, in the background
+The job (supplied by the dashboard) downloads/parses the default source into
+the shared workbook store and builds the default BU's figures, so the first
+session finds everything ready. Sessions that arrive while it is running join
+the same parse through the store instead of starting their own.
+
+Run the dashboard with warm-up starting before the first browser connects:
+    python warmup.py [streamlit options]
+With a plain `streamlit run stability_dashboard.py` it starts on the first page load.
+"""
+
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_status = {
+    'state': 'idle',     # idle, running, ready, failed
+    'step': None,        # Current step while running
+    'source': None,      # Description returned by the job
+    'started': None,
+    'seconds': None,
+    'error': None
+}
+_status_lock = threading.Lock()
+_done = threading.Event()
+
+
+def _update(**changes):
+    with _status_lock:
+        _status.update(changes)
+
+
+def _run(job: Callable[[Callable[[str], None]], str]):
+    start = time.perf_counter()
+
+    def progress(step: str):
+        logger.info(f"Warm-up: {step}")
+        _update(step=step)
+
+    try:
+        source = job(progress)
+        seconds = time.perf_counter() - start
+        _update(state='ready', step=None, source=source, seconds=seconds)
+        logger.info(f"✓ Warm-up finished in {seconds:.2f}s ({source})")
+    except Exception as e:
+        _update(state='failed', step=None, seconds=time.perf_counter() - start, error=str(e))
+        logger.error(f"✗ Warm-up failed: {e}", exc_info=True)
+    finally:
+        _done.set()
+
+
+def start_once(job: Callable[[Callable[[str], None]], str]) -> bool:
+    """
+    Start the warm-up job in a background thread, once per process
+
+    Args:
+        job: Called with a progress(step) callback; returns a description of the warmed source
+
+    Returns:
+        bool: True if this call started the job
+    """
+    with _status_lock:
+        if _status['state'] != 'idle':
+            return False
+        _status.update(state='running', step='starting', started=time.time())
+
+    threading.Thread(target=_run, args=(job,), name="warmup", daemon=True).start()
+    return True
+
+
+def get_status() -> Dict:
+    """
+    Get the warm-up status
+
+    Returns:
+        Copy of the status: state (idle, running, ready, failed), step, source,
+        started, seconds and error
+    """
+    with _status_lock:
+        return dict(_status)
+
+
+def wait(timeout: Optional[float] = None) -> bool:
+    """
+    Wait for the warm-up job to finish
+
+    Args:
+        timeout: Maximum seconds to wait (None = no limit)
+
+    Returns:
+        bool: True if the job finished (ready or failed)
+    """
+    return _done.wait(timeout)
+
+
+if __name__ == "__main__":
+    # Start the warm-up, then run the Streamlit server in this same process so the
+    # dashboard sessions share the warmed workbook store and see the warm-up status
+    # (through the importable module: this file runs as __main__, a separate copy)
+    from streamlit.web import cli as streamlit_cli
+
+    import stability_dashboard
+    import warmup
+
+    warmup.start_once(stability_dashboard.warm_default_source)
+
+    script = str(Path(__file__).resolve().parent / "stability_dashboard.py")
+    sys.argv = ["streamlit", "run", script] + sys.argv[1:]
+    sys.exit(streamlit_cli.main())
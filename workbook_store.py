@@ -0,0 +1,221 @@
+"""
+Workbook Store - Process-wide cache of parsed workbook versions
+One parsed copy per workbook version is shared read-only by every session.
+The store tracks its memory footprint and evicts least-recently-used versions
+when it grows beyond the configured byte budget.
+"""
+
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import pandas as pd
+
+try:
+    from config import WORKBOOK_STORE_MAX_BYTES
+except ImportError:
+    WORKBOOK_STORE_MAX_BYTES = 512 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(obj) -> int:
+    """
+    Estimate the deep memory footprint of a cached object in bytes
+
+    Args:
+        obj: DataFrame, Series, pyarrow Table, or nested dict/list/tuple of them
+
+    Returns:
+        Approximate size in bytes
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(getattr(obj, 'nbytes', None), int):
+        # pyarrow Tables and NumPy arrays
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class WorkbookStore:
+    """LRU store of immutable parsed workbook versions with a byte budget"""
+
+    def __init__(self, max_bytes: int = WORKBOOK_STORE_MAX_BYTES):
+        """
+        Initialize the store
+
+        Args:
+            max_bytes: Memory budget; least-recently-used versions are evicted above it
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # version -> (workbook, size)
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self._loading = {}  # version -> Lock held while that version is being parsed
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, version: str) -> Optional[Dict]:
+        """
+        Look up a workbook version
+
+        Args:
+            version: Workbook version key
+
+        Returns:
+            Parsed workbook (treat as read-only) or None if not cached
+        """
+        with self._lock:
+            entry = self._entries.get(version)
+            if entry is None:
+                return None
+            self._entries.move_to_end(version)
+            return entry[0]
+
+    def put(self, version: str, workbook: Dict):
+        """
+        Add a parsed workbook version and evict old versions if over budget
+
+        Args:
+            version: Workbook version key
+            workbook: Parsed workbook dictionary
+        """
+        size = estimate_size(workbook)
+
+        with self._lock:
+            if version in self._entries:
+                self._total_bytes -= self._entries.pop(version)[1]
+
+            self._entries[version] = (workbook, size)
+            self._total_bytes += size
+            logger.info(f"Stored workbook version {version} ({size / 1024 / 1024:.1f} MB)")
+            self._evict_over_budget()
+
+    def charge(self, workbook: Dict, delta_bytes: int):
+        """
+        Adjust the recorded size of a cached workbook whose memos grew or shrank after
+        it was stored (e.g. the memoized data tables) and evict versions if over budget
+
+        Args:
+            workbook: Workbook dictionary returned by the store
+            delta_bytes: Bytes added (positive) or released (negative)
+        """
+        with self._lock:
+            for version, (cached, size) in self._entries.items():
+                if cached is workbook:
+                    self._entries[version] = (cached, size + delta_bytes)
+                    self._total_bytes += delta_bytes
+                    break
+            else:
+                return  # Evicted (or never stored): nothing is charged
+
+            self._evict_over_budget()
+
+    def _evict_over_budget(self):
+        """Evict least recently used versions while over budget, always keeping the newest one"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            evicted_version, (_, evicted_size) = self._entries.popitem(last=False)
+            self._total_bytes -= evicted_size
+            self.evictions += 1
+            logger.info(f"Evicted workbook version {evicted_version} "
+                        f"({evicted_size / 1024 / 1024:.1f} MB)")
+
+        if self._total_bytes > self.max_bytes:
+            version, (_, size) = next(reversed(self._entries.items()))
+            logger.warning(f"Workbook version {version} alone exceeds the store budget "
+                           f"({size} > {self.max_bytes} bytes)")
+
+    def get_or_load(self, version: str, loader: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """
+        Return a cached version or parse it once, even with concurrent callers
+
+        Args:
+            version: Workbook version key
+            loader: Builds the workbook dictionary (returns None on failure)
+
+        Returns:
+            Parsed workbook or None if loading failed (failures are not cached)
+        """
+        with self._lock:
+            workbook = self.get(version)
+            if workbook is not None:
+                self.hits += 1
+                return workbook
+            version_lock = self._loading.setdefault(version, threading.Lock())
+
+        with version_lock:
+            # Another session may have finished parsing while we waited
+            with self._lock:
+                workbook = self.get(version)
+                if workbook is not None:
+                    self.hits += 1
+                    return workbook
+                self.misses += 1
+
+            try:
+                workbook = loader()
+                if workbook is not None:
+                    self.put(version, workbook)
+                return workbook
+            finally:
+                with self._lock:
+                    self._loading.pop(version, None)
+
+    def entries(self) -> List[Tuple[str, Dict, int]]:
+        """
+        List the cached versions
+
+        Returns:
+            List of (version, workbook, estimated bytes), least recently used first
+        """
+        with self._lock:
+            return [(version, workbook, size) for version, (workbook, size) in self._entries.items()]
+
+    def clear(self):
+        """Drop every cached version"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get store counters
+
+        Returns:
+            Dictionary with entries, bytes, max_bytes, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_workbook_store() -> WorkbookStore:
+    """
+    Get the process-wide workbook store (shared by all sessions)
+
+    Returns:
+        WorkbookStore singleton
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = WorkbookStore(WORKBOOK_STORE_MAX_BYTES)
+        return _store